@@ -0,0 +1,503 @@
+#!/usr/bin/env python3
+"""
+Script: pricing_bench.py
+Created: 2026-10-18
+Purpose: Benchmark and regression suite — throughput history with a regression gate, plus golden break-even/cap checks
+Keywords: pricing, benchmark, regression, golden, throughput, latency, locales, foody7
+Status: active
+"""
+
+import argparse
+import hashlib
+import json
+import platform
+import re
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+import pricing_cache as pcache
+import pricing_calculator as pc
+import pricing_grid as pg
+import pricing_infra as pi
+import pricing_ledger as pl
+import pricing_loadtest as lt
+import pricing_money as pm
+import pricing_sensitivity as sens
+import pricing_service as svc
+import pricing_store as ps
+import pricing_sweep as sw
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+
+HERE = Path(__file__).parent
+GOLDEN_PATH = HERE / "pricing_golden.json"
+HISTORY_PATH = HERE / "bench_history.json"
+LOCALES_DIR = HERE.parent.parent / "locales"
+
+REPEATS = 5               # best-of-N per benchmark
+THRESHOLD = 0.20          # fail when throughput drops >20% below the baseline
+HISTORY_WINDOW = 5        # baseline = median of the last N runs on this machine
+HISTORY_KEEP = 200        # runs kept in the history file
+
+# Basket grid for the golden helper values: ₩8k–₩60k in ₩1k steps
+GOLDEN_AVGS = list(range(8_000, 60_001, 1_000))
+
+# ─────────────────────────────────────────────
+# GOLDEN OUTPUTS — numbers an optimization must not move
+# ─────────────────────────────────────────────
+
+def golden_values():
+    """Every break-even, sweet spot and cap the calculator publishes, plus the report hash.
+
+    helpers: scalar helpers per tier over GOLDEN_AVGS (caps at CAP_FACTOR)
+    exact:   the same from pricing_money (integer won, default policy)
+    sections: every numeric table cell of the default report
+    """
+    helpers = {"break_even": {}, "sweet_spot": {}, "order_cap": {}}
+    exact = {"break_even": {}, "sweet_spot": {}, "order_cap": {}}
+    for name, price in pc.TIERS.items():
+        helpers["break_even"][name] = [pc.break_even(price, a) for a in GOLDEN_AVGS]
+        helpers["sweet_spot"][name] = [pc.sweet_spot(price, a) for a in GOLDEN_AVGS]
+        helpers["order_cap"][name] = [pc.order_cap(price, a, pc.CAP_FACTOR) for a in GOLDEN_AVGS]
+        exact["break_even"][name] = [pm.break_even(price, a) for a in GOLDEN_AVGS]
+        exact["sweet_spot"][name] = [pm.sweet_spot(price, a) for a in GOLDEN_AVGS]
+        exact["order_cap"][name] = [pm.order_cap(price, a, pc.CAP_FACTOR) for a in GOLDEN_AVGS]
+    _, sections = sw.evaluate_config(pc.PricingConfig())
+    return {
+        "avgs": GOLDEN_AVGS,
+        "published": {"prices": pc.TIERS, "caps": pc.TIER_CAPS},
+        "helpers": helpers,
+        "exact": exact,
+        "sections": sections,
+        "report_sha256": hashlib.sha256(pc.render_report().encode()).hexdigest(),
+    }
+
+def _diff(path, want, got, out):
+    """Leaf-by-leaf differences between two JSON-like values"""
+    if isinstance(want, dict) and isinstance(got, dict):
+        for key in sorted(want.keys() | got.keys(), key=str):
+            _diff(f"{path}.{key}", want.get(key), got.get(key), out)
+    elif isinstance(want, list) and isinstance(got, list) and len(want) == len(got):
+        for i, (w, g) in enumerate(zip(want, got)):
+            _diff(f"{path}[{i}]", w, g, out)
+    elif want != got:
+        out.append((path, want, got))
+    return out
+
+def check_golden(golden):
+    """Current values against the stored golden file; returns (path, want, got) mismatches"""
+    got = json.loads(json.dumps(golden_values()))
+    return _diff("golden", golden, got, [])
+
+def check_kernels():
+    """Vectorized kernels and the service table must agree with the scalar helpers"""
+    failures = []
+    prices = np.array(list(pc.TIERS.values()), dtype=np.float64)[:, np.newaxis]
+    avgs = np.array(GOLDEN_AVGS, dtype=np.float64)[np.newaxis, :]
+    infra_cfg = pc.PricingConfig(infra_model=pi.DEFAULT_SPEC)
+    grids = {
+        "break_even": (pg.break_even(prices, avgs), pc.break_even),
+        "sweet_spot": (pg.sweet_spot(prices, avgs), pc.sweet_spot),
+        "order_cap": (pg.order_cap(prices, avgs, pc.CAP_FACTOR),
+                      lambda p, a: pc.order_cap(p, a, pc.CAP_FACTOR)),
+        "order_cap[infra_model]": (pg.order_cap(prices, avgs, pc.CAP_FACTOR, infra_model=pi.default_model()),
+                                   lambda p, a: pc.order_cap(p, a, pc.CAP_FACTOR, infra_cfg)),
+    }
+    for name, (grid, scalar) in grids.items():
+        for t, price in enumerate(pc.TIERS.values()):
+            for j, a in enumerate(GOLDEN_AVGS):
+                if int(grid[t, j]) != scalar(price, a):
+                    failures.append((f"pricing_grid.{name}[{price},{a}]", scalar(price, a), int(grid[t, j])))
+
+    table = svc.QuoteTable()
+    for path in lt.query_mix(2_000, off_grid_share=0.0, seed=11):
+        q = dict(p.split("=") for p in path.decode().split("?")[1].split("&"))
+        orders, avg = int(q["orders"]), int(q["avg"])
+        want, got = svc.savings_quote(orders, avg), table.lookup(orders, avg)
+        if want != got:
+            failures.append((f"QuoteTable[{orders},{avg}]", want, got))
+    return failures
+
+def check_cache():
+    """Reports assembled from memoized section/tier results, in process and from disk
+    across runs, must equal direct builds"""
+    import tempfile
+    failures = []
+    base = pc.PricingConfig()
+    # the empty config reads no commission field, so it must not pin the sections' keys
+    configs = [pc.PricingConfig(tiers={}, order_range=[]), base.replace(commission_rate=0.05), base,
+               base.replace(tiers={**base.tiers, "F170": 180_000}),
+               base.replace(infra_rate=0.03), base.replace(tiers={"F350": 350_000, "F70": 70_000}),
+               base.replace(infra_model=pi.DEFAULT_SPEC)]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "cache.sqlite"
+        memos = [("memory", lambda: pcache.SectionMemo())] + [
+            (f"disk run {run}", lambda: pcache.SectionMemo(store=pcache.ResultCache(path))) for run in (1, 2)]
+        for label, make in memos:
+            memo = make()
+            for cfg in configs + configs:                     # second pass is served from the memo
+                for fmt in ("text", "json"):
+                    if pcache.render_report(fmt=fmt, cfg=cfg, memo=memo) != pc.render_report(fmt=fmt, cfg=cfg):
+                        failures.append((f"pricing_cache[{label}, {cfg.tiers}, {fmt}]", "direct build", "differs"))
+            if memo.store is not None:
+                memo.store.close()
+    return failures
+
+def check_store():
+    """Reloading bills into a BillStore replaces restaurant-months instead of failing or duplicating"""
+    import tempfile
+    failures = []
+    cols = ps.synthetic_bills(500, months=3)
+    with tempfile.TemporaryDirectory() as tmp, ps.BillStore(Path(tmp) / "bills.db") as store:
+        store.add_restaurants([f"r{i}" for i in range(500)], ids=range(500))
+        store.insert_columns(cols)
+        store.create_indexes()
+        store.insert_columns(cols)                            # same ledger again
+        if store.count() != 1_500:
+            failures.append(("BillStore reload rows", 1_500, store.count()))
+        changed = {c: v[:500].copy() for c, v in cols.items()}   # first month, one bill revised
+        changed["total"][0] += 1_000
+        store.insert_columns(changed)
+        total = store.conn.execute("SELECT total FROM bills WHERE restaurant = ? AND month = ?",
+                                   (int(cols["restaurant"][0]), int(cols["month"][0]))).fetchone()[0]
+        if store.count() != 1_500 or total != int(cols["total"][0]) + 1_000:
+            failures.append(("BillStore upsert", (1_500, int(cols["total"][0]) + 1_000),
+                             (store.count(), total)))
+        ids = store.add_restaurants(["r1", "new-a", "r2", "new-b"], ids=[1, 9_001, 2, 9_002])
+        stored = dict(store.conn.execute("SELECT name, id FROM restaurants WHERE name LIKE 'new-%'"))
+        if ids != [1, 9_001, 2, 9_002] or stored != {"new-a": 9_001, "new-b": 9_002}:
+            failures.append(("BillStore add_restaurants ids", [1, 9_001, 2, 9_002], (ids, stored)))
+    return failures
+
+def check_sensitivity():
+    """Every rate knob the portfolio tornado moves must move some tier's median elasticity
+    the same way (a knob missing its cap-step term shows 0.00 on every tier)"""
+    failures = []
+    cfg = pc.PricingConfig()
+    table = sens.elasticities(sens.grid_sensitivity(cfg), cfg)
+    for metric, data in sens.tornado(cfg).items():
+        for knob, lo, hi in data["rows"]:
+            if knob not in ("commission_rate", "infra_rate", "cap_factor") \
+                    or abs(hi - lo) < 0.05 * abs(data["base"]):
+                continue
+            aligned = np.nan_to_num(table[metric][knob]) * np.sign(hi - lo)
+            if aligned.max() < 0.01:
+                failures.append((f"elasticity[{metric}, {knob}]", f"sign of {hi - lo:+,.0f}",
+                                 np.round(table[metric][knob], 2).tolist()))
+    return failures
+
+def _flat_strings(tree):
+    """Leaf strings of a nested locale file, by their innermost key"""
+    out = {}
+    for key, value in tree.items():
+        if isinstance(value, dict):
+            out.update(_flat_strings(value))
+        else:
+            out[key] = value
+    return out
+
+def check_locales(locales_dir=LOCALES_DIR):
+    """Published cap and price strings in every locale must match TIER_CAPS / TIERS"""
+    failures = []
+    paths = sorted(Path(locales_dir).glob("*.json"))
+    if not paths:
+        return [(str(locales_dir), "locale files", None)]
+    for path in paths:
+        strings = _flat_strings(json.loads(path.read_text(encoding="utf-8")))
+        for name in pc.TIERS:
+            cap = strings.get(f"pricingTier{name}Cap", "")
+            numbers = [int(n.replace(",", "")) for n in re.findall(r"\d[\d,]*", cap)]
+            if numbers != [pc.TIER_CAPS[name]]:
+                failures.append((f"{path.name}:pricingTier{name}Cap", pc.TIER_CAPS[name], cap))
+            price = strings.get(f"pricingTier{name}Price", "")
+            if pc.fmt_krw(pc.TIERS[name]) not in price:
+                failures.append((f"{path.name}:pricingTier{name}Price", pc.fmt_krw(pc.TIERS[name]), price))
+    return failures
+
+# ─────────────────────────────────────────────
+# BENCHMARKS — each returns {"items": n, "seconds": s, ...} for one run
+# ─────────────────────────────────────────────
+
+def bench_scalar(scale=1.0):
+    """break_even + sweet_spot + order_cap calls over tiers × baskets"""
+    avgs = GOLDEN_AVGS * max(1, int(20 * scale))
+    start = time.perf_counter()
+    for price in pc.TIERS.values():
+        for a in avgs:
+            pc.break_even(price, a)
+            pc.sweet_spot(price, a)
+            pc.order_cap(price, a, pc.CAP_FACTOR)
+    return {"items": 3 * len(pc.TIERS) * len(avgs), "seconds": time.perf_counter() - start}
+
+def bench_report(scale=1.0):
+    """Full text report, all ten sections"""
+    n = max(1, int(20 * scale))
+    start = time.perf_counter()
+    for _ in range(n):
+        pc.render_report()
+    return {"items": n, "seconds": time.perf_counter() - start}
+
+def bench_grid(scale=1.0):
+    """Dense scenario_grid sweep (the pricing_grid demo); items are output cells"""
+    orders = np.arange(1, int(5_000 * scale) + 1)
+    start = time.perf_counter()
+    grid = pg.scenario_grid(np.arange(50_000, 1_000_001, 25_000), np.arange(8_000, 80_001, 500),
+                            orders, [0.05, 0.06, 0.07, 0.08], [0.030, 0.035, 0.040])
+    return {"items": sum(g.values.size for g in grid.values()), "seconds": time.perf_counter() - start}
+
+def _ledger_chunks(rows, restaurants=10_000, months=3, seed=7):
+    """In-memory (rids, months, values) chunks shaped like write_synthetic_ledger's output"""
+    rng = np.random.default_rng(seed)
+    labels = [f"2026-{m + 1:02d}" for m in range(months)]
+    chunks = []
+    for chunk_start in range(0, rows, pl.CHUNK_ROWS):
+        n = min(pl.CHUNK_ROWS, rows - chunk_start)
+        month = np.arange(chunk_start, chunk_start + n) * months // rows
+        ids = rng.integers(0, restaurants, n)
+        values = np.rint(rng.lognormal(np.log(25_000), 0.35, n) / 100) * 100
+        chunks.append(([f"r{i}" for i in ids], [labels[m] for m in month], values))
+    return chunks
+
+def _bench_replay(chunks, policy):
+    state = pl.LedgerReplay(policy=policy)
+    bills = 0
+    start = time.perf_counter()
+    for _ in pl.replay(chunks, state):
+        bills += 1
+    return {"items": state.rows, "seconds": time.perf_counter() - start, "bills": bills}
+
+def bench_ledger(scale=1.0):
+    """LedgerReplay over 1M in-memory orders (float billing); items are rows"""
+    return _bench_replay(_ledger_chunks(int(1_000_000 * scale)), None)
+
+def bench_ledger_exact(scale=1.0):
+    """LedgerReplay with integer-won per-order billing"""
+    return _bench_replay(_ledger_chunks(int(1_000_000 * scale)),
+                         pm.MoneyPolicy(pm.HALF_UP, pm.PER_ORDER))
+
+def bench_query(scale=1.0):
+    """Savings-calculator queries through SavingsService.route, cold cache; p50/p99 per query"""
+    paths = [p.decode() for p in lt.query_mix(int(50_000 * scale))]
+    service = svc.SavingsService(table=_QUOTE_TABLE)
+    lat = np.empty(len(paths), dtype=np.int64)
+    start = time.perf_counter()
+    for k, path in enumerate(paths):
+        t0 = time.perf_counter_ns()
+        service.route(path)
+        lat[k] = time.perf_counter_ns() - t0
+    seconds = time.perf_counter() - start
+    p50, p99 = np.percentile(lat / 1e3, [50, 99])
+    return {"items": len(paths), "seconds": seconds, "p50_us": float(p50), "p99_us": float(p99)}
+
+_QUOTE_TABLE = None     # built once; table construction is not what bench_query measures
+
+def bench_sweep(scale=1.0):
+    """pricing_sweep.evaluate_config over a rate grid with a fresh section memo; notes the unmemoized rate"""
+    infra = ",".join(f"{r:.4f}" for r in np.linspace(0.030, 0.040, max(2, int(5 * scale))))
+    configs = sw.grid_configs(pc.PricingConfig(name="baseline"),
+                              [f"infra_rate={infra}", "competitor_rate=0.20,0.25,0.27,0.30",
+                               "cap_factor=0.7,0.8,0.9"])
+    pcache.default_memo().clear()
+    sw._FLAT.clear()
+    start = time.perf_counter()
+    for cfg in configs:
+        sw.evaluate_config(cfg, cache=True)
+    seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    for cfg in configs:
+        sw.evaluate_config(cfg)
+    direct = time.perf_counter() - start
+    return {"items": len(configs), "seconds": seconds, "direct_per_s": len(configs) / direct}
+
+def bench_store(scale=1.0):
+    """BillStore bulk load of synthetic bills into an empty database, then an unchanged reload"""
+    import tempfile
+    restaurants = max(1, int(50_000 * scale))
+    cols = ps.synthetic_bills(restaurants, months=12)
+    with tempfile.TemporaryDirectory() as tmp, ps.BillStore(Path(tmp) / "bills.db") as store:
+        store.add_restaurants([f"r{i}" for i in range(restaurants)], ids=range(restaurants))
+        start = time.perf_counter()
+        n = store.insert_columns(cols)
+        seconds = time.perf_counter() - start
+        store.create_indexes()
+        start = time.perf_counter()
+        store.insert_columns(cols)
+        reload = time.perf_counter() - start
+    return {"items": n, "seconds": seconds, "reload_rows_per_s": n / reload}
+
+BENCHMARKS = {
+    "scalar":       bench_scalar,
+    "report":       bench_report,
+    "grid":         bench_grid,
+    "ledger":       bench_ledger,
+    "ledger-exact": bench_ledger_exact,
+    "query":        bench_query,
+    "sweep":        bench_sweep,
+    "store":        bench_store,
+}
+
+def run_benchmarks(names=None, repeats=REPEATS, scale=1.0):
+    """Best-of-`repeats` result per benchmark, with items_per_sec"""
+    global _QUOTE_TABLE
+    if _QUOTE_TABLE is None and (names is None or "query" in names):
+        _QUOTE_TABLE = svc.QuoteTable()
+    results = {}
+    for name in names or BENCHMARKS:
+        runs = [BENCHMARKS[name](scale) for _ in range(repeats)]
+        best = min(runs, key=lambda r: r["seconds"] / r["items"])
+        results[name] = {**best, "items_per_sec": best["items"] / best["seconds"]}
+    return results
+
+# ─────────────────────────────────────────────
+# HISTORY — append-only JSON, regression gate per machine
+# ─────────────────────────────────────────────
+
+def machine_key():
+    return f"{platform.node()}|{platform.machine()}|py{platform.python_version()}|np{np.__version__}"
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def load_history(path=HISTORY_PATH):
+    path = Path(path)
+    if not path.exists():
+        return []
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def save_history(history, path=HISTORY_PATH):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(history[-HISTORY_KEEP:], f, indent=1)
+        f.write("\n")
+
+def baselines(history, machine, window=HISTORY_WINDOW):
+    """Median items_per_sec per benchmark over the last `window` runs on this machine.
+
+    A run recorded with --accept re-baselines its benchmarks: runs before
+    it are not counted for them.
+    """
+    samples, closed = {}, set()
+    for run in reversed(history):
+        if run["machine"] != machine:
+            continue
+        for name, result in run["results"].items():
+            if name not in closed and len(samples.setdefault(name, [])) < window:
+                samples[name].append(result["items_per_sec"])
+        if run.get("accepted"):
+            closed.update(run["results"])
+    return {name: float(np.median(values)) for name, values in samples.items()}
+
+def regressions(results, base, threshold=THRESHOLD):
+    """(name, baseline, current, change) for every benchmark slower than the threshold allows"""
+    out = []
+    for name, result in results.items():
+        if name in base:
+            change = result["items_per_sec"] / base[name] - 1
+            if change < -threshold:
+                out.append((name, base[name], result["items_per_sec"], change))
+    return out
+
+# ─────────────────────────────────────────────
+# MAIN
+# ─────────────────────────────────────────────
+
+def print_failures(title, failures, limit=20):
+    print(f"\n  {title}: {'ok' if not failures else f'{len(failures)} mismatches'}")
+    for path, want, got in failures[:limit]:
+        print(f"    ✗ {path}: expected {want!r}, got {got!r}")
+    if len(failures) > limit:
+        print(f"    … {len(failures) - limit} more")
+
+def print_results(results, base, threshold):
+    print(f"\n  {'Benchmark':<14} {'items/s':>14} {'baseline':>14} {'change':>8}  notes")
+    print("  " + "─" * 76)
+    for name, r in results.items():
+        b = base.get(name)
+        change = f"{r['items_per_sec'] / b - 1:>+8.1%}" if b else f"{'new':>8}"
+        flag = " ✗" if b and r["items_per_sec"] / b - 1 < -threshold else ""
+        notes = ", ".join(f"{k} {v:,.1f}" if k.endswith("_us") else f"{k} {v:,.0f}"
+                          for k, v in r.items() if k.endswith(("_us", "_per_s")))
+        print(f"  {name:<14} {r['items_per_sec']:>14,.0f} {(f'{b:,.0f}' if b else '—'):>14} "
+              f"{change}{flag}  {notes}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[2])
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="benchmarks to run")
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--scale", type=float, default=1.0, help="workload size multiplier")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="allowed throughput drop vs baseline (fraction)")
+    parser.add_argument("--history", default=str(HISTORY_PATH))
+    parser.add_argument("--golden", default=str(GOLDEN_PATH))
+    parser.add_argument("--no-record", action="store_true", help="don't append this run to the history")
+    parser.add_argument("--accept", action="store_true",
+                        help="record this run as the new baseline even if it regressed (intended slowdown)")
+    parser.add_argument("--golden-only", action="store_true", help="run the golden checks, skip timing")
+    parser.add_argument("--update-golden", action="store_true",
+                        help="rewrite the golden file from the current code (after an intended change)")
+    args = parser.parse_args()
+
+    if args.update_golden:
+        with open(args.golden, "w", encoding="utf-8") as f:
+            json.dump(golden_values(), f, indent=1, ensure_ascii=False)
+            f.write("\n")
+        print(f"  golden values written to {args.golden}")
+        sys.exit(0)
+
+    print("═" * 80)
+    print("  Pricing engine — golden checks and benchmarks")
+    print("═" * 80)
+    with open(args.golden, encoding="utf-8") as f:
+        golden = json.load(f)
+    failures = {
+        "Golden break-evens, caps and report": check_golden(golden),
+        "Kernels vs scalar helpers": check_kernels(),
+        "Cached vs direct reports": check_cache(),
+        "Locale caps and prices": check_locales(),
+        "Bill store reloads": check_store(),
+        "Elasticities vs tornado": check_sensitivity(),
+    }
+    for title, found in failures.items():
+        print_failures(title, found)
+    failed = any(failures.values())
+    if args.golden_only:
+        sys.exit(1 if failed else 0)
+
+    history = load_history(args.history)
+    machine = machine_key()
+    base = baselines(history, machine)
+    results = run_benchmarks(args.only, args.repeats, args.scale)
+    if args.scale != 1.0:
+        base = {}                       # other workload sizes aren't comparable
+    print_results(results, base, args.threshold)
+    slow = regressions(results, base, args.threshold)
+    for name, b, now, change in slow:
+        print(f"\n  ✗ {name} regressed {change:+.1%} ({b:,.0f} → {now:,.0f} items/s, "
+              f"threshold −{args.threshold:.0%})")
+
+    # A regressed run is not recorded, or a persistent slowdown would become the median baseline
+    if slow and args.accept:
+        print("\n  Regression accepted: this run is the new baseline for its benchmarks")
+    elif slow:
+        print("\n  Not recorded; rerun with --accept if the slowdown is intended")
+    if not args.no_record and not failed and (not slow or args.accept) and args.scale == 1.0:
+        history.append({
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "machine": machine,
+            "results": results,
+            **({"accepted": True} if args.accept else {}),
+        })
+        save_history(history, args.history)
+    sys.exit(1 if failed or (slow and not args.accept) else 0)
@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+Script: pricing_cache.py
+Created: 2026-10-18
+Purpose: Incremental report builds — section and per-tier results memoized (LRU) in process and on disk, keyed on the config fields each one reads
+Keywords: pricing, cache, memoization, incremental, dependencies, lru, sqlite, foody7
+Status: active
+"""
+
+import argparse
+import hashlib
+import json
+import pickle
+import sqlite3
+import sys
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import pricing_calculator as pc
+import pricing_render as pr
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+
+CACHE_PATH = Path(__file__).with_name(".pricing_cache.sqlite")
+MAX_BYTES = 256 * 2**20        # on-disk budget; least recently used entries go first
+MAX_ENTRIES = 4_096            # in-process results kept; least recently used go first
+FORMAT_VERSION = 2
+
+# Sections whose rows (or columns) are independent per tier: they are built one
+# tier at a time, so a changed tier price rebuilds only that tier's cells.
+#   rows:    each tier contributes its own rows
+#   columns: each tier contributes one trailing column to every row
+# Sections left out (overflow pairs adjacent tiers; effective-pct headlines
+# follow their own order) are cached whole.
+SPLIT = {
+    "breakeven":       "rows",
+    "recommendation":  "rows",
+    "caps":            "rows",
+    "revenue":         "columns",
+    "restaurant-cost": "columns",
+}
+
+FIELDS = tuple(f for f in pc.PricingConfig.__slots__ if f != "name")
+_TIER_FIELDS = ("tiers", "tier_caps")         # the fields fragment_configs narrows to one tier
+
+# ─────────────────────────────────────────────
+# DEPENDENCY TRACKING
+# ─────────────────────────────────────────────
+
+class TrackedConfig:
+    """Read-only view of a PricingConfig that records which fields a builder reads"""
+
+    def __init__(self, cfg):
+        object.__setattr__(self, "_cfg", cfg)
+        object.__setattr__(self, "reads", set())
+
+    def __getattr__(self, name):
+        if name in FIELDS:
+            self.reads.add(name)
+        return getattr(self._cfg, name)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("TrackedConfig is read-only")
+
+def _freeze(value):
+    """Hashable form of a config field (tiers and caps are dicts, baskets are lists)"""
+    if isinstance(value, dict):
+        value = tuple(value.items())
+    elif isinstance(value, list):
+        value = tuple(value)
+    else:
+        return value
+    try:
+        hash(value)
+    except TypeError:                   # nested containers
+        return tuple(_freeze(list(v) if isinstance(v, tuple) else v) for v in value)
+    return value
+
+class _Frozen(dict):
+    """Config fields frozen on first use, once per config; a tier fragment's
+    config shares every field but its tiers with the parent config"""
+
+    def __init__(self, cfg, parent=None):
+        super().__init__()
+        self.cfg = cfg
+        self.parent = parent
+
+    def __missing__(self, field):
+        if self.parent is not None and field not in _TIER_FIELDS:
+            value = self[field] = self.parent[field]
+        else:
+            value = self[field] = _freeze(getattr(self.cfg, field))
+        return value
+
+def code_version():
+    """Hash of the code that produces section results; a change invalidates every stored entry"""
+    h = hashlib.sha256(str(FORMAT_VERSION).encode())
+    for module in (pc, pr):
+        h.update(Path(module.__file__).read_bytes())
+    return h.hexdigest()[:16]
+
+# ─────────────────────────────────────────────
+# PER-TIER FRAGMENTS
+# ─────────────────────────────────────────────
+
+def fragment_configs(section, cfg):
+    """(tier, config) pairs a split section is built from, one single-tier config each"""
+    return [(name, cfg.replace(tiers={name: price},
+                               tier_caps={name: cfg.tier_caps[name]} if name in cfg.tier_caps else {}))
+            for name, price in cfg.tiers.items()]
+
+def merge_fragments(parts, mode):
+    """One SectionResult from per-tier fragments, in tier order"""
+    if len(parts) == 1:
+        return parts[0]
+    first = parts[0]
+    params = {}
+    for key, value in first.params.items():
+        if isinstance(value, dict):
+            value = {k: v for p in parts for k, v in p.params[key].items()}
+        params[key] = value
+    merged = pr.SectionResult(first.key, first.title, params, notes=first.notes)
+    for name, table in first.tables.items():
+        tables = [p.tables[name] for p in parts]
+        if mode == "rows":
+            merged.add_table(pr.Table(name, table.columns, [r for t in tables for r in t.rows], table.keys))
+        else:
+            n = len(table.columns) - 1
+            columns = table.columns[:n] + [t.columns[n] for t in tables]
+            rows = [row[:n] + [t.rows[i][n] for t in tables] for i, row in enumerate(table.rows)]
+            merged.add_table(pr.Table(name, columns, rows, table.keys))
+    return merged
+
+# ─────────────────────────────────────────────
+# STORE — SQLite on disk, shared across runs
+# ─────────────────────────────────────────────
+
+class ResultCache:
+    """Pickled results by key with LRU eviction, plus the per-section dependency manifest.
+
+    Recency updates from hits are batched and written with the next new
+    entry or on close(), so a warm lookup never writes to the database. One process at a time is expected
+    to write (pricing_sweep workers memoize in process instead).
+    """
+
+    def __init__(self, path=CACHE_PATH, max_bytes=MAX_BYTES):
+        self.path = str(path)
+        self.max_bytes = max_bytes
+        self.conn = sqlite3.connect(self.path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, used REAL NOT NULL);
+            CREATE INDEX IF NOT EXISTS results_used ON results(used);
+            CREATE TABLE IF NOT EXISTS deps (
+                version TEXT NOT NULL, section TEXT NOT NULL, fields TEXT NOT NULL,
+                PRIMARY KEY (version, section));
+        """)
+        self.version = code_version()
+        self.deps = {s: tuple(json.loads(f)) for s, f in self.conn.execute(
+            "SELECT section, fields FROM deps WHERE version = ?", (self.version,))}
+        self.bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        self.touched = {}
+        self.dirty = False
+        self.hits = self.misses = 0
+
+    def close(self):
+        self.flush(force=True)
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _digest(self, key):
+        blob = json.dumps([self.version, *key], default=str)
+        return hashlib.sha256(blob.encode()).hexdigest()
+
+    def get(self, key):
+        digest = self._digest(key)
+        row = self.conn.execute("SELECT value FROM results WHERE key = ?", (digest,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.touched[digest] = time.time()
+        self.hits += 1
+        return pickle.loads(row[0])
+
+    def put(self, key, value):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self.conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                          (self._digest(key), blob, len(blob), time.time()))
+        self.bytes += len(blob)
+        self.dirty = True
+
+    def set_deps(self, section, fields):
+        self.deps[section] = fields
+        self.conn.execute("INSERT OR REPLACE INTO deps VALUES (?, ?, ?)",
+                          (self.version, section, json.dumps(list(fields))))
+        self.dirty = True
+
+    def flush(self, force=False):
+        """Evict down to max_bytes and commit new entries, with the batched recency
+        updates; hits alone are written only when forced (close() does)"""
+        if self.touched and (self.dirty or force):
+            self.conn.executemany("UPDATE results SET used = ? WHERE key = ?",
+                                  [(t, k) for k, t in self.touched.items()])
+            self.touched.clear()
+            self.dirty = True
+        if self.bytes > self.max_bytes:
+            self.bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+            excess, doomed = self.bytes - self.max_bytes, []
+            for key, size in self.conn.execute("SELECT key, size FROM results ORDER BY used"):
+                if excess <= 0:
+                    break
+                doomed.append((key,))
+                excess -= size
+                self.bytes -= size
+            self.conn.executemany("DELETE FROM results WHERE key = ?", doomed)
+        if self.dirty:
+            self.conn.commit()
+            self.dirty = False
+
+    def clear(self):
+        self.conn.execute("DELETE FROM results")
+        self.conn.execute("DELETE FROM deps")
+        self.conn.commit()
+        self.deps.clear()
+        self.touched.clear()
+        self.bytes = 0
+
+    def stats(self):
+        entries, size = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        return {"entries": entries, "bytes": size, "hits": self.hits, "misses": self.misses}
+
+# ─────────────────────────────────────────────
+# MEMO — in-process LRU, optionally backed by a ResultCache
+# ─────────────────────────────────────────────
+
+class SectionMemo:
+    """Section results by (section, tier, values of the fields it reads), LRU-bounded.
+
+    Which fields a builder reads can depend on config values (with no tiers,
+    no commission field is ever read), so every miss runs its builder through
+    TrackedConfig and adds what it read to the section's dependency set. Keys
+    name their fields, so entries stored before the set grew stop matching
+    rather than answering for a config they never saw. Split sections are
+    kept whole and per tier: a tier edit misses the whole result but rebuilds
+    only the edited tier's fragment. Hits return the stored SectionResult
+    itself, so callers must treat results as read-only (the renderers and
+    pricing_sweep.flatten do).
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, store=None):
+        self.max_entries = max_entries
+        self.store = store
+        self.results = OrderedDict()
+        self.deps = {} if store is None else dict(store.deps)   # section → sorted field names
+        self.hits = self.misses = 0
+        self.rebuilt = []
+
+    def key(self, section, tier, frozen):
+        """frozen: a per-config _Frozen; None until the section has been built once"""
+        fields = self.deps.get(section)
+        if fields is None:
+            return None
+        return (section, tier, *[(f, frozen[f]) for f in fields])
+
+    def get(self, key):
+        if key is None:
+            return None
+        result = self.results.get(key)
+        if result is not None:
+            self.results.move_to_end(key)
+        elif self.store is not None:
+            result = self.store.get(key)
+            if result is not None:
+                self._remember(key, result)
+        if result is not None:
+            self.hits += 1
+        return result
+
+    def _remember(self, key, result):
+        self.results[key] = result
+        if len(self.results) > self.max_entries:
+            self.results.popitem(last=False)
+
+    def put(self, key, result):
+        self._remember(key, result)
+        if self.store is not None:
+            self.store.put(key, result)
+
+    def _run(self, section, tier, cfg, frozen):
+        """Build on a TrackedConfig, widen the section's dependencies, store"""
+        tracked = TrackedConfig(cfg)
+        result = pc.SECTIONS[section][0](tracked)
+        fields = tuple(sorted(tracked.reads.union(self.deps.get(section, ()))))
+        if fields != self.deps.get(section):
+            self.deps[section] = fields
+            if self.store is not None:
+                self.store.set_deps(section, fields)
+        self.misses += 1
+        self.rebuilt.append((section, tier))
+        self.put(self.key(section, tier, frozen), result)
+        return result
+
+    def build(self, section, cfg, frozen):
+        result = self.get(self.key(section, None, frozen))
+        if result is not None:
+            return result
+        if section not in SPLIT or len(cfg.tiers) < 2:
+            return self._run(section, None, cfg, frozen)
+        parts = []
+        for tier, part_cfg in fragment_configs(section, cfg):
+            part_frozen = _Frozen(part_cfg, frozen)
+            part = self.get(self.key(section, tier, part_frozen))
+            parts.append(part if part is not None else self._run(section, tier, part_cfg, part_frozen))
+        result = merge_fragments(parts, SPLIT[section])
+        self.put(self.key(section, None, frozen), result)
+        return result
+
+    def clear(self):
+        self.results.clear()
+        self.deps.clear()
+        if self.store is not None:
+            self.store.clear()
+
+    def stats(self):
+        return {"entries": len(self.results), "hits": self.hits, "misses": self.misses}
+
+# ─────────────────────────────────────────────
+# MEMOIZED BUILDS
+# ─────────────────────────────────────────────
+
+def build_sections(keys=None, cfg=None, memo=None):
+    """pricing_calculator.build_sections, reusing every memoized section/tier result"""
+    keys = list(pc.SECTIONS) if keys is None else keys
+    unknown = [k for k in keys if k not in pc.SECTIONS]
+    if unknown:
+        raise ValueError(f"unknown sections: {', '.join(unknown)} (choose from {', '.join(pc.SECTIONS)})")
+    cfg = cfg or pc.PricingConfig()
+    memo = default_memo() if memo is None else memo
+    frozen = _Frozen(cfg)
+    results = [memo.build(section, cfg, frozen) for section in keys]
+    if memo.store is not None:
+        memo.store.flush()
+    return results
+
+def render_report(keys=None, fmt="text", cfg=None, memo=None):
+    """pricing_calculator.render_report over memoized section results"""
+    renderer = pc.text_renderer() if fmt == "text" else pr.RENDERERS[fmt]()
+    return pr.render_to_string(renderer, build_sections(keys, cfg, memo))
+
+_DEFAULT = SectionMemo()
+
+def default_memo():
+    """The process-wide in-memory memo (each sweep worker process has its own)"""
+    return _DEFAULT
+
+# ─────────────────────────────────────────────
+# MAIN — iterative session demo
+# ─────────────────────────────────────────────
+
+def _timed(fn, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        out = fn()
+    return out, (time.perf_counter() - start) / repeats * 1000
+
+def _step(memo, cfg, label, repeats):
+    """One edit of the session: a memoized build after the edit vs a direct rebuild"""
+    memo.rebuilt.clear()
+    start = time.perf_counter()
+    build_sections(cfg=cfg, memo=memo)
+    first = (time.perf_counter() - start) * 1000
+    rebuilt = ", ".join(s if t is None else f"{s}[{t}]" for s, t in memo.rebuilt) or "nothing"
+    _, warm = _timed(lambda: build_sections(cfg=cfg, memo=memo), repeats)
+    _, direct = _timed(lambda: list(pc.build_sections(cfg=cfg)), repeats)
+    print(f"  {label:<24} {first:>8.3f} {warm:>8.3f} {direct:>8.3f}   rebuilt: {rebuilt}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[2])
+    parser.add_argument("--cache", default=str(CACHE_PATH), help="cache database path")
+    parser.add_argument("--clear", action="store_true", help="empty the cache first")
+    parser.add_argument("--repeats", type=int, default=200, help="timed builds per step")
+    parser.add_argument("--deps", action="store_true", help="print the recorded dependencies per section")
+    args = parser.parse_args()
+
+    with ResultCache(args.cache) as store:
+        if args.clear:
+            store.clear()
+        memo = SectionMemo(store=store)
+        base = pc.PricingConfig()
+        print("═" * 80)
+        print("  Incremental section builds (ms per build of all sections)")
+        print("═" * 80)
+        print(f"  {'Edit':<24} {'first':>8} {'warm':>8} {'direct':>8}")
+        print("  " + "─" * 76)
+        _step(memo, base, "default config", args.repeats)
+        if render_report(cfg=base, memo=memo) != pc.render_report():
+            sys.exit("memoized report differs from pricing_calculator.render_report()")
+        _step(memo, base.replace(tiers={**base.tiers, "F170": 180_000}), "F170 → ₩180,000", args.repeats)
+        _step(memo, base.replace(infra_rate=0.03), "infra rate → 3.0%", args.repeats)
+        _step(memo, base.replace(competitor_rate=0.30), "competitor rate → 30%", args.repeats)
+        _step(memo, base, "back to default", args.repeats)
+        print("\n  first: the build right after the edit (served from disk when an earlier run")
+        print("  saw it); warm: the same config again; direct: pricing_calculator.build_sections.")
+        if args.deps:
+            print()
+            for section in pc.SECTIONS:
+                print(f"  {section:<16} {', '.join(memo.deps.get(section, ())) or '—'}")
+        s = store.stats()
+        print(f"\n  {s['entries']:,} entries, {s['bytes'] / 1024:,.0f} KiB on disk; "
+              f"{memo.hits:,} hits / {memo.misses:,} misses this run ({s['hits']:,} from disk)")
@@ -7,6 +7,11 @@ Keywords: pricing, monetization, commission, subscription, korea, foody7, tiers
 Status: active
 """
 
+import json
+import sys
+
+from pricing_render import RENDERERS, SectionResult, Table, TextRenderer, render_to_string
+
 # ─────────────────────────────────────────────
 # CONFIG — tweak these to explore scenarios
 # ─────────────────────────────────────────────
@@ -14,6 +19,7 @@ Status: active
 COMMISSION_RATE   = 0.07   # 7% of food order value
 INFRA_COST_RATE   = 0.035  # 3.5% per order (payment processing ~2.5% + hosting/ops ~1%)
 COMPETITOR_RATE   = 0.27   # Baemin/Coupang after 2024 hike
+CAP_FACTOR        = 0.8    # Section 5: cap at 80% of the infra break-even
 
 # Subscription tiers to evaluate (KRW / month)
 TIERS = {
@@ -23,6 +29,15 @@ TIERS = {
     "F700": 700_000,
 }
 
+# Order caps as published on the pricing page (locales/*.json pricingTier*Cap)
+# Billing uses these; order_cap() derives the analytical cap from infra cost.
+TIER_CAPS = {
+    "F70":  65,
+    "F170": 194,
+    "F350": 399,
+    "F700": 799,
+}
+
 # Average food order values to model (KRW)
 # Korea range: convenience snack ~₩12k, casual ~₩25k, sit-down ~₩45k
 AVG_ORDER_VALUES = [12_000, 18_000, 25_000, 30_000, 38_000, 45_000]
@@ -31,35 +46,133 @@ AVG_ORDER_VALUES = [12_000, 18_000, 25_000, 30_000, 38_000, 45_000]
 ORDER_RANGE = [10, 25, 50, 75, 100, 150, 200, 300, 500, 700, 1000]
 
 # ─────────────────────────────────────────────
-# HELPERS
+# CONFIG OBJECT — one scenario, so several can run in one process
 # ─────────────────────────────────────────────
 
-def commission_per_order(avg):
-    return avg * COMMISSION_RATE
+class PricingConfig:
+    """Pricing scenario; any field left as None takes the module CONFIG value"""
+
+    __slots__ = ("name", "commission_rate", "infra_rate", "competitor_rate", "cap_factor",
+                 "tiers", "tier_caps", "avg_order_values", "order_range", "infra_model")
+
+    def __init__(self, name="default", commission_rate=None, infra_rate=None,
+                 competitor_rate=None, cap_factor=None, tiers=None, tier_caps=None,
+                 avg_order_values=None, order_range=None, infra_model=None):
+        self.name = name
+        self.commission_rate = COMMISSION_RATE if commission_rate is None else commission_rate
+        self.infra_rate = INFRA_COST_RATE if infra_rate is None else infra_rate
+        self.competitor_rate = COMPETITOR_RATE if competitor_rate is None else competitor_rate
+        self.cap_factor = CAP_FACTOR if cap_factor is None else cap_factor
+        self.tiers = dict(TIERS if tiers is None else tiers)
+        self.tier_caps = dict(TIER_CAPS if tier_caps is None else tier_caps)
+        self.avg_order_values = list(AVG_ORDER_VALUES if avg_order_values is None else avg_order_values)
+        self.order_range = list(ORDER_RANGE if order_range is None else order_range)
+        # pricing_infra spec (dict or list of dicts) for Sections 2 and 5; None = flat infra_rate
+        self.infra_model = infra_model
+
+    def __repr__(self):
+        return f"PricingConfig({self.name!r})"
+
+    def __eq__(self, other):
+        return isinstance(other, PricingConfig) and self.to_dict() == other.to_dict()
+
+    def to_dict(self):
+        return {f: getattr(self, f) for f in self.__slots__}
+
+    def tier_cap(self, name):
+        """Published order cap for a tier; a tier without one gets Section 5's
+        order_cap at the canonical ₩25,000 basket, scaled by cap_factor"""
+        if name in self.tier_caps:
+            return self.tier_caps[name]
+        return order_cap(self.tiers[name], 25_000, self.cap_factor, self)
+
+    def replace(self, **changes):
+        return PricingConfig(**{**self.to_dict(), **changes})
+
+    @classmethod
+    def from_dict(cls, data, name=None):
+        unknown = set(data) - set(cls.__slots__)
+        if unknown:
+            raise ValueError(f"unknown config keys: {', '.join(sorted(unknown))}")
+        if name is not None:
+            data = {"name": name, **data}
+        return cls(**data)
+
+    @classmethod
+    def from_file(cls, path):
+        """JSON or TOML file; keys as in __slots__, missing keys use the defaults"""
+        from pathlib import Path
+        path = Path(path)
+        if path.suffix == ".toml":
+            import tomllib
+            with open(path, "rb") as f:
+                data = tomllib.load(f)
+        else:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        return cls.from_dict(data, name=data.get("name", path.stem))
 
-def foody7_net_per_order(avg):
-    """Foody7 margin after infrastructure costs (commission-only plan)"""
-    return avg * (COMMISSION_RATE - INFRA_COST_RATE)
+# ─────────────────────────────────────────────
+# HELPERS — cfg=None reads the module CONFIG
+# ─────────────────────────────────────────────
+
+def commission_per_order(avg, cfg=None):
+    return avg * (COMMISSION_RATE if cfg is None else cfg.commission_rate)
 
-def foody7_net_subscription(tier_price, orders, avg):
+def foody7_net_per_order(avg, cfg=None):
+    """Foody7 margin after infrastructure costs (commission-only plan)"""
+    if cfg is None:
+        return avg * (COMMISSION_RATE - INFRA_COST_RATE)
+    return avg * (cfg.commission_rate - cfg.infra_rate)
+
+_INFRA_MODELS = {}
+
+def infra_model(cfg=None):
+    """cfg.infra_model built by pricing_infra, one model per spec so its compiled
+    form is reused; None when the config uses the flat infra_rate"""
+    spec = None if cfg is None else cfg.infra_model
+    if spec is None:
+        return None
+    key = json.dumps(spec, sort_keys=True)
+    if key not in _INFRA_MODELS:
+        import pricing_infra
+        _INFRA_MODELS[key] = pricing_infra.from_spec(spec)
+    return _INFRA_MODELS[key]
+
+def infra_cost(orders, avg, cfg=None):
+    """Foody7's monthly infra cost for a restaurant (cfg.infra_model if set)"""
+    model = infra_model(cfg)
+    if model is not None:
+        return float(model.cost(orders, avg))
+    return orders * avg * (INFRA_COST_RATE if cfg is None else cfg.infra_rate)
+
+def foody7_net_subscription(tier_price, orders, avg, cfg=None):
     """Foody7 margin on subscription: flat fee minus infra cost per order"""
-    infra = orders * avg * INFRA_COST_RATE
-    return tier_price - infra
+    return tier_price - infra_cost(orders, avg, cfg)
 
-def break_even(tier_price, avg):
+def break_even(tier_price, avg, cfg=None):
     """Minimum orders/month where subscription < commission for restaurant"""
     import math
-    return math.ceil(tier_price / commission_per_order(avg))
+    return math.ceil(tier_price / commission_per_order(avg, cfg))
 
-def sweet_spot(tier_price, avg, savings_pct=0.25):
+def sweet_spot(tier_price, avg, savings_pct=0.25, cfg=None):
     """Orders/month where restaurant saves savings_pct% vs commission"""
     # tier_price = orders * commission * (1 - savings_pct)
     # orders = tier_price / (commission * (1 - savings_pct))
     import math
-    return math.ceil(tier_price / (commission_per_order(avg) * (1 - savings_pct)))
+    return math.ceil(tier_price / (commission_per_order(avg, cfg) * (1 - savings_pct)))
+
+def order_cap(tier_price, avg, cap_factor=1.0, cfg=None):
+    """Orders/month where infra cost eats the whole tier price, scaled by cap_factor"""
+    import math
+    model = infra_model(cfg)
+    if model is not None:
+        return math.floor(float(model.max_orders(tier_price, avg)) * cap_factor)
+    infra_rate = INFRA_COST_RATE if cfg is None else cfg.infra_rate
+    return math.floor(math.floor(tier_price / (avg * infra_rate)) * cap_factor)
 
-def competitor_commission(orders, avg):
-    return orders * avg * COMPETITOR_RATE
+def competitor_commission(orders, avg, cfg=None):
+    return orders * avg * (COMPETITOR_RATE if cfg is None else cfg.competitor_rate)
 
 def fmt_krw(n):
     """Format as ₩X,XXX"""
@@ -70,118 +183,17 @@ def fmt_usd(n, rate=1350):
     return f"(~${n/rate:.0f})"
 
 # ─────────────────────────────────────────────
-# SECTION 1: Break-even + sweet-spot table
+# SECTION PROSE — fixed copy shared by every renderer
 # ─────────────────────────────────────────────
 
-def print_breakeven_table():
-    print("\n" + "═" * 80)
-    print("  SECTION 1 — Break-even & 25%-savings threshold by avg order value")
-    print("═" * 80)
-    print(f"  Commission rate: {COMMISSION_RATE*100:.0f}%  |  Infra cost: {INFRA_COST_RATE*100:.1f}%  |  Foody7 net margin: {(COMMISSION_RATE-INFRA_COST_RATE)*100:.1f}%")
-    print()
-
-    header = f"  {'Tier':<8} {'Price/mo':<14} " + "  ".join(f"{'₩'+str(v//1000)+'k':>10}" for v in AVG_ORDER_VALUES)
-    print(header)
-    print("  " + "─" * 76)
-
-    for name, price in TIERS.items():
-        row_be = f"  {name:<8} {fmt_krw(price)+' break-even':<14} "
-        row_ss = f"  {'':8} {'25% savings at':<14} "
-        be_vals = []
-        ss_vals = []
-        for avg in AVG_ORDER_VALUES:
-            be = break_even(price, avg)
-            ss = sweet_spot(price, avg)
-            be_vals.append(f"{be:>8} ord")
-            ss_vals.append(f"{ss:>8} ord")
-        print(row_be + "  ".join(be_vals))
-        print(row_ss + "  ".join(ss_vals))
-        print()
-
-# ─────────────────────────────────────────────
-# SECTION 2: Foody7 revenue — commission vs subscription
-# ─────────────────────────────────────────────
-
-def print_revenue_table():
-    avg = 25_000  # canonical Korean casual restaurant order
-    print("\n" + "═" * 80)
-    print(f"  SECTION 2 — Foody7 monthly revenue at avg order ₩25,000")
-    print("═" * 80)
-    print(f"  {'Orders/mo':<12} {'Commission':<20} " +
-          "  ".join(f"{n:<14}" for n in TIERS.keys()))
-    print("  " + "─" * 76)
-
-    for orders in ORDER_RANGE:
-        comm_rev = orders * foody7_net_per_order(avg)
-        tier_revs = []
-        for price in TIERS.values():
-            rev = foody7_net_subscription(price, orders, avg)
-            tier_revs.append(f"{fmt_krw(rev):<14}")
-        print(f"  {orders:<12} {fmt_krw(comm_rev):<20} " + "  ".join(tier_revs))
-
-    print()
-    print("  Note: subscription revenue = tier price − infra costs (3.5% × orders × avg order)")
-    print("  Subscription becomes NEGATIVE revenue if Foody7 spends more on infra than tier price")
-
-# ─────────────────────────────────────────────
-# SECTION 3: Restaurant perspective — what they pay
-# ─────────────────────────────────────────────
-
-def print_restaurant_cost_table():
-    avg = 25_000
-    print("\n" + "═" * 80)
-    print(f"  SECTION 3 — Restaurant monthly cost: 7% commission vs subscription tiers")
-    print(f"  (avg order ₩25,000, competitor Baemin rate {COMPETITOR_RATE*100:.0f}%)")
-    print("═" * 80)
-    print(f"  {'Orders/mo':<12} {'Competitor':<18} {'Our 7%':<18} " +
-          "  ".join(f"{n:<16}" for n in TIERS.keys()))
-    print("  " + "─" * 80)
-
-    for orders in ORDER_RANGE:
-        comp = competitor_commission(orders, avg)
-        our  = orders * commission_per_order(avg)
-        tier_costs = []
-        for price in TIERS.values():
-            be = break_even(price, avg)
-            flag = " ✓" if orders > be else "  "
-            tier_costs.append(f"{fmt_krw(price)}{flag:<14}")
-        print(f"  {orders:<12} {fmt_krw(comp):<18} {fmt_krw(our):<18} " + "  ".join(tier_costs))
-
-    print()
-    print("  ✓ = subscription cheaper than 7% commission at this order volume")
-
-# ─────────────────────────────────────────────
-# SECTION 4: Tier recommendation & rationale
-# ─────────────────────────────────────────────
-
-def print_tier_recommendation():
-    avg = 25_000
-    print("\n" + "═" * 80)
-    print("  SECTION 4 — Tier design recommendation")
-    print("═" * 80)
-
-    print("""
+S4_MODEL = """
   MODEL: Commission-first, subscription as natural upgrade
   ─────────────────────────────────────────────────────────
 
   Tier        Price/mo    Best for               Breaks even at    Restaurant saves vs 7% at
-  ──────────────────────────────────────────────────────────────────────────────────────────""")
-
-    descriptions = {
-        "F70":  ("New/small restaurants",  "35%+ savings"),
-        "F170": ("Mid-size active",         "30%+ savings"),
-        "F350": ("High-volume / chains",    "25%+ savings"),
-        "F700": ("Enterprise / franchise",  "20%+ savings"),
-    }
-
-    for name, price in TIERS.items():
-        be = break_even(price, avg)
-        ss = sweet_spot(price, avg, 0.30)
-        desc, savings = descriptions[name]
-        usd = fmt_usd(price)
-        print(f"  {name:<12}{fmt_krw(price)} {usd:<10} {desc:<24} {be} orders/mo      {savings} at {ss}+ orders/mo")
+  ──────────────────────────────────────────────────────────────────────────────────────────"""
 
-    print("""
+S4_RATIONALE = """
   ─────────────────────────────────────────────────────────
   NAMING RATIONALE: F70 = Foody7 plan at ₩70,000/month
   Numbers scale with typical restaurant size segments.
@@ -198,40 +210,18 @@ def print_tier_recommendation():
   ⚠ KEY INSIGHT: F70 loses money if subscriber does 100+ orders/month.
     This suggests F70 should have an order CAP (e.g., max 80 orders/mo)
     OR be priced higher (~₩100,000).
-  """)
-
-# ─────────────────────────────────────────────
-# SECTION 5: Order cap recommendation
-# ─────────────────────────────────────────────
+  """
 
-def print_order_cap_analysis():
-    avg = 25_000
-    print("═" * 80)
-    print("  SECTION 5 — Order caps per tier (to protect Foody7 margin)")
-    print("═" * 80)
-    print("""
+S5_INTRO = """
   Without caps, a restaurant on F70 doing 500 orders/month costs Foody7:
     Infra: 500 × ₩25,000 × 3.5% = ₩437,500
     Revenue: ₩70,000
     NET: −₩367,500/month per restaurant ← catastrophic
 
   With caps, restaurant hitting the cap is prompted to upgrade:
-  """)
-
-    print(f"  {'Tier':<8} {'Price':<14} {'Order cap':<14} {'Foody7 min margin':<22} {'Break-even for cap'}")
-    print("  " + "─" * 70)
+  """
 
-    # Cap = order count where subscription revenue ≈ commission revenue
-    # tier_price - cap × avg × infra_rate = 0  →  cap = tier_price / (avg × infra_rate)
-    for name, price in TIERS.items():
-        # Cap where infra costs eat all revenue
-        import math
-        cap = math.floor(price / (avg * INFRA_COST_RATE))
-        min_margin = price - cap * avg * INFRA_COST_RATE
-        be = break_even(price, avg)
-        print(f"  {name:<8} {fmt_krw(price):<14} {cap} orders/mo   {fmt_krw(min_margin):<22} {be} orders/mo")
-
-    print("""
+S5_RECOMMENDATION = """
   RECOMMENDATION:
     Set cap at 80% of the infra break-even to maintain healthy margin.
     Cap = floor(tier_price / (avg_order × infra_rate)) × 0.8
@@ -239,17 +229,9 @@ def print_order_cap_analysis():
   Alternative: no hard cap, but system AUTOMATICALLY suggests upgrade
   when commission plan would cost same as next tier. Less friction,
   same economic result.
-  """)
-
-# ─────────────────────────────────────────────
-# SECTION 6: One-page summary
-# ─────────────────────────────────────────────
+  """
 
-def print_summary():
-    print("═" * 80)
-    print("  SUMMARY — Recommended pricing structure for Foody7")
-    print("═" * 80)
-    print(f"""
+SUMMARY = """
   COMMISSION PLAN (default, no monthly fee)
     Rate:       7% of food order value
     Infra cost: 3.5% → Foody7 nets 3.5% per order
@@ -271,77 +253,15 @@ def print_summary():
 
   UPGRADE TRIGGER: System notifies restaurant when their accumulated
   commission this month > next tier price. One-click upgrade.
-  """)
-
-
-# ─────────────────────────────────────────────
-# SECTION 6: Effective % per order (marketing hook)
-# ─────────────────────────────────────────────
-
-def print_effective_pct_table():
-    """The money shot: subscription tiers expressed as effective % per order."""
-    avg = 25_000
-    print("═" * 80)
-    print("  SECTION 6 — Effective % per order on subscription (avg ₩25,000 order)")
-    print("  This is what goes on the landing page hero.")
-    print("═" * 80)
+  """
 
-    # Column: order volumes to show
-    volumes = [40, 65, 100, 150, 200, 300, 400, 500, 700]
-
-    header = f"  {'Tier / Option':<22} " + "  ".join(f"{v:>6} ord" for v in volumes)
-    print(header)
-    print("  " + "─" * 76)
-
-    # Commission row (flat, always 7%)
-    print(f"  {'7% flat (no fee)':<22} " +
-          "  ".join(f"{'7.00%':>8}" for _ in volumes))
-    print(f"  {'Baemin (competitor)':<22} " +
-          "  ".join(f"{'27.00%':>8}" for _ in volumes))
-    print("  " + "─" * 76)
-
-    # Subscription tiers
-    for name, price in TIERS.items():
-        row = f"  {name:<22} "
-        cells = []
-        for orders in volumes:
-            total_order_value = orders * avg
-            effective_pct = (price / total_order_value) * 100
-            marker = " ←" if effective_pct < COMMISSION_RATE * 100 else "   "
-            cells.append(f"{effective_pct:>6.2f}%{marker}" if marker.strip() else f"{effective_pct:>8.2f}%")
-        row += "  ".join(cells)
-        print(row)
-
-    print("""
+S6_FOOTNOTE = """
   ← = subscription cheaper than 7% flat commission at this volume
 
   HEADLINE NUMBERS (what to show on landing page):
-""")
-    highlights = [
-        ("F70",  65,  "small restaurant"),
-        ("F170", 150, "mid-size restaurant"),
-        ("F350", 300, "active restaurant"),
-        ("F700", 600, "high-volume restaurant"),
-    ]
-    for name, orders, label in highlights:
-        price = TIERS[name]
-        eff = (price / (orders * avg)) * 100
-        baemin = 27.0
-        saving_vs_baemin = baemin - eff
-        print(f"  {label} ({orders} orders/mo on {name}): effective {eff:.1f}% vs Baemin 27%  → saves {saving_vs_baemin:.1f} percentage points")
-
-# ─────────────────────────────────────────────
-# SECTION 7: Cap overflow — auto vs manual upgrade
-# ─────────────────────────────────────────────
-
-def print_overflow_logic():
-    avg = 25_000
-    print("\n" + "═" * 80)
-    print("  SECTION 7 — Cap overflow logic & cost to restaurant")
-    print("═" * 80)
+"""
 
-    tier_list = list(TIERS.items())
-    print(f"""
+S7_OPTIONS = """
   TWO OPTIONS when restaurant exceeds monthly cap:
 
   A) AUTO-UPGRADE (pre-authorized by restaurant)
@@ -355,41 +275,9 @@ def print_overflow_logic():
      If no action → remaining orders billed at standard 7% commission.
 
   COST COMPARISON at overflow (avg ₩25,000 order):
-  ─────────────────────────────────────────────────""")
-
-    print(f"  {'Scenario':<42} {'Restaurant pays':<22} {'Notes'}")
-    print("  " + "─" * 76)
-
-    # Show overflow scenarios
-    scenarios = [
-        ("F70 (65 cap) + 20 overflow at 7%",   TIERS["F70"],  65, 20,  TIERS["F170"]),
-        ("F70 (65 cap) + 20 overflow auto→F170", TIERS["F70"], 65, 20,  TIERS["F170"]),
-        ("F170 (194 cap) + 50 overflow at 7%",  TIERS["F170"], 194, 50, TIERS["F350"]),
-        ("F170 (194 cap) + 50 auto→F350",       TIERS["F170"], 194, 50, TIERS["F350"]),
-    ]
-
-    # Manual overflow: tier price + overflow orders × 7% commission
-    import math
-    for name, price in tier_list[:-1]:
-        import math
-        cap = math.floor(price / (avg * INFRA_COST_RATE))
-        overflow_amounts = [20, 50]
-        for overflow in overflow_amounts:
-            manual_cost = price + overflow * commission_per_order(avg)
-            next_name, next_price = tier_list[tier_list.index((name, price)) + 1]
-            auto_cost = next_price  # full month on next tier (simplified, real = prorated)
-            saving = manual_cost - auto_cost
+  ─────────────────────────────────────────────────"""
 
-            print(f"  {name} cap={cap}, {overflow} extra orders (manual):  "
-                  f"{fmt_krw(manual_cost):<22} = {fmt_krw(price)} + {overflow}×7%")
-            print(f"  {name} cap={cap}, {overflow} extra orders (auto→{next_name}): "
-                  f"{fmt_krw(auto_cost):<22} = flat {next_name} price")
-            diff = auto_cost - manual_cost
-            winner = "auto cheaper" if diff < 0 else "manual cheaper"
-            print(f"  {'Difference':>42} {fmt_krw(abs(diff))} ({winner})")
-            print()
-
-    print("""
+S7_DECISION = """
   KEY DESIGN DECISION:
   ─────────────────────────────────────────────────
   Auto-upgrade wins when overflow is large (30+ orders over cap).
@@ -401,18 +289,9 @@ def print_overflow_logic():
     • Smart alert: sent at 80% of cap → gives time to decide before hitting limit
     • If no action by cap: orders continue but billed at 7% (never blocked!)
     • End of month: summary shows "you paid ₩X extra vs upgrading — upgrade for next month?"
-  """)
-
-# ─────────────────────────────────────────────
-# SECTION 8: Landing page copy — key numbers
-# ─────────────────────────────────────────────
+  """
 
-def print_landing_page_numbers():
-    avg = 25_000
-    print("═" * 80)
-    print("  SECTION 8 — Landing page: the numbers to show")
-    print("═" * 80)
-    print(f"""
+S8_LANDING = """
   HERO SECTION — Choose your angle:
 
   Angle A (commission-first messaging):
@@ -447,19 +326,9 @@ def print_landing_page_numbers():
     • "You own your customer data."
     • "Cancel anytime. No lock-in contracts."
     • "Never blocked — orders always go through even at cap."
-  """)
-
-
-# ─────────────────────────────────────────────
-# SECTION 9: Branded PWA value proposition
-# ─────────────────────────────────────────────
+  """
 
-def print_pwa_value():
-    print("═" * 80)
-    print("  SECTION 9 — Branded PWA: monetary value & tier positioning")
-    print("  foody7.com/r/[slug] — restaurant's own installable app")
-    print("═" * 80)
-    print("""
+S9_PWA = """
   WHAT IT IS:
     Each restaurant gets a branded Progressive Web App at foody7.com/r/slug.
     Customers can install it on iPhone/Android — looks like a native restaurant app.
@@ -511,7 +380,424 @@ def print_pwa_value():
      ✓ Your own app at foody7.com/r/your-restaurant — installable, shareable
      ✓ As low as 4.3% commission vs Baemin's 27%
      ✓ Zero upfront cost. Start today."
-    """)
+    """
+
+# ─────────────────────────────────────────────
+# SECTION 1: Break-even + sweet-spot table
+# ─────────────────────────────────────────────
+
+def build_breakeven_table(cfg=None):
+    cfg = cfg or PricingConfig()
+    result = SectionResult(
+        "breakeven", "SECTION 1 — Break-even & 25%-savings threshold by avg order value",
+        params={"commission_rate": cfg.commission_rate, "infra_rate": cfg.infra_rate,
+                "avg_order_values": list(cfg.avg_order_values)})
+    table = result.add_table(Table("breakeven", ["tier", "price", "avg_order", "break_even", "sweet_spot_25"],
+                                   keys=["tier", "avg_order"]))
+    for name, price in cfg.tiers.items():
+        for avg in cfg.avg_order_values:
+            table.add(name, price, avg, break_even(price, avg, cfg), sweet_spot(price, avg, cfg=cfg))
+    return result
+
+def text_breakeven_table(r, w):
+    p = r.params
+    w("\n" + "═" * 80)
+    w(f"  {r.title}")
+    w("═" * 80)
+    w(f"  Commission rate: {p['commission_rate']*100:.0f}%  |  Infra cost: {p['infra_rate']*100:.1f}%  |  Foody7 net margin: {(p['commission_rate']-p['infra_rate'])*100:.1f}%")
+    w()
+
+    header = f"  {'Tier':<8} {'Price/mo':<14} " + "  ".join(f"{'₩'+str(v//1000)+'k':>10}" for v in p["avg_order_values"])
+    w(header)
+    w("  " + "─" * 76)
+
+    for name, rows in _group_by(r.table("breakeven").rows, 0):
+        price = rows[0][1]
+        row_be = f"  {name:<8} {fmt_krw(price)+' break-even':<14} "
+        row_ss = f"  {'':8} {'25% savings at':<14} "
+        w(row_be + "  ".join(f"{row[3]:>8} ord" for row in rows))
+        w(row_ss + "  ".join(f"{row[4]:>8} ord" for row in rows))
+        w()
+
+def _infra_params(cfg):
+    """Section params naming a configured infra cost model (none for the flat rate)"""
+    return {} if cfg.infra_model is None else {"infra_model": cfg.infra_model}
+
+# ─────────────────────────────────────────────
+# SECTION 2: Foody7 revenue — commission vs subscription
+# ─────────────────────────────────────────────
+
+def build_revenue_table(cfg=None):
+    cfg = cfg or PricingConfig()
+    avg = 25_000  # canonical Korean casual restaurant order
+    result = SectionResult(
+        "revenue", f"SECTION 2 — Foody7 monthly revenue at avg order ₩{avg:,}",
+        params={"avg": avg, "infra_rate": cfg.infra_rate, **_infra_params(cfg)})
+    table = result.add_table(Table("revenue", ["orders", "Commission", *cfg.tiers.keys()]))
+    for orders in cfg.order_range:
+        if cfg.infra_model is None:
+            commission = orders * foody7_net_per_order(avg, cfg)
+        else:
+            commission = orders * commission_per_order(avg, cfg) - infra_cost(orders, avg, cfg)
+        table.add(orders, commission,
+                  *(foody7_net_subscription(price, orders, avg, cfg) for price in cfg.tiers.values()))
+    return result
+
+def text_revenue_table(r, w):
+    table = r.table("revenue")
+    tiers = table.columns[2:]
+    w("\n" + "═" * 80)
+    w(f"  {r.title}")
+    w("═" * 80)
+    w(f"  {'Orders/mo':<12} {'Commission':<20} " +
+      "  ".join(f"{n:<14}" for n in tiers))
+    w("  " + "─" * 76)
+
+    for orders, comm_rev, *tier_revs in table.rows:
+        w(f"  {orders:<12} {fmt_krw(comm_rev):<20} " + "  ".join(f"{fmt_krw(rev):<14}" for rev in tier_revs))
+
+    w()
+    if "infra_model" in r.params:
+        w("  Note: subscription revenue = tier price − infra costs (configured infra cost model)")
+    else:
+        w(f"  Note: subscription revenue = tier price − infra costs ({r.params['infra_rate']*100:.1f}% × orders × avg order)")
+    w("  Subscription becomes NEGATIVE revenue if Foody7 spends more on infra than tier price")
+
+# ─────────────────────────────────────────────
+# SECTION 3: Restaurant perspective — what they pay
+# ─────────────────────────────────────────────
+
+def build_restaurant_cost_table(cfg=None):
+    cfg = cfg or PricingConfig()
+    avg = 25_000
+    result = SectionResult(
+        "restaurant-cost", "SECTION 3 — Restaurant monthly cost: 7% commission vs subscription tiers",
+        params={"avg": avg, "competitor_rate": cfg.competitor_rate, "tiers": dict(cfg.tiers)})
+    table = result.add_table(Table(
+        "restaurant_cost",
+        ["orders", "competitor", "commission", *(f"{n}_cheaper" for n in cfg.tiers)]))
+    for orders in cfg.order_range:
+        table.add(orders, competitor_commission(orders, avg, cfg), orders * commission_per_order(avg, cfg),
+                  *(orders > break_even(price, avg, cfg) for price in cfg.tiers.values()))
+    return result
+
+def text_restaurant_cost_table(r, w):
+    p = r.params
+    w("\n" + "═" * 80)
+    w(f"  {r.title}")
+    w(f"  (avg order ₩{p['avg']:,}, competitor Baemin rate {p['competitor_rate']*100:.0f}%)")
+    w("═" * 80)
+    w(f"  {'Orders/mo':<12} {'Competitor':<18} {'Our 7%':<18} " +
+      "  ".join(f"{n:<16}" for n in p["tiers"]))
+    w("  " + "─" * 80)
+
+    for orders, comp, our, *cheaper in r.table("restaurant_cost").rows:
+        tier_costs = []
+        for price, ok in zip(p["tiers"].values(), cheaper):
+            flag = " ✓" if ok else "  "
+            tier_costs.append(f"{fmt_krw(price)}{flag:<14}")
+        w(f"  {orders:<12} {fmt_krw(comp):<18} {fmt_krw(our):<18} " + "  ".join(tier_costs))
+
+    w()
+    w("  ✓ = subscription cheaper than 7% commission at this order volume")
+
+# ─────────────────────────────────────────────
+# SECTION 4: Tier recommendation & rationale
+# ─────────────────────────────────────────────
+
+TIER_DESCRIPTIONS = {
+    "F70":  ("New/small restaurants",  "35%+ savings"),
+    "F170": ("Mid-size active",         "30%+ savings"),
+    "F350": ("High-volume / chains",    "25%+ savings"),
+    "F700": ("Enterprise / franchise",  "20%+ savings"),
+}
+
+def build_tier_recommendation(cfg=None):
+    cfg = cfg or PricingConfig()
+    avg = 25_000
+    result = SectionResult(
+        "recommendation", "SECTION 4 — Tier design recommendation",
+        params={"avg": avg},
+        notes={"model": S4_MODEL, "rationale": S4_RATIONALE})
+    table = result.add_table(Table(
+        "tiers", ["tier", "price", "best_for", "break_even", "savings_label", "sweet_spot_30"]))
+    for name, price in cfg.tiers.items():
+        desc, savings = TIER_DESCRIPTIONS.get(name, ("", ""))
+        table.add(name, price, desc, break_even(price, avg, cfg), savings, sweet_spot(price, avg, 0.30, cfg))
+    return result
+
+def text_tier_recommendation(r, w):
+    w("\n" + "═" * 80)
+    w(f"  {r.title}")
+    w("═" * 80)
+
+    w(r.notes["model"])
+
+    for name, price, desc, be, savings, ss in r.table("tiers").rows:
+        usd = fmt_usd(price)
+        w(f"  {name:<12}{fmt_krw(price)} {usd:<10} {desc:<24} {be} orders/mo      {savings} at {ss}+ orders/mo")
+
+    w(r.notes["rationale"])
+
+# ─────────────────────────────────────────────
+# SECTION 5: Order cap recommendation
+# ─────────────────────────────────────────────
+
+def build_order_cap_analysis(cfg=None):
+    cfg = cfg or PricingConfig()
+    avg = 25_000
+    result = SectionResult(
+        "caps", "SECTION 5 — Order caps per tier (to protect Foody7 margin)",
+        params={"avg": avg, "infra_rate": cfg.infra_rate, **_infra_params(cfg)},
+        notes={"intro": S5_INTRO, "recommendation": S5_RECOMMENDATION})
+    table = result.add_table(Table("caps", ["tier", "price", "cap", "min_margin", "break_even"]))
+
+    # Cap = order count where subscription revenue ≈ commission revenue
+    # tier_price - cap × avg × infra_rate = 0  →  cap = tier_price / (avg × infra_rate)
+    for name, price in cfg.tiers.items():
+        # Cap where infra costs eat all revenue
+        cap = order_cap(price, avg, cfg=cfg)
+        min_margin = foody7_net_subscription(price, cap, avg, cfg)
+        table.add(name, price, cap, min_margin, break_even(price, avg, cfg))
+    return result
+
+def text_order_cap_analysis(r, w):
+    w("═" * 80)
+    w(f"  {r.title}")
+    w("═" * 80)
+    w(r.notes["intro"])
+
+    w(f"  {'Tier':<8} {'Price':<14} {'Order cap':<14} {'Foody7 min margin':<22} {'Break-even for cap'}")
+    w("  " + "─" * 70)
+    for name, price, cap, min_margin, be in r.table("caps").rows:
+        w(f"  {name:<8} {fmt_krw(price):<14} {cap} orders/mo   {fmt_krw(min_margin):<22} {be} orders/mo")
+
+    w(r.notes["recommendation"])
+
+# ─────────────────────────────────────────────
+# SECTION 6: One-page summary
+# ─────────────────────────────────────────────
+
+def build_summary(cfg=None):
+    return SectionResult("summary", "SUMMARY — Recommended pricing structure for Foody7",
+                         notes={"summary": SUMMARY})
+
+def text_summary(r, w):
+    w("═" * 80)
+    w(f"  {r.title}")
+    w("═" * 80)
+    w(r.notes["summary"])
+
+
+# ─────────────────────────────────────────────
+# SECTION 6: Effective % per order (marketing hook)
+# ─────────────────────────────────────────────
+
+def build_effective_pct_table(cfg=None):
+    """The money shot: subscription tiers expressed as effective % per order."""
+    cfg = cfg or PricingConfig()
+    avg = 25_000
+    # Column: order volumes to show
+    volumes = [40, 65, 100, 150, 200, 300, 400, 500, 700]
+    result = SectionResult(
+        "effective-pct", f"SECTION 6 — Effective % per order on subscription (avg ₩{avg:,} order)",
+        params={"avg": avg, "volumes": volumes,
+                "commission_pct": cfg.commission_rate * 100, "competitor_pct": cfg.competitor_rate * 100},
+        notes={"footnote": S6_FOOTNOTE})
+
+    # Subscription tiers
+    table = result.add_table(Table("effective", ["tier", "price", "orders", "effective_pct", "cheaper"],
+                                   keys=["tier", "orders"]))
+    for name, price in cfg.tiers.items():
+        for orders in volumes:
+            total_order_value = orders * avg
+            effective_pct = (price / total_order_value) * 100
+            table.add(name, price, orders, effective_pct, effective_pct < cfg.commission_rate * 100)
+
+    highlights = [
+        ("F70",  65,  "small restaurant"),
+        ("F170", 150, "mid-size restaurant"),
+        ("F350", 300, "active restaurant"),
+        ("F700", 600, "high-volume restaurant"),
+    ]
+    table = result.add_table(Table(
+        "headlines", ["label", "tier", "orders", "effective_pct", "saving_vs_competitor_pts"]))
+    for name, orders, label in highlights:
+        if name not in cfg.tiers:
+            continue
+        price = cfg.tiers[name]
+        eff = (price / (orders * avg)) * 100
+        table.add(label, name, orders, eff, result.params["competitor_pct"] - eff)
+    return result
+
+def text_effective_pct_table(r, w):
+    p = r.params
+    volumes = p["volumes"]
+    w("═" * 80)
+    w(f"  {r.title}")
+    w("  This is what goes on the landing page hero.")
+    w("═" * 80)
+
+    header = f"  {'Tier / Option':<22} " + "  ".join(f"{v:>6} ord" for v in volumes)
+    w(header)
+    w("  " + "─" * 76)
+
+    # Commission row (flat, always 7%)
+    flat = f"{p['commission_pct']:.0f}% flat (no fee)"
+    comm = f"{p['commission_pct']:.2f}%"
+    comp = f"{p['competitor_pct']:.2f}%"
+    w(f"  {flat:<22} " +
+      "  ".join(f"{comm:>8}" for _ in volumes))
+    w(f"  {'Baemin (competitor)':<22} " +
+      "  ".join(f"{comp:>8}" for _ in volumes))
+    w("  " + "─" * 76)
+
+    for name, rows in _group_by(r.table("effective").rows, 0):
+        cells = []
+        for _, _, _, effective_pct, cheaper in rows:
+            cells.append(f"{effective_pct:>6.2f}% ←" if cheaper else f"{effective_pct:>8.2f}%")
+        w(f"  {name:<22} " + "  ".join(cells))
+
+    w(r.notes["footnote"])
+    for label, name, orders, eff, saving in r.table("headlines").rows:
+        w(f"  {label} ({orders} orders/mo on {name}): effective {eff:.1f}% vs Baemin {p['competitor_pct']:.0f}%  → saves {saving:.1f} percentage points")
+
+# ─────────────────────────────────────────────
+# SECTION 7: Cap overflow — auto vs manual upgrade
+# ─────────────────────────────────────────────
+
+def build_overflow_logic(cfg=None):
+    cfg = cfg or PricingConfig()
+    avg = 25_000
+    result = SectionResult(
+        "overflow", "SECTION 7 — Cap overflow logic & cost to restaurant",
+        params={"avg": avg, "commission_rate": cfg.commission_rate},
+        notes={"options": S7_OPTIONS, "decision": S7_DECISION})
+    table = result.add_table(Table(
+        "overflow", ["tier", "price", "cap", "overflow", "manual_cost",
+                     "next_tier", "auto_cost", "difference", "winner"],
+        keys=["tier", "overflow"]))
+
+    # Manual overflow: tier price + overflow orders × 7% commission
+    tier_list = list(cfg.tiers.items())
+    for i, (name, price) in enumerate(tier_list[:-1]):
+        cap = order_cap(price, avg, cfg=cfg)
+        next_name, next_price = tier_list[i + 1]
+        for overflow in [20, 50]:
+            manual_cost = price + overflow * commission_per_order(avg, cfg)
+            auto_cost = next_price  # full month on next tier (simplified, real = prorated)
+            diff = auto_cost - manual_cost
+            winner = "auto cheaper" if diff < 0 else "manual cheaper"
+            table.add(name, price, cap, overflow, manual_cost, next_name, auto_cost, diff, winner)
+    return result
+
+def text_overflow_logic(r, w):
+    pct = f"{r.params['commission_rate']*100:.0f}%"
+    w("\n" + "═" * 80)
+    w(f"  {r.title}")
+    w("═" * 80)
+    w(r.notes["options"])
+
+    w(f"  {'Scenario':<42} {'Restaurant pays':<22} {'Notes'}")
+    w("  " + "─" * 76)
+
+    for name, price, cap, overflow, manual_cost, next_name, auto_cost, diff, winner in r.table("overflow").rows:
+        w(f"  {name} cap={cap}, {overflow} extra orders (manual):  "
+          f"{fmt_krw(manual_cost):<22} = {fmt_krw(price)} + {overflow}×{pct}")
+        w(f"  {name} cap={cap}, {overflow} extra orders (auto→{next_name}): "
+          f"{fmt_krw(auto_cost):<22} = flat {next_name} price")
+        w(f"  {'Difference':>42} {fmt_krw(abs(diff))} ({winner})")
+        w()
+
+    w(r.notes["decision"])
+
+# ─────────────────────────────────────────────
+# SECTION 8: Landing page copy — key numbers
+# ─────────────────────────────────────────────
+
+def build_landing_page_numbers(cfg=None):
+    return SectionResult("landing", "SECTION 8 — Landing page: the numbers to show",
+                         notes={"landing": S8_LANDING})
+
+def text_landing_page_numbers(r, w):
+    w("═" * 80)
+    w(f"  {r.title}")
+    w("═" * 80)
+    w(r.notes["landing"])
+
+
+# ─────────────────────────────────────────────
+# SECTION 9: Branded PWA value proposition
+# ─────────────────────────────────────────────
+
+def build_pwa_value(cfg=None):
+    return SectionResult("pwa", "SECTION 9 — Branded PWA: monetary value & tier positioning",
+                         params={"url": "foody7.com/r/[slug]"},
+                         notes={"pwa": S9_PWA})
+
+def text_pwa_value(r, w):
+    w("═" * 80)
+    w(f"  {r.title}")
+    w(f"  {r.params['url']} — restaurant's own installable app")
+    w("═" * 80)
+    w(r.notes["pwa"])
+
+
+# ─────────────────────────────────────────────
+# REPORT — section registry, lazy selection, buffered output
+# ─────────────────────────────────────────────
+
+# key → (builder, text formatter), in report order
+SECTIONS = {
+    "breakeven":       (build_breakeven_table,       text_breakeven_table),
+    "revenue":         (build_revenue_table,         text_revenue_table),
+    "restaurant-cost": (build_restaurant_cost_table, text_restaurant_cost_table),
+    "recommendation":  (build_tier_recommendation,   text_tier_recommendation),
+    "caps":            (build_order_cap_analysis,    text_order_cap_analysis),
+    "summary":         (build_summary,               text_summary),
+    "effective-pct":   (build_effective_pct_table,   text_effective_pct_table),
+    "overflow":        (build_overflow_logic,        text_overflow_logic),
+    "landing":         (build_landing_page_numbers,  text_landing_page_numbers),
+    "pwa":             (build_pwa_value,             text_pwa_value),
+}
+
+def _group_by(rows, col):
+    """Rows grouped by rows[i][col], in first-seen order"""
+    groups = {}
+    for row in rows:
+        groups.setdefault(row[col], []).append(row)
+    return groups.items()
+
+def build_sections(keys=None, cfg=None):
+    """Lazily build only the selected sections (all by default), in report order"""
+    keys = list(SECTIONS) if keys is None else keys
+    unknown = [k for k in keys if k not in SECTIONS]
+    if unknown:
+        raise ValueError(f"unknown sections: {', '.join(unknown)} (choose from {', '.join(SECTIONS)})")
+    cfg = cfg or PricingConfig()
+    return (SECTIONS[k][0](cfg) for k in keys)
+
+def text_renderer():
+    return TextRenderer({key: fmt for key, (_, fmt) in SECTIONS.items()})
+
+def render_report(keys=None, fmt="text", cfg=None):
+    """Build the selected sections and render them into one string"""
+    renderer = text_renderer() if fmt == "text" else RENDERERS[fmt]()
+    return render_to_string(renderer, list(build_sections(keys, cfg)))
+
+def _print_sections(*keys):
+    sys.stdout.write(render_report(list(keys)))
+
+def print_breakeven_table():       _print_sections("breakeven")
+def print_revenue_table():         _print_sections("revenue")
+def print_restaurant_cost_table(): _print_sections("restaurant-cost")
+def print_tier_recommendation():   _print_sections("recommendation")
+def print_order_cap_analysis():    _print_sections("caps")
+def print_summary():               _print_sections("summary")
+def print_effective_pct_table():   _print_sections("effective-pct")
+def print_overflow_logic():        _print_sections("overflow")
+def print_landing_page_numbers():  _print_sections("landing")
+def print_pwa_value():             _print_sections("pwa")
 
 
 # ─────────────────────────────────────────────
@@ -519,13 +805,37 @@ def print_pwa_value():
 # ─────────────────────────────────────────────
 
 if __name__ == "__main__":
-    print_breakeven_table()
-    print_revenue_table()
-    print_restaurant_cost_table()
-    print_tier_recommendation()
-    print_order_cap_analysis()
-    print_summary()
-    print_effective_pct_table()
-    print_overflow_logic()
-    print_landing_page_numbers()
-    print_pwa_value()
+    import argparse
+
+    import pricing_profile
+
+    parser = argparse.ArgumentParser(description="Foody7 monetization tier analysis")
+    parser.add_argument("--sections", help=f"comma-separated subset of: {', '.join(SECTIONS)}")
+    parser.add_argument("--format", choices=["text", *RENDERERS], default="text")
+    parser.add_argument("--out", help="write the report to a file instead of stdout")
+    parser.add_argument("--config", help="JSON/TOML scenario file overriding the CONFIG values")
+    parser.add_argument("--cache", nargs="?", const="", metavar="DB",
+                        help="reuse section/tier results from earlier runs (pricing_cache; default DB next to this script)")
+    pricing_profile.add_arguments(parser)
+    args = parser.parse_args()
+
+    keys = args.sections.split(",") if args.sections else None
+    try:
+        cfg = PricingConfig.from_file(args.config) if args.config else None
+        if args.cache is not None:
+            import pricing_cache
+            store = pricing_cache.ResultCache(args.cache or pricing_cache.CACHE_PATH)
+        with pricing_profile.session(args):
+            if args.cache is not None:
+                report = pricing_cache.render_report(keys, args.format, cfg,
+                                                     pricing_cache.SectionMemo(store=store))
+                store.close()
+            else:
+                report = render_report(keys, args.format, cfg)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(report)
+    else:
+        sys.stdout.write(report)
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Script: pricing_distribution.py
+Created: 2026-10-18
+Purpose: Distribution-aware break-even — basket-value histograms convolved by FFT into monthly GMV, bill, infra and net distributions
+Keywords: pricing, break-even, distribution, histogram, fft, convolution, probability, foody7
+Status: active
+"""
+
+import argparse
+import math
+import time
+
+import numpy as np
+
+import pricing_calculator as pc
+import pricing_montecarlo as mc
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+
+BIN_WIDTH = 100            # basket histogram resolution (KRW)
+FFT_SIZE = 1 << 15         # lattice points for every convolution
+ORDER_QUANTILE = 0.9999    # order-count distribution is truncated here and renormalised
+HIST_SAMPLES = 1_000_000   # draws used when a histogram is built from a distribution spec
+CHUNK = 64                 # order counts inverted per batched irfft
+PROBABILITY_LEVELS = (0.5, 0.9)
+
+# ─────────────────────────────────────────────
+# HISTOGRAMS AND DISTRIBUTIONS
+# ─────────────────────────────────────────────
+
+class Histogram:
+    """Probability mass on the lattice 0, width, 2·width, …"""
+
+    __slots__ = ("pmf", "width")
+
+    def __init__(self, pmf, width):
+        pmf = np.asarray(pmf, dtype=np.float64)
+        self.pmf = pmf / pmf.sum()
+        self.width = width
+
+    def values(self):
+        return np.arange(len(self.pmf)) * self.width
+
+    def mean(self):
+        return float(self.values() @ self.pmf)
+
+    def max_value(self):
+        return float(np.flatnonzero(self.pmf)[-1] * self.width)
+
+class Distribution:
+    """Discrete distribution of a monthly money amount (sorted support)"""
+
+    __slots__ = ("values", "pmf")
+
+    def __init__(self, values, pmf):
+        self.values = values
+        self.pmf = pmf
+
+    def mean(self):
+        return float(self.values @ self.pmf)
+
+    def quantile(self, q):
+        cdf = np.cumsum(self.pmf)
+        return self.values[np.searchsorted(cdf, np.asarray(q) * cdf[-1])]
+
+    def prob_below(self, x):
+        return float(self.pmf[self.values < x].sum())
+
+    def summary(self, percentiles=mc.PERCENTILES):
+        return {"mean": self.mean(),
+                **{f"p{q}": float(v) for q, v in
+                   zip(percentiles, self.quantile(np.asarray(percentiles) / 100))}}
+
+def basket_histogram(values=None, weights=None, dist=None, width=BIN_WIDTH,
+                     samples=HIST_SAMPLES, seed=7):
+    """Empirical basket-value histogram, or one built from a distribution spec"""
+    if values is None:
+        values = mc.sample(mc.BASKET_DIST if dist is None else dist,
+                           np.random.default_rng(seed), samples)
+    idx = np.rint(np.asarray(values, dtype=np.float64) / width).astype(np.int64)
+    return Histogram(np.bincount(idx, weights=weights), width)
+
+def order_count_pmf(dist=None, counts=None, quantile=ORDER_QUANTILE, samples=HIST_SAMPLES, seed=7):
+    """P(N = n orders/month) for n = 0 … n_max.
+
+    Empirical `counts` are binned directly; a lognormal spec is discretised
+    analytically (rounding to the nearest order); other specs are sampled.
+    """
+    dist = mc.ORDERS_DIST if dist is None else dist
+    if counts is not None:
+        pmf = np.bincount(np.rint(counts).astype(np.int64)).astype(np.float64)
+    elif dist["kind"] == "lognormal":
+        mu, sigma = math.log(dist["median"]), dist["sigma"]
+        n_max = math.ceil(math.exp(mu + sigma * 5.0))
+        z = (np.log(np.arange(n_max + 1) + 0.5) - mu) / (sigma * math.sqrt(2))
+        cdf = 0.5 * (1 + np.vectorize(math.erf)(z))
+        pmf = np.diff(cdf, prepend=0.0)
+    else:
+        drawn = mc.sample(dist, np.random.default_rng(seed), samples)
+        pmf = np.bincount(np.maximum(np.rint(drawn), 0).astype(np.int64)).astype(np.float64)
+    pmf /= pmf.sum()
+    n_max = int(np.searchsorted(np.cumsum(pmf), quantile)) + 1
+    pmf = pmf[:n_max + 1]
+    return pmf / pmf.sum()
+
+def scaled_lattice(hist, coef, width, length=FFT_SIZE):
+    """pmf of coef × basket on the circular lattice k × width (mod length).
+
+    Mass is split linearly between the two neighbouring lattice points, which
+    keeps the mean exact; negative values wrap around to the top of the array.
+    """
+    pos = hist.values() * (coef / width)
+    lo = np.floor(pos)
+    frac = pos - lo
+    lo = lo.astype(np.int64)
+    return (np.bincount(lo % length, hist.pmf * (1 - frac), minlength=length)
+            + np.bincount((lo + 1) % length, hist.pmf * frac, minlength=length))
+
+# ─────────────────────────────────────────────
+# CONVOLUTION KERNELS
+# ─────────────────────────────────────────────
+
+def gmv_exceeds(hist, threshold, counts, length=FFT_SIZE):
+    """P(GMV of k orders > threshold) for every k in `counts`.
+
+    The k-fold convolution of the basket histogram is phi**k in Fourier space;
+    the lattice is coarsened so the largest k fits without wrap-around.
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    uniq, inv = np.unique(counts, return_inverse=True)
+    width = max(hist.width, hist.max_value() * max(int(uniq[-1]), 1) / (length - 2))
+    phi = np.fft.rfft(scaled_lattice(hist, 1.0, width, length))
+    idx = int(math.floor(threshold / width))
+    below = np.empty(len(uniq))
+    for i in range(0, len(uniq), CHUNK):
+        k = uniq[i:i + CHUNK, np.newaxis]
+        pmf = np.fft.irfft(phi[np.newaxis] ** k, n=length)
+        below[i:i + CHUNK] = pmf[:, :idx + 1].sum(axis=1) if idx >= 0 else 0.0
+    return np.clip(1.0 - below, 0.0, 1.0)[inv]
+
+def compound(hist, order_pmf, coef_first, coef_rest=None, cap=None, offset=0.0, length=FFT_SIZE):
+    """Distribution of offset + coef_first·GMV(first min(N, cap) orders)
+    + coef_rest·GMV(remaining orders), with N ~ order_pmf.
+
+    The mixture over N is accumulated in Fourier space (Σ P(N)·phi_f^min(N,cap)
+    ·phi_r^(N−cap)+) and inverted once — no orders are sampled.
+    """
+    coef_rest = coef_first if coef_rest is None else coef_rest
+    n_max = len(order_pmf) - 1
+    cap = n_max if cap is None else min(cap, n_max)
+    top = hist.max_value()
+    first, rest = coef_first * cap * top, coef_rest * (n_max - cap) * top
+    lo, hi = min(0.0, first) + min(0.0, rest), max(0.0, first) + max(0.0, rest)
+    width = max(hi - lo, 1.0) / (length - 2)
+
+    phi_f = np.fft.rfft(scaled_lattice(hist, coef_first, width, length))
+    phi_r = np.fft.rfft(scaled_lattice(hist, coef_rest, width, length))
+    acc = np.zeros_like(phi_f)
+    power = np.ones_like(phi_f)
+    for n, q in enumerate(order_pmf):
+        if q:
+            acc += q * power
+        power *= phi_f if n < cap else phi_r
+    pmf = np.maximum(np.fft.irfft(acc, n=length), 0.0)
+
+    k = np.arange(length)
+    k = np.where(k * width <= hi + width, k, k - length)     # unwrap negative values
+    order = np.argsort(k, kind="stable")
+    return Distribution(k[order] * width + offset, pmf[order] / pmf.sum())
+
+# ─────────────────────────────────────────────
+# TIER ECONOMICS
+# ─────────────────────────────────────────────
+
+def break_even_probability(tier_price, cap, orders, hist, commission_rate=None):
+    """P(subscription cheaper than commission) at each order count.
+
+    With a cap, only the first `cap` orders are covered; the overflow is paid
+    at the commission rate either way, so the tier wins exactly when the
+    commission on the first min(N, cap) orders exceeds the tier price.
+    """
+    rate = pc.COMMISSION_RATE if commission_rate is None else commission_rate
+    k = np.minimum(np.asarray(orders, dtype=np.int64), cap)
+    return gmv_exceeds(hist, tier_price / rate, k)
+
+def probability_threshold(tier_price, cap, hist, level, commission_rate=None):
+    """Smallest N with P(subscription cheaper) ≥ level, or None if the cap blocks it.
+
+    The probability is non-decreasing in N, so this bisects on [0, cap] with
+    one single-count convolution per step.
+    """
+    def p(n):
+        return break_even_probability(tier_price, cap, [n], hist, commission_rate)[0]
+    if p(cap) < level:
+        return None
+    lo, hi = 0, cap
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if p(mid) >= level:
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+def tier_distributions(tier_price, cap, hist, order_pmf, commission_rate=None, infra_rate=None):
+    """Monthly distributions for a population on this tier: bill, infra cost, Foody7 net"""
+    rate = pc.COMMISSION_RATE if commission_rate is None else commission_rate
+    infra = pc.INFRA_COST_RATE if infra_rate is None else infra_rate
+    return {
+        "bill": compound(hist, order_pmf, 0.0, rate, cap, offset=tier_price),
+        "infra": compound(hist, order_pmf, infra),
+        "net": compound(hist, order_pmf, -infra, rate - infra, cap, offset=tier_price),
+    }
+
+def population_distributions(hist, order_pmf, commission_rate=None, infra_rate=None):
+    """Tier-independent monthly GMV, commission-plan bill and infra cost"""
+    rate = pc.COMMISSION_RATE if commission_rate is None else commission_rate
+    infra = pc.INFRA_COST_RATE if infra_rate is None else infra_rate
+    return {
+        "gmv": compound(hist, order_pmf, 1.0),
+        "commission": compound(hist, order_pmf, rate),
+        "infra": compound(hist, order_pmf, infra),
+    }
+
+# ─────────────────────────────────────────────
+# MAIN
+# ─────────────────────────────────────────────
+
+def _fmt_n(n):
+    return "—" if n is None else str(n)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[2])
+    parser.add_argument("--baskets", help="file with one basket value (KRW) per line")
+    parser.add_argument("--orders", help="file with one monthly order count per line")
+    parser.add_argument("--at", default="40,65,100,194,399",
+                        help="order counts to report P(subscription cheaper) at")
+    parser.add_argument("--config", help="pricing scenario file (JSON/TOML) for tiers and caps")
+    args = parser.parse_args()
+
+    cfg = pc.PricingConfig.from_file(args.config) if args.config else pc.PricingConfig()
+    hist = basket_histogram(np.loadtxt(args.baskets) if args.baskets else None)
+    order_pmf = order_count_pmf(counts=np.loadtxt(args.orders) if args.orders else None)
+    at = [int(x) for x in args.at.split(",")]
+    rate, infra = cfg.commission_rate, cfg.infra_rate
+
+    print("═" * 80)
+    print(f"  Distribution-aware break-even — mean basket {pc.fmt_krw(hist.mean())}, "
+          f"orders 0–{len(order_pmf) - 1}/mo")
+    print("═" * 80)
+    print(f"  {'Tier':<6} {'Fixed-avg BE':>12} {'P≥50%':>7} {'P≥90%':>7}  "
+          + " ".join(f"{'N=' + str(n):>7}" for n in at) + f" {'ms':>7}")
+    print("  " + "─" * 76)
+    for name, price in cfg.tiers.items():
+        cap = cfg.tier_cap(name)
+        start = time.perf_counter()
+        p = break_even_probability(price, cap, at, hist, rate)
+        elapsed = (time.perf_counter() - start) * 1000
+        levels = [probability_threshold(price, cap, hist, lv, rate) for lv in PROBABILITY_LEVELS]
+        print(f"  {name:<6} {pc.break_even(price, hist.mean(), cfg):>12} "
+              f"{_fmt_n(levels[0]):>7} {_fmt_n(levels[1]):>7}  "
+              + " ".join(f"{x * 100:>6.1f}%" for x in p) + f" {elapsed:>7.1f}")
+
+    print(f"\n  Foody7 net per restaurant if the whole population sat on each tier (cap overflow at {rate:.0%}):")
+    print(f"  {'Tier':<6} {'Mean':>14} {'p5':>14} {'p50':>14} {'p95':>14} {'P(net<0)':>9}")
+    print("  " + "─" * 76)
+    for name, price in cfg.tiers.items():
+        net = tier_distributions(price, cfg.tier_cap(name), hist, order_pmf, rate, infra)["net"]
+        s = net.summary()
+        print(f"  {name:<6} {pc.fmt_krw(s['mean']):>14} {pc.fmt_krw(s['p5']):>14} "
+              f"{pc.fmt_krw(s['p50']):>14} {pc.fmt_krw(s['p95']):>14} {net.prob_below(0) * 100:>8.1f}%")
+
+    pop = population_distributions(hist, order_pmf, rate, infra)
+    print("\n  Population (any plan):")
+    for key, dist in pop.items():
+        s = dist.summary()
+        print(f"    {key:<11} mean {pc.fmt_krw(s['mean']):>14}   p5 {pc.fmt_krw(s['p5']):>14}"
+              f"   p95 {pc.fmt_krw(s['p95']):>14}")
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Script: pricing_export.py
+Created: 2026-10-18
+Purpose: Columnar export of scenario grids — Parquet / Arrow IPC (dictionary-encoded labels) and memory-mapped .npy
+Keywords: pricing, export, parquet, arrow, memmap, npy, columnar, zero-copy, foody7
+Status: active
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+import pricing_calculator as pc
+import pricing_grid as pg
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+
+BATCH_CELLS = 1 << 20          # cells per Arrow record batch / Parquet row group slice
+COPY_CELLS = 1 << 24           # cells per block when filling a .npy memmap
+PARQUET_COMPRESSION = "zstd"
+
+# Competitor labels for the competitor_cost grid (both after the 2024 hike)
+COMPETITORS = {"Baemin": pc.COMPETITOR_RATE, "Coupang Eats": pc.COMPETITOR_RATE}
+
+FORMATS = ("parquet", "arrow", "npy")
+
+def _pyarrow():
+    """pyarrow is only needed for the parquet/arrow formats"""
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise ImportError("parquet/arrow export needs pyarrow (pip install pyarrow); "
+                          "--format npy works without it") from e
+    return pa
+
+# ─────────────────────────────────────────────
+# GRIDS TO EXPORT
+# ─────────────────────────────────────────────
+
+def competitor_grid(orders, avgs, competitors=None):
+    """Competitor monthly commission over (competitor, orders, avg)"""
+    competitors = COMPETITORS if competitors is None else competitors
+    rates = np.array(list(competitors.values()), dtype=np.float64)
+    values = pg.competitor_commission(np.asarray(orders, dtype=np.float64)[None, :, None],
+                                      np.asarray(avgs, dtype=np.float64)[None, None, :],
+                                      rates[:, None, None])
+    return pg.LabelledGrid(("competitor", "orders", "avg"),
+                           {"competitor": list(competitors), "orders": orders, "avg": avgs}, values)
+
+def export_grids(tiers=None, avgs=None, orders=None, commission_rates=None, infra_rates=None,
+                 competitors=None):
+    """scenario_grid outputs plus the competitor_cost grid, keyed by name"""
+    grids = pg.scenario_grid(tiers, avgs, orders, commission_rates, infra_rates)
+    coords = grids["net_commission"].coords
+    grids["competitor_cost"] = competitor_grid(coords["orders"], coords["avg"], competitors)
+    return grids
+
+# ─────────────────────────────────────────────
+# LONG (TIDY) LAYOUT — one row per cell, one column per dim
+# ─────────────────────────────────────────────
+
+def _is_label(coord):
+    return coord.dtype.kind in "OUS"
+
+def _leading_blocks(shape, cells=BATCH_CELLS):
+    """Slices of the first axis covering about `cells` cells each"""
+    inner = int(np.prod(shape[1:], dtype=np.int64)) or 1
+    step = max(1, cells // inner)
+    return [slice(a, min(a + step, shape[0])) for a in range(0, shape[0], step)]
+
+def _coord_index(shape, axis, start=0):
+    """Flat per-cell index into coords[axis] for a C-ordered block of `shape`"""
+    ix = np.arange(start, start + shape[axis], dtype=np.int64)
+    view = [1] * len(shape)
+    view[axis] = -1
+    return np.broadcast_to(ix.reshape(view), shape).ravel()
+
+def arrow_schema(grid, name):
+    """Numeric dims keep their dtype; label dims (tier, competitor) are dictionary-encoded"""
+    pa = _pyarrow()
+    fields = []
+    for d in grid.dims:
+        coord = grid.coords[d]
+        if _is_label(coord):
+            index = pa.int8() if len(coord) <= 127 else pa.int16() if len(coord) <= 32_767 else pa.int32()
+            fields.append(pa.field(d, pa.dictionary(index, pa.string())))
+        else:
+            fields.append(pa.field(d, pa.from_numpy_dtype(coord.dtype)))
+    fields.append(pa.field(name, pa.from_numpy_dtype(grid.values.dtype)))
+    meta = {"dims": json.dumps(list(grid.dims)), "grid": name}
+    return pa.schema(fields, metadata=meta)
+
+def record_batches(grid, name, cells=BATCH_CELLS):
+    """Long-format record batches, built one leading-axis block at a time"""
+    pa = _pyarrow()
+    schema = arrow_schema(grid, name)
+    labels = {d: pa.array(grid.coords[d].astype(str)) for d in grid.dims if _is_label(grid.coords[d])}
+    for block in _leading_blocks(grid.shape, cells):
+        values = grid.values[block]
+        columns = []
+        for axis, d in enumerate(grid.dims):
+            ix = _coord_index(values.shape, axis, block.start if axis == 0 else 0)
+            if d in labels:
+                index_type = schema.field(d).type.index_type
+                columns.append(pa.DictionaryArray.from_arrays(
+                    pa.array(ix.astype(index_type.to_pandas_dtype())), labels[d]))
+            else:
+                columns.append(pa.array(grid.coords[d][ix]))
+        columns.append(pa.array(np.ascontiguousarray(values).ravel()))
+        yield pa.RecordBatch.from_arrays(columns, schema=schema)
+
+def write_parquet(grid, name, path, cells=BATCH_CELLS, compression=PARQUET_COMPRESSION):
+    import pyarrow.parquet as pq
+    schema = arrow_schema(grid, name)
+    with pq.ParquetWriter(path, schema, compression=compression) as writer:
+        for batch in record_batches(grid, name, cells):
+            writer.write_batch(batch)
+
+def write_arrow(grid, name, path, cells=BATCH_CELLS):
+    """Uncompressed Arrow IPC file — opens zero-copy through a memory map"""
+    pa = _pyarrow()
+    with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, arrow_schema(grid, name)) as writer:
+        for batch in record_batches(grid, name, cells):
+            writer.write_batch(batch)
+
+def open_arrow(path):
+    """Memory-mapped Arrow IPC table; columns are views into the file, nothing is read up front"""
+    pa = _pyarrow()
+    return pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+
+# ─────────────────────────────────────────────
+# DENSE LAYOUT — values as .npy, coords in a JSON sidecar
+# ─────────────────────────────────────────────
+
+def write_npy(grid, name, directory, cells=COPY_CELLS):
+    """<name>.npy (C-ordered values, filled block by block) + <name>.json (dims, coords)"""
+    directory = Path(directory)
+    out = np.lib.format.open_memmap(directory / f"{name}.npy", mode="w+",
+                                    dtype=grid.values.dtype, shape=grid.shape)
+    for block in _leading_blocks(grid.shape, cells):
+        out[block] = grid.values[block]
+    out.flush()
+    del out
+    sidecar = {"grid": name, "dims": list(grid.dims),
+               "coords": {d: grid.coords[d].tolist() for d in grid.dims}}
+    with open(directory / f"{name}.json", "w", encoding="utf-8") as f:
+        json.dump(sidecar, f, ensure_ascii=False)
+
+def open_npy(directory, name):
+    """LabelledGrid over a read-only memmap: sel() and slicing only touch the pages they need"""
+    directory = Path(directory)
+    with open(directory / f"{name}.json", encoding="utf-8") as f:
+        sidecar = json.load(f)
+    values = np.load(directory / f"{name}.npy", mmap_mode="r")
+    return pg.LabelledGrid(sidecar["dims"], sidecar["coords"], values)
+
+# ─────────────────────────────────────────────
+# EXPORT
+# ─────────────────────────────────────────────
+
+SUFFIX = {"parquet": ".parquet", "arrow": ".arrow", "npy": ".npy"}
+
+def export(grids, directory, fmt="parquet"):
+    """Write every grid to `directory` in `fmt`; returns {name: path}"""
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown format {fmt!r} (choose from {', '.join(FORMATS)})")
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = {}
+    for name, grid in grids.items():
+        path = directory / f"{name}{SUFFIX[fmt]}"
+        if fmt == "parquet":
+            write_parquet(grid, name, path)
+        elif fmt == "arrow":
+            write_arrow(grid, name, path)
+        else:
+            write_npy(grid, name, directory)
+        paths[name] = path
+    return paths
+
+# ─────────────────────────────────────────────
+# MAIN
+# ─────────────────────────────────────────────
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[2])
+    parser.add_argument("out", help="output directory")
+    parser.add_argument("--format", choices=FORMATS, default="parquet")
+    parser.add_argument("--dense", action="store_true",
+                        help="the pricing_grid demo sweep (39 tiers × 145 baskets × 5,000 orders × rates)")
+    args = parser.parse_args()
+
+    if args.dense:
+        sweep = dict(tiers=np.arange(50_000, 1_000_001, 25_000), avgs=np.arange(8_000, 80_001, 500),
+                     orders=np.arange(1, 5_001), commission_rates=[0.05, 0.06, 0.07, 0.08],
+                     infra_rates=[0.030, 0.035, 0.040])
+    else:
+        sweep = {}
+    grids = export_grids(**sweep)
+
+    start = time.perf_counter()
+    paths = export(grids, args.out, args.format)
+    elapsed = time.perf_counter() - start
+
+    print("═" * 80)
+    print(f"  Scenario grid export — {args.format}")
+    print("═" * 80)
+    cells = 0
+    for name, path in paths.items():
+        grid = grids[name]
+        cells += grid.values.size
+        print(f"  {name:<18} {grid.values.size:>14,} cells  {path.stat().st_size / 2**20:>9.1f} MiB  {path}")
+    print(f"\n  {cells:,} cells in {elapsed:.2f}s ({cells / elapsed:,.0f} cells/s)")
+
+    # Reopen the largest grid without reading it into memory
+    name = max(grids, key=lambda n: grids[n].values.size)
+    start = time.perf_counter()
+    if args.format == "npy":
+        grid = open_npy(args.out, name)
+        probe = grid.values[(-1,) * grid.values.ndim]
+    elif args.format == "arrow":
+        probe = open_arrow(paths[name]).column(name)[-1].as_py()
+    else:
+        import pyarrow.parquet as pq
+        f = pq.ParquetFile(paths[name])
+        probe = f.read_row_group(f.num_row_groups - 1, columns=[name]).column(name)[-1].as_py()
+    print(f"  Reopened {name} and read a slice in {(time.perf_counter() - start) * 1000:.1f} ms "
+          f"(probe {probe:,.0f})")
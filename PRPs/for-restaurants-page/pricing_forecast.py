@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Script: pricing_forecast.py
+Created: 2026-10-18
+Purpose: Markov-chain plan-migration forecaster — restaurant growth, churn and plan moves projected 12–36 months
+Keywords: pricing, forecast, markov, cohort, churn, migration, revenue, infra, foody7
+Status: active
+"""
+
+import argparse
+import math
+import time
+
+import numpy as np
+
+import pricing_calculator as pc
+import pricing_grid as pg
+import pricing_montecarlo as mc
+
+# ─────────────────────────────────────────────
+# CONFIG — default portfolio dynamics
+# ─────────────────────────────────────────────
+
+MONTHS = 36
+START_RESTAURANTS = 5_000          # launch portfolio, all on commission
+NEW_PER_MONTH = 400                # sign-ups per month, on commission
+GROWTH_MU = 0.02                   # mean monthly log-growth of order volume
+GROWTH_SIGMA = 0.15                # month-to-month volume noise
+AVG_BASKET = 25_000                # basket used to price plans in cohort mode
+COMMISSION_CHURN = 0.04           # monthly churn on commission
+TIER_CHURN = {70_000: 0.02, 170_000: 0.015, 350_000: 0.012, 700_000: 0.01}   # by tier price (KRW)
+UPGRADE_PROB = 0.6                 # share acting on a cheaper, higher plan each month
+DOWNGRADE_PROB = 0.25              # share acting on a cheaper, lower plan each month
+ORDER_BUCKETS = 60                 # log-spaced volume buckets in cohort mode
+MAX_ORDERS = 5_000
+
+# ─────────────────────────────────────────────
+# PLANS — commission plus whichever tiers the scenario defines
+# ─────────────────────────────────────────────
+
+def plan_names(tiers=None):
+    return ["Commission"] + list(pc.TIERS if tiers is None else tiers)
+
+def plan_churn(tiers=None, commission=COMMISSION_CHURN, tier_churn=TIER_CHURN):
+    """(P,) monthly churn: commission first, then each tier interpolated from
+    tier_churn on log price (flat beyond the cheapest and dearest points)"""
+    tiers = pc.TIERS if tiers is None else tiers
+    points = sorted(tier_churn.items())
+    log_prices = np.log([price for price, _ in points])
+    rates = [rate for _, rate in points]
+    tier_rates = np.interp(np.log(np.maximum(list(tiers.values()), 1)), log_prices, rates)
+    return np.concatenate([[commission], tier_rates])
+
+def plan_caps(tiers=None, caps=None):
+    """caps=None: each tier's published cap, derived (PricingConfig.tier_cap) for tiers without one"""
+    if caps is not None:
+        return caps
+    cfg = pc.PricingConfig(tiers=tiers)
+    return [cfg.tier_cap(n) for n in cfg.tiers]
+
+def _churn_vector(churn, tiers):
+    """churn=None derives per-plan churn from the tiers; explicit rates must cover every plan"""
+    if churn is None:
+        return plan_churn(tiers)
+    churn = np.asarray(churn, dtype=np.float64)
+    n_plans = len(plan_names(tiers))
+    if churn.shape != (n_plans,):
+        raise ValueError(f"churn needs {n_plans} rates (commission + {n_plans - 1} tiers), got {churn.shape}")
+    return churn
+
+# ─────────────────────────────────────────────
+# TRANSITION MODEL
+# ─────────────────────────────────────────────
+
+def bucket_edges(n=ORDER_BUCKETS, max_orders=MAX_ORDERS):
+    """Volume bucket edges: [0, 1) then log-spaced up to max_orders (last bucket open)"""
+    return np.concatenate([[0.0], np.geomspace(1, max_orders, n)])
+
+def bucket_mid(edges):
+    mid = np.sqrt(np.maximum(edges[:-1], 0.5) * edges[1:])
+    return np.append(mid, edges[-1])
+
+def growth_matrix(edges, mu=GROWTH_MU, sigma=GROWTH_SIGMA):
+    """(B, B) volume transition: next = mid × lognormal(mu, sigma), re-bucketed"""
+    mid = bucket_mid(edges)
+    with np.errstate(divide="ignore"):
+        log_edges = np.log(edges)               # log(0) = -inf closes the first bucket
+    log_edges = np.append(log_edges, np.inf)
+    z = (log_edges[np.newaxis, :] - np.log(mid)[:, np.newaxis] - mu) / sigma
+    cdf = 0.5 * (1 + np.vectorize(math.erf)(z / math.sqrt(2)))
+    return np.diff(cdf, axis=1)
+
+def target_plans(orders, avg, tiers=None, caps=None, commission_rate=None):
+    """Cheapest plan index at each volume — the break-even and cap rules in one argmin.
+
+    A tier beats commission above its break-even; once volume passes a tier's
+    cap the overflow makes the next tier cheaper (the Section 4 upgrade journey).
+    """
+    tiers = pc.TIERS if tiers is None else tiers
+    return np.argmin(pg.plan_costs(orders, avg, list(tiers.values()), caps=plan_caps(tiers, caps),
+                                   commission_rate=commission_rate), axis=0)
+
+def transition_matrix(edges, avg=AVG_BASKET, tiers=None, caps=None, churn=None,
+                      up=UPGRADE_PROB, down=DOWNGRADE_PROB, mu=GROWTH_MU, sigma=GROWTH_SIGMA,
+                      commission_rate=None):
+    """(S, S) row-stochastic matrix over (plan, volume bucket) states plus 'churned'.
+
+    State p·B + b is plan p at bucket b; the last state is absorbing churn.
+    Volume moves first, then the restaurant moves towards the cheapest plan
+    at its new volume with probability `up` or `down`. churn=None uses
+    plan_churn(tiers); commission_rate=None the module rate.
+    """
+    n_buckets = len(edges)
+    n_plans = len(plan_names(tiers))
+    G = growth_matrix(edges, mu, sigma)
+    target = target_plans(bucket_mid(edges), avg, tiers, caps, commission_rate)   # (B,)
+    churn = _churn_vector(churn, tiers)
+
+    S = n_plans * n_buckets + 1
+    M = np.zeros((S, S))
+    p = np.arange(n_plans)[:, np.newaxis, np.newaxis]                  # (P, 1, 1)
+    b = np.arange(n_buckets)[np.newaxis, :, np.newaxis]               # (1, B, 1)
+    b2 = np.arange(n_buckets)[np.newaxis, np.newaxis, :]              # (1, 1, B')
+    t = target[np.newaxis, np.newaxis, :]
+    move = np.where(t > p, up, np.where(t < p, down, 0.0))            # (P, 1, B')
+    g = G[np.newaxis] * (1 - churn)[:, np.newaxis, np.newaxis]       # (P, B, B')
+    rows = np.broadcast_to(p * n_buckets + b, g.shape)
+    np.add.at(M, (rows, np.broadcast_to(t * n_buckets + b2, g.shape)), g * move)
+    np.add.at(M, (rows, np.broadcast_to(p * n_buckets + b2, g.shape)), g * (1 - move))
+    M[:-1, -1] = np.repeat(churn, n_buckets)
+    M[-1, -1] = 1.0
+    return M
+
+def state_economics(edges, avg=AVG_BASKET, tiers=None, caps=None, commission_rate=None, infra_rate=None):
+    """Per-state monthly (restaurant bill = Foody7 revenue, infra cost, orders); None rates
+    take the module CONFIG values"""
+    tiers = pc.TIERS if tiers is None else tiers
+    infra_rate = pc.INFRA_COST_RATE if infra_rate is None else infra_rate
+    mid = bucket_mid(edges)
+    bills = pg.plan_costs(mid, avg, list(tiers.values()), caps=plan_caps(tiers, caps),
+                          commission_rate=commission_rate)                # (P, B)
+    n_plans = bills.shape[0]
+    infra = np.tile(mid * avg * infra_rate, n_plans)
+    orders = np.tile(mid, n_plans)
+    return np.append(bills.ravel(), 0.0), np.append(infra, 0.0), np.append(orders, 0.0)
+
+def entry_vector(edges, count, n_plans=None, orders_dist=mc.ORDERS_DIST):
+    """`count` restaurants on commission, spread over buckets like the population"""
+    rng = np.random.default_rng(0)
+    sampled = mc.sample(orders_dist, rng, 200_000)
+    share = np.bincount(np.searchsorted(edges, sampled, side="right") - 1,
+                        minlength=len(edges)) / len(sampled)
+    n_plans = len(plan_names()) if n_plans is None else n_plans
+    x = np.zeros(len(edges) * n_plans + 1)
+    x[:len(edges)] = count * share[:len(edges)]
+    return x
+
+# ─────────────────────────────────────────────
+# COHORT FORECAST — state vector × transition matrix
+# ─────────────────────────────────────────────
+
+def forecast_cohort(months=MONTHS, start=START_RESTAURANTS, new_per_month=NEW_PER_MONTH,
+                    avg=AVG_BASKET, tiers=None, caps=None, commission_rate=None, infra_rate=None,
+                    **dynamics):
+    """Month-by-month expected portfolio; returns dict of (months,) / (months, P) arrays"""
+    edges = bucket_edges()
+    M = transition_matrix(edges, avg, tiers, caps, commission_rate=commission_rate, **dynamics)
+    revenue, infra, orders = state_economics(edges, avg, tiers, caps, commission_rate, infra_rate)
+    names = plan_names(tiers)
+    n_plans, n_buckets = len(names), len(edges)
+    x = entry_vector(edges, start, n_plans)
+    inflow = entry_vector(edges, new_per_month, n_plans)
+
+    X = np.empty((months, len(x)))
+    for m in range(months):
+        x = x @ M + inflow
+        X[m] = x
+    return {
+        "plan_names": names,
+        "plans": X[:, :-1].reshape(months, n_plans, n_buckets).sum(axis=2),
+        "churned": X[:, -1],
+        "orders": X @ orders,
+        "revenue": X @ revenue,
+        "infra": X @ infra,
+    }
+
+# ─────────────────────────────────────────────
+# AGENT FORECAST — one row per restaurant, vectorized per month
+# ─────────────────────────────────────────────
+
+def forecast_agents(n=1_000_000, months=MONTHS, new_per_month=None, tiers=None, caps=None,
+                    churn=None, up=UPGRADE_PROB, down=DOWNGRADE_PROB,
+                    mu=GROWTH_MU, sigma=GROWTH_SIGMA, seed=7, commission_rate=None, infra_rate=None):
+    """Simulate individual restaurants with their own basket sizes.
+
+    Same dynamics as the cohort chain but with continuous volumes and the
+    Monte Carlo basket distribution; sign-ups default to the cohort ratio.
+    """
+    tiers = pc.TIERS if tiers is None else tiers
+    caps = plan_caps(tiers, caps)
+    rate = pc.COMMISSION_RATE if commission_rate is None else commission_rate
+    infra_rate = pc.INFRA_COST_RATE if infra_rate is None else infra_rate
+    prices = list(tiers.values())
+    # Commission is "plan 0": price 0 and cap 0, so every bill is price + overflow
+    plan_price = np.array([0.0] + prices, dtype=np.float32)
+    plan_cap = np.array([0.0] + list(caps), dtype=np.float32)
+    new = round(n * NEW_PER_MONTH / START_RESTAURANTS) if new_per_month is None else new_per_month
+    rng = np.random.default_rng(seed)
+    # float32 state halves memory traffic; monthly totals are still summed in float64
+    volume = mc.sample(mc.ORDERS_DIST, rng, n).astype(np.float32)
+    avg = mc.sample(mc.BASKET_DIST, rng, n).astype(np.float32)
+    plan = np.zeros(n, dtype=np.int8)
+    churn = _churn_vector(churn, tiers)
+    churned = 0
+
+    out = {k: np.zeros(months) for k in ("churned", "orders", "revenue", "infra")}
+    out["plans"] = np.zeros((months, len(prices) + 1))
+    out["plan_names"] = plan_names(tiers)
+    for m in range(months):
+        # Churn first and compact, so later months only touch live restaurants
+        keep = rng.random(len(plan)) >= churn[plan]
+        churned += len(plan) - int(keep.sum())
+        volume, avg, plan = volume[keep], avg[keep], plan[keep]
+        volume *= np.exp(rng.normal(mu, sigma, len(volume)).astype(np.float32))
+        orders = np.rint(volume)
+        per_order = avg * np.float32(rate)
+        target = _cheapest(orders, per_order, plan_price, plan_cap)
+        act = rng.random(len(plan)) < np.where(target > plan, up, np.where(target < plan, down, 0.0))
+        plan[act] = target[act]
+
+        joiners = np.rint(mc.sample(mc.ORDERS_DIST, rng, new)).astype(np.float32)
+        joiner_avg = mc.sample(mc.BASKET_DIST, rng, new).astype(np.float32)
+        out["plans"][m] = np.bincount(plan, minlength=len(prices) + 1)
+        out["plans"][m, 0] += new
+        out["churned"][m] = churned
+        out["orders"][m] = orders.sum(dtype=np.float64) + joiners.sum(dtype=np.float64)
+        bill = plan_price[plan] + np.maximum(orders - plan_cap[plan], 0) * per_order
+        gmv = (orders * avg).sum(dtype=np.float64)
+        joiner_gmv = (joiners * joiner_avg).sum(dtype=np.float64)
+        out["revenue"][m] = bill.sum(dtype=np.float64) + joiner_gmv * rate
+        out["infra"][m] = (gmv + joiner_gmv) * infra_rate
+        volume = np.concatenate([volume, joiners])
+        avg = np.concatenate([avg, joiner_avg])
+        plan = np.concatenate([plan, np.zeros(new, dtype=np.int8)])
+    return out
+
+def _cheapest(orders, per_order, plan_price, plan_cap):
+    """Running argmin over plans; avoids a (P, N) cost matrix and a strided argmin"""
+    best = np.zeros(len(orders), dtype=np.int8)
+    best_cost = orders * per_order
+    for p in range(1, len(plan_price)):
+        cost = np.maximum(orders - plan_cap[p], 0)
+        cost *= per_order
+        cost += plan_price[p]
+        better = cost < best_cost
+        best[better] = p
+        np.minimum(best_cost, cost, out=best_cost)
+    return best
+
+# ─────────────────────────────────────────────
+# MAIN
+# ─────────────────────────────────────────────
+
+def print_forecast(result, title, elapsed, every=3):
+    months = len(result["revenue"])
+    print("═" * 80)
+    print(f"  {title} — {months} months in {elapsed:.2f}s")
+    print("═" * 80)
+    print(f"  {'Month':<6} " + " ".join(f"{n:>9}" for n in result["plan_names"]) +
+          f" {'Revenue':>12} {'Infra':>12} {'Net':>12}")
+    print("  " + "─" * 96)
+    for m in range(every - 1, months, every):
+        mix = " ".join(f"{c:>9,.0f}" for c in result["plans"][m])
+        net = result["revenue"][m] - result["infra"][m]
+        print(f"  {m + 1:<6} {mix} {pc.fmt_krw(result['revenue'][m]):>12} "
+              f"{pc.fmt_krw(result['infra'][m]):>12} {pc.fmt_krw(net):>12}")
+    total_net = (result["revenue"] - result["infra"]).sum()
+    print(f"\n  Cumulative Foody7 net over {months} months: {pc.fmt_krw(total_net)}"
+          f"  {pc.fmt_usd(total_net)}")
+    print(f"  Churned by month {months}: {result['churned'][-1]:,.0f} restaurants")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[2])
+    parser.add_argument("--months", type=int, default=MONTHS)
+    parser.add_argument("--start", type=int, default=START_RESTAURANTS)
+    parser.add_argument("--new", type=int, default=NEW_PER_MONTH, help="sign-ups per month")
+    parser.add_argument("--avg", type=float, default=AVG_BASKET, help="basket for cohort mode")
+    parser.add_argument("--growth", type=float, default=GROWTH_MU, help="mean monthly log-growth")
+    parser.add_argument("--config", help="pricing scenario file (JSON/TOML) for tiers, caps and rates")
+    parser.add_argument("--agents", type=int, default=0,
+                        help="also run the agent-level model with this many restaurants")
+    parser.add_argument("--every", type=int, default=3, help="print every Nth month")
+    args = parser.parse_args()
+
+    cfg = pc.PricingConfig.from_file(args.config) if args.config else pc.PricingConfig()
+    tiers, caps = cfg.tiers, [cfg.tier_cap(n) for n in cfg.tiers]
+    rates = {"commission_rate": cfg.commission_rate, "infra_rate": cfg.infra_rate}
+
+    start = time.perf_counter()
+    cohort = forecast_cohort(args.months, args.start, args.new, args.avg, tiers, caps,
+                             mu=args.growth, **rates)
+    print_forecast(cohort, f"Cohort forecast — {args.start:,} restaurants + {args.new:,}/mo",
+                   time.perf_counter() - start, args.every)
+    if args.agents:
+        start = time.perf_counter()
+        agents = forecast_agents(args.agents, args.months, tiers=tiers, caps=caps, mu=args.growth, **rates)
+        print()
+        print_forecast(agents, f"Agent forecast — {args.agents:,} restaurants",
+                       time.perf_counter() - start, args.every)
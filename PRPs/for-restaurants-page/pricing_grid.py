@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Script: pricing_grid.py
+Created: 2026-10-18
+Purpose: Vectorized scenario-grid engine — break-even, sweet-spot and net margin over broadcast arrays
+Keywords: pricing, numpy, grid, sweep, break-even, vectorized, foody7
+Status: active
+"""
+
+import time
+
+import numpy as np
+
+import pricing_calculator as pc
+
+# ─────────────────────────────────────────────
+# LABELLED GRID
+# ─────────────────────────────────────────────
+
+class LabelledGrid:
+    """N-d array with a name and a coordinate vector per axis"""
+
+    __slots__ = ("dims", "coords", "values")
+
+    def __init__(self, dims, coords, values):
+        self.dims = tuple(dims)
+        self.coords = {d: np.asarray(coords[d]) for d in self.dims}
+        self.values = np.asarray(values)
+        expected = tuple(len(self.coords[d]) for d in self.dims)
+        if self.values.shape != expected:
+            raise ValueError(f"values shape {self.values.shape} != coords shape {expected}")
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def __repr__(self):
+        axes = ", ".join(f"{d}={len(self.coords[d])}" for d in self.dims)
+        return f"LabelledGrid({axes}, dtype={self.values.dtype})"
+
+    def sel(self, **labels):
+        """Select by coordinate value, e.g. grid.sel(tier="F70", avg=25_000).
+        Returns a smaller LabelledGrid, or a scalar when every axis is selected."""
+        index = []
+        dims = []
+        for d in self.dims:
+            if d in labels:
+                hits = np.flatnonzero(self.coords[d] == labels[d])
+                if hits.size == 0:
+                    raise KeyError(f"{labels[d]!r} not in coords[{d!r}]")
+                index.append(int(hits[0]))
+            else:
+                index.append(slice(None))
+                dims.append(d)
+        unknown = set(labels) - set(self.dims)
+        if unknown:
+            raise KeyError(f"unknown dims: {sorted(unknown)}")
+        values = self.values[tuple(index)]
+        if not dims:
+            return values.item()
+        return LabelledGrid(dims, {d: self.coords[d] for d in dims}, values)
+
+# ─────────────────────────────────────────────
+# ARRAY KERNELS — broadcast versions of the pricing_calculator helpers
+# Rates default to the pricing_calculator CONFIG at call time.
+# Operation order matches the scalar helpers so results are bit-identical.
+# ─────────────────────────────────────────────
+
+def commission_per_order(avg, commission_rate=None):
+    rate = pc.COMMISSION_RATE if commission_rate is None else commission_rate
+    return np.asarray(avg, dtype=np.float64) * rate
+
+def foody7_net_per_order(avg, commission_rate=None, infra_rate=None):
+    """Foody7 margin after infrastructure costs (commission-only plan)"""
+    comm = pc.COMMISSION_RATE if commission_rate is None else np.asarray(commission_rate)
+    infra = pc.INFRA_COST_RATE if infra_rate is None else np.asarray(infra_rate)
+    return np.asarray(avg, dtype=np.float64) * (comm - infra)
+
+def infra_cost(orders, avg, infra_rate=None, infra_model=None):
+    """Monthly infra cost: flat rate, or a compiled pricing_infra model when given"""
+    if infra_model is not None:
+        return infra_model.cost(orders, avg)
+    rate = pc.INFRA_COST_RATE if infra_rate is None else np.asarray(infra_rate)
+    return np.asarray(orders, dtype=np.float64) * avg * rate
+
+def foody7_net_subscription(tier_price, orders, avg, infra_rate=None, infra_model=None):
+    """Foody7 margin on subscription: flat fee minus infra cost per order"""
+    infra = infra_cost(orders, avg, infra_rate, infra_model)
+    return np.asarray(tier_price, dtype=np.float64) - infra
+
+def foody7_net_commission(orders, avg, commission_rate=None, infra_rate=None, infra_model=None):
+    """Foody7 monthly margin on the commission plan"""
+    return (np.asarray(orders, dtype=np.float64) * commission_per_order(avg, commission_rate)
+            - infra_cost(orders, avg, infra_rate, infra_model))
+
+def break_even(tier_price, avg, commission_rate=None):
+    """Minimum orders/month where subscription < commission for restaurant"""
+    per_order = commission_per_order(avg, commission_rate)
+    return np.ceil(np.asarray(tier_price, dtype=np.float64) / per_order).astype(np.int64)
+
+def sweet_spot(tier_price, avg, savings_pct=0.25, commission_rate=None):
+    """Orders/month where restaurant saves savings_pct% vs commission"""
+    per_order = commission_per_order(avg, commission_rate)
+    return np.ceil(np.asarray(tier_price, dtype=np.float64)
+                   / (per_order * (1 - np.asarray(savings_pct)))).astype(np.int64)
+
+def order_cap(tier_price, avg, cap_factor=1.0, infra_rate=None, infra_model=None):
+    """Orders/month where infra cost eats the whole tier price, scaled by cap_factor"""
+    if infra_model is not None:
+        infra_be = infra_model.max_orders(tier_price, avg)
+        return np.floor(infra_be * cap_factor).astype(np.int64)
+    rate = pc.INFRA_COST_RATE if infra_rate is None else np.asarray(infra_rate)
+    infra_be = np.floor(np.asarray(tier_price, dtype=np.float64) / (np.asarray(avg) * rate))
+    return np.floor(infra_be * cap_factor).astype(np.int64)
+
+def plan_costs(orders, avg, tier_prices, cap_factor=1.0,
+               commission_rate=None, infra_rate=None, caps=None, infra_model=None):
+    """Restaurant monthly bill on every plan, stacked on a leading plan axis.
+
+    Plan 0 is the commission plan; plan i+1 is tier_prices[i] with its order
+    cap, overflow orders billed at the commission rate (Section 7, manual mode).
+    Caps are derived from the basket with order_cap() unless fixed per-tier
+    `caps` (e.g. the published TIER_CAPS) are given. orders and avg must
+    broadcast against each other.
+    """
+    rate = pc.COMMISSION_RATE if commission_rate is None else commission_rate
+    orders = np.asarray(orders, dtype=np.float64)
+    avg = np.asarray(avg, dtype=np.float64)
+    prices = np.asarray(tier_prices, dtype=np.float64)
+    prices = prices.reshape(prices.shape + (1,) * np.broadcast(orders, avg).ndim)
+    if caps is None:
+        caps = order_cap(prices, avg, cap_factor, infra_rate, infra_model)
+    else:
+        caps = np.asarray(caps, dtype=np.float64).reshape(prices.shape)
+    overflow = np.maximum(orders - caps, 0)
+    per_order = avg * rate
+    tiered = prices + overflow * per_order
+    commission = np.broadcast_to(orders * per_order, tiered.shape[1:])
+    return np.concatenate([commission[np.newaxis], tiered])
+
+def competitor_commission(orders, avg, competitor_rate=None):
+    rate = pc.COMPETITOR_RATE if competitor_rate is None else np.asarray(competitor_rate)
+    return np.asarray(orders, dtype=np.float64) * avg * rate
+
+# ─────────────────────────────────────────────
+# SCENARIO GRID
+# ─────────────────────────────────────────────
+
+def _axis(values, position, ndim):
+    """Reshape a 1-d coordinate vector so it broadcasts along `position`"""
+    shape = [1] * ndim
+    shape[position] = -1
+    return np.asarray(values).reshape(shape)
+
+def _tier_coords(tiers):
+    """Accept a {name: price} dict or a plain sequence of candidate prices"""
+    if isinstance(tiers, dict):
+        return np.array(list(tiers.keys())), np.array(list(tiers.values()), dtype=np.float64)
+    prices = np.asarray(tiers, dtype=np.float64)
+    return prices, prices
+
+def scenario_grid(tiers=None, avgs=None, orders=None,
+                  commission_rates=None, infra_rates=None, savings_pct=0.25, infra_model=None):
+    """Evaluate every pricing helper over the cartesian product of its inputs.
+
+    Each output keeps only the axes it depends on, so a dense sweep stays
+    small in memory:
+      break_even, sweet_spot      (tier, avg, commission_rate)
+      net_commission              (orders, avg, commission_rate, infra_rate)
+      net_subscription            (tier, orders, avg, infra_rate)
+    Inputs default to TIERS / AVG_ORDER_VALUES / ORDER_RANGE and the current rates.
+    With a compiled pricing_infra model the net grids use it instead of a
+    flat rate and drop their infra_rate axis.
+    """
+    tier_labels, tier_prices = _tier_coords(pc.TIERS if tiers is None else tiers)
+    avgs = np.asarray(pc.AVG_ORDER_VALUES if avgs is None else avgs, dtype=np.float64)
+    orders = np.asarray(pc.ORDER_RANGE if orders is None else orders, dtype=np.float64)
+    comm = np.atleast_1d(np.asarray(pc.COMMISSION_RATE if commission_rates is None
+                                    else commission_rates, dtype=np.float64))
+    infra = np.atleast_1d(np.asarray(pc.INFRA_COST_RATE if infra_rates is None
+                                     else infra_rates, dtype=np.float64))
+
+    coords = {
+        "tier": tier_labels,
+        "avg": avgs,
+        "orders": orders,
+        "commission_rate": comm,
+        "infra_rate": infra,
+    }
+
+    be_dims = ("tier", "avg", "commission_rate")
+    price3 = _axis(tier_prices, 0, 3)
+    avg3 = _axis(avgs, 1, 3)
+    comm3 = _axis(comm, 2, 3)
+
+    nc_dims = ("orders", "avg", "commission_rate", "infra_rate")
+    ns_dims = ("tier", "orders", "avg", "infra_rate")
+    if infra_model is not None:
+        nc_dims, ns_dims = nc_dims[:3], ns_dims[:3]
+        net_commission = foody7_net_commission(
+            _axis(orders, 0, 3), _axis(avgs, 1, 3), _axis(comm, 2, 3), infra_model=infra_model)
+        net_subscription = foody7_net_subscription(
+            _axis(tier_prices, 0, 3), _axis(orders, 1, 3), _axis(avgs, 2, 3), infra_model=infra_model)
+    else:
+        net_commission = _axis(orders, 0, 4) * foody7_net_per_order(
+            _axis(avgs, 1, 4), _axis(comm, 2, 4), _axis(infra, 3, 4))
+        net_subscription = foody7_net_subscription(
+            _axis(tier_prices, 0, 4), _axis(orders, 1, 4), _axis(avgs, 2, 4), _axis(infra, 3, 4))
+
+    return {
+        "break_even": LabelledGrid(
+            be_dims, coords, break_even(price3, avg3, comm3)),
+        "sweet_spot": LabelledGrid(
+            be_dims, coords, sweet_spot(price3, avg3, savings_pct, comm3)),
+        "net_commission": LabelledGrid(nc_dims, coords, net_commission),
+        "net_subscription": LabelledGrid(ns_dims, coords, net_subscription),
+    }
+
+# ─────────────────────────────────────────────
+# MAIN — dense sweep demo
+# ─────────────────────────────────────────────
+
+if __name__ == "__main__":
+    tiers = np.arange(50_000, 1_000_001, 25_000)       # 39 candidate tier prices
+    avgs = np.arange(8_000, 80_001, 500)               # ₩8k–₩80k in ₩500 steps
+    orders = np.arange(1, 5_001)                       # 1–5,000 orders/mo
+    comm = [0.05, 0.06, 0.07, 0.08]
+    infra = [0.030, 0.035, 0.040]
+
+    start = time.perf_counter()
+    grid = scenario_grid(tiers, avgs, orders, comm, infra)
+    elapsed = time.perf_counter() - start
+    cells = sum(g.values.size for g in grid.values())
+
+    print("═" * 80)
+    print("  Dense scenario sweep")
+    print("═" * 80)
+    for name, g in grid.items():
+        print(f"  {name:<18} {g!r}")
+    print(f"\n  {cells:,} cells in {elapsed*1000:.0f} ms")
+    print(f"  ₩75,000-tier break-even at ₩25,000 / 7%: "
+          f"{grid['break_even'].sel(tier=75_000, avg=25_000, commission_rate=0.07)} orders")
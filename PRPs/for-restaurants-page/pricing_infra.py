@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Script: pricing_infra.py
+Created: 2026-10-18
+Purpose: Pluggable infra-cost models (flat %, fixed + %, volume-tiered, per-restaurant fixed) compiled to array kernels
+Keywords: pricing, infra, cost-model, payment-processing, hosting, piecewise, vectorized, foody7
+Status: active
+"""
+
+import argparse
+import time
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+import pricing_calculator as pc
+import pricing_grid as pg
+
+# ─────────────────────────────────────────────
+# CONFIG — default split of the 3.5% INFRA_COST_RATE
+# ─────────────────────────────────────────────
+
+# Payment processing ≈2.5% at a ₩25k basket: ₩100/transaction + 2.1% of volume,
+# with cheaper rates once a restaurant's monthly card volume passes ₩30M / ₩100M.
+# Hosting/ops ≈1%: ₩6,000 per restaurant-month + ₩150 per order.
+DEFAULT_SPEC = [
+    {"kind": "volume_tiered", "per_order": 100,
+     "breakpoints": [0, 30_000_000, 100_000_000], "rates": [0.021, 0.019, 0.017]},
+    {"kind": "per_restaurant", "monthly": 6_000, "per_order": 150},
+]
+
+MAX_ORDERS = 1 << 20     # search bound for the cap (infra break-even) solver
+
+# ─────────────────────────────────────────────
+# COMPILED FORM
+# ─────────────────────────────────────────────
+
+class PiecewiseCost:
+    """Compiled infra cost: monthly = fixed + orders·per_order + Σ rate_j·(GMV in band j).
+
+    Bands are on monthly GMV (orders × avg) and start at breakpoints[j];
+    rates are marginal. Every model plugin compiles to this form, so one
+    broadcast kernel evaluates any model (or sum of models) over a grid.
+    """
+
+    __slots__ = ("fixed", "per_order", "breakpoints", "rates")
+
+    def __init__(self, fixed=0.0, per_order=0.0, breakpoints=(0.0,), rates=(0.0,)):
+        if len(breakpoints) != len(rates) or breakpoints[0] != 0:
+            raise ValueError("breakpoints must start at 0 and match rates one-to-one")
+        if any(b >= c for b, c in zip(breakpoints, breakpoints[1:])):
+            raise ValueError("breakpoints must be increasing")
+        self.fixed = float(fixed)
+        self.per_order = float(per_order)
+        self.breakpoints = np.asarray(breakpoints, dtype=np.float64)
+        self.rates = np.asarray(rates, dtype=np.float64)
+
+    def __repr__(self):
+        bands = ", ".join(f"{r:.2%}≥{pc.fmt_krw(b)}" for b, r in zip(self.breakpoints, self.rates))
+        return (f"PiecewiseCost(fixed={pc.fmt_krw(self.fixed)}, per_order={pc.fmt_krw(self.per_order)}, "
+                f"rates=[{bands}])")
+
+    def __add__(self, other):
+        """Sum of two compiled costs: merge the bands and add marginal rates"""
+        points = np.union1d(self.breakpoints, other.breakpoints)
+        rates = self.rate_at(points) + other.rate_at(points)
+        return PiecewiseCost(self.fixed + other.fixed, self.per_order + other.per_order, points, rates)
+
+    def rate_at(self, gmv):
+        """Marginal rate in force at each GMV level"""
+        return self.rates[np.searchsorted(self.breakpoints, gmv, side="right") - 1]
+
+    @property
+    def is_flat(self):
+        return self.fixed == 0 and self.per_order == 0 and len(self.rates) == 1
+
+    def cost(self, orders, avg):
+        """Monthly infra cost; orders and avg broadcast"""
+        orders = np.asarray(orders, dtype=np.float64)
+        gmv = orders * avg
+        if len(self.rates) == 1:
+            # Same operation order as orders * avg * INFRA_COST_RATE, so the flat
+            # model reproduces the existing kernels bit for bit
+            variable = gmv * self.rates[0]
+        else:
+            width = np.diff(self.breakpoints, append=np.inf)
+            band = np.clip(gmv[..., np.newaxis] - self.breakpoints, 0, width)
+            variable = band @ self.rates
+        if self.fixed or self.per_order:
+            return self.fixed * (orders > 0) + orders * self.per_order + variable
+        return variable
+
+    def max_orders(self, budget, avg):
+        """Largest whole order count whose infra cost fits in `budget` (the cap basis).
+
+        Flat models keep the Section 5 closed form floor(budget / (avg × rate));
+        any other model is solved by a vectorized integer bisection, which
+        only needs cost() to be non-decreasing in orders.
+        """
+        budget, avg = np.broadcast_arrays(np.asarray(budget, dtype=np.float64),
+                                          np.asarray(avg, dtype=np.float64))
+        if self.is_flat:
+            return np.floor(budget / (avg * self.rates[0]))
+        lo = np.zeros(budget.shape)
+        hi = np.full(budget.shape, float(MAX_ORDERS))
+        while np.any(hi - lo > 0):
+            mid = np.ceil((lo + hi) / 2)
+            fits = self.cost(mid, avg) <= budget
+            lo = np.where(fits, mid, lo)
+            hi = np.where(fits, hi, mid - 1)
+        return lo
+
+    def effective_rate(self, orders, avg):
+        """Infra cost as a share of GMV"""
+        orders = np.asarray(orders, dtype=np.float64)
+        return self.cost(orders, avg) / np.maximum(orders * avg, 1.0)
+
+# ─────────────────────────────────────────────
+# MODEL PLUGINS
+# ─────────────────────────────────────────────
+
+class CostModel(ABC):
+    """Plugin base: subclasses describe one cost component and compile() it.
+
+    The compiled form is built once and reused by cost()/max_orders();
+    setting any attribute drops it. A Composite's parts are a tuple, so
+    change a part by building a new model rather than in place.
+    """
+
+    kind = None
+    _compiled = None
+
+    @abstractmethod
+    def compile(self):
+        """The component as a PiecewiseCost"""
+
+    def compiled(self):
+        """compile(), cached on the model"""
+        if self._compiled is None:
+            self._compiled = self.compile()
+        return self._compiled
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name != "_compiled":
+            super().__setattr__("_compiled", None)
+
+    def __add__(self, other):
+        return Composite([self, other])
+
+    # The compiled kernels, so a model can be passed wherever one is expected
+    def cost(self, orders, avg):
+        return self.compiled().cost(orders, avg)
+
+    def max_orders(self, budget, avg):
+        return self.compiled().max_orders(budget, avg)
+
+class FlatRate(CostModel):
+    """Share of order value — today's INFRA_COST_RATE"""
+
+    kind = "flat"
+
+    def __init__(self, rate=None):
+        self.rate = pc.INFRA_COST_RATE if rate is None else rate
+
+    def compile(self):
+        return PiecewiseCost(rates=[self.rate])
+
+class FixedPlusRate(CostModel):
+    """Per-transaction fee plus a share of order value (card processing)"""
+
+    kind = "fixed_plus_rate"
+
+    def __init__(self, per_order, rate):
+        self.per_order = per_order
+        self.rate = rate
+
+    def compile(self):
+        return PiecewiseCost(per_order=self.per_order, rates=[self.rate])
+
+class VolumeTiered(CostModel):
+    """Marginal rates stepping down with monthly GMV, optional per-transaction fee"""
+
+    kind = "volume_tiered"
+
+    def __init__(self, breakpoints, rates, per_order=0.0):
+        self.breakpoints = list(breakpoints)
+        self.rates = list(rates)
+        self.per_order = per_order
+
+    def compile(self):
+        return PiecewiseCost(per_order=self.per_order, breakpoints=self.breakpoints, rates=self.rates)
+
+class PerRestaurant(CostModel):
+    """Fixed cost per active restaurant-month plus a marginal cost per order (hosting/ops)"""
+
+    kind = "per_restaurant"
+
+    def __init__(self, monthly, per_order=0.0):
+        self.monthly = monthly
+        self.per_order = per_order
+
+    def compile(self):
+        return PiecewiseCost(fixed=self.monthly, per_order=self.per_order)
+
+class Composite(CostModel):
+    kind = "composite"
+
+    def __init__(self, parts):
+        self.parts = tuple(parts)
+
+    def compile(self):
+        compiled = self.parts[0].compiled()
+        for part in self.parts[1:]:
+            compiled = compiled + part.compiled()
+        return compiled
+
+MODELS = {cls.kind: cls for cls in (FlatRate, FixedPlusRate, VolumeTiered, PerRestaurant)}
+
+def from_spec(spec):
+    """Build a model from a dict spec ({"kind": ..., **params}) or a list of them (summed)"""
+    if isinstance(spec, list):
+        return Composite([from_spec(s) for s in spec])
+    params = dict(spec)
+    kind = params.pop("kind")
+    if kind not in MODELS:
+        raise ValueError(f"unknown infra cost model: {kind!r}")
+    return MODELS[kind](**params)
+
+def default_model():
+    return from_spec(DEFAULT_SPEC).compile()
+
+# ─────────────────────────────────────────────
+# MAIN — flat rate vs the component model
+# ─────────────────────────────────────────────
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[2])
+    parser.add_argument("--spec", help="JSON file with a model spec (dict or list of dicts)")
+    args = parser.parse_args()
+
+    if args.spec:
+        import json
+        with open(args.spec, encoding="utf-8") as f:
+            model = from_spec(json.load(f)).compile()
+    else:
+        model = default_model()
+    flat = FlatRate().compile()
+    avgs = np.array(pc.AVG_ORDER_VALUES, dtype=np.float64)
+
+    print("═" * 80)
+    print("  Infra cost model — flat rate vs component model")
+    print("═" * 80)
+    print(f"  {model!r}")
+    print(f"\n  Effective infra % at 60 orders/mo:")
+    print("  " + " ".join(f"{pc.fmt_krw(a):>10}" for a in avgs))
+    print("  " + " ".join(f"{r:>10.2%}" for r in model.effective_rate(60, avgs)))
+    print(f"  (flat: {pc.INFRA_COST_RATE:.2%} everywhere)")
+
+    prices = np.array(list(pc.TIERS.values()), dtype=np.float64)[:, np.newaxis]
+    print(f"\n  Cap at {pc.CAP_FACTOR:.0%} of infra break-even (flat → model):")
+    print(f"  {'Tier':<6} " + " ".join(f"{pc.fmt_krw(a):>14}" for a in avgs))
+    flat_caps = pg.order_cap(prices, avgs, pc.CAP_FACTOR)
+    model_caps = pg.order_cap(prices, avgs, pc.CAP_FACTOR, infra_model=model)
+    for t, name in enumerate(pc.TIERS):
+        print(f"  {name:<6} " + " ".join(f"{f'{a} → {b}':>14}" for a, b in zip(flat_caps[t], model_caps[t])))
+
+    print(f"\n  Foody7 net at the flat-rate cap (flat → model):")
+    for t, name in enumerate(pc.TIERS):
+        n = flat_caps[t]
+        a_net = pg.foody7_net_subscription(prices[t], n, avgs)
+        b_net = pg.foody7_net_subscription(prices[t], n, avgs, infra_model=model)
+        print(f"  {name:<6} " + " ".join(f"{pc.fmt_krw(a) + '→' + pc.fmt_krw(b):>22}"
+                                         for a, b in zip(a_net[:3], b_net[:3])))
+
+    tiers = np.arange(50_000, 1_000_001, 25_000, dtype=np.float64)
+    grid_avgs = np.arange(8_000, 80_001, 500, dtype=np.float64)
+    orders = np.arange(1, 5_001, dtype=np.float64)
+    start = time.perf_counter()
+    net = pg.foody7_net_subscription(tiers[:, None, None], orders[None, :, None],
+                                     grid_avgs[None, None, :], infra_model=model)
+    t_net = time.perf_counter() - start
+    start = time.perf_counter()
+    caps = pg.order_cap(tiers[:, None], grid_avgs[None, :], pc.CAP_FACTOR, infra_model=model)
+    t_cap = time.perf_counter() - start
+    print(f"\n  Grid: {net.size:,} net-subscription cells in {t_net * 1000:.0f} ms, "
+          f"{caps.size:,} caps solved in {t_cap * 1000:.0f} ms")
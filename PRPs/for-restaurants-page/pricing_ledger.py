@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Script: pricing_ledger.py
+Created: 2026-10-18
+Purpose: Streaming order-ledger billing replay — per-restaurant-month bills with bounded memory
+Keywords: pricing, billing, ledger, streaming, csv, jsonl, overflow, foody7
+Status: active
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from itertools import islice
+
+import numpy as np
+
+import pricing_calculator as pc
+import pricing_money as pm
+import pricing_profile as prof
+
+CHUNK_ROWS = 100_000
+COMMISSION_PLAN = "Commission"
+
+BILL_FIELDS = [
+    "restaurant_id", "month", "plan", "orders", "gmv", "cap",
+    "overflow_orders", "overflow_gmv", "subscription_fee", "commission",
+    "total", "infra_cost", "foody7_net", "competitor_cost",
+]
+
+# ─────────────────────────────────────────────
+# READERS — yield column chunks, never the whole file
+# ─────────────────────────────────────────────
+
+def _month_keys(timestamps):
+    """'YYYY-MM' for ISO-8601 strings or unix epoch seconds"""
+    first = str(timestamps[0])
+    if len(first) >= 7 and first[4] == "-":
+        return [str(t)[:7] for t in timestamps]
+    secs = np.asarray(timestamps, dtype=np.float64).astype("datetime64[s]")
+    return secs.astype("datetime64[M]").astype(str).tolist()
+
+def _chunked(rows, chunk_rows):
+    while True:
+        batch = list(islice(rows, chunk_rows))
+        if not batch:
+            return
+        rids, stamps, values = zip(*batch)
+        yield (list(rids), _month_keys(stamps), np.asarray(values, dtype=np.float64))
+
+def read_csv(path, chunk_rows=CHUNK_ROWS):
+    """CSV with a header containing restaurant_id, timestamp, order_value"""
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        cols = [header.index(c) for c in ("restaurant_id", "timestamp", "order_value")]
+        rows = ((r[cols[0]], r[cols[1]], r[cols[2]]) for r in reader)
+        yield from _chunked(rows, chunk_rows)
+
+def read_jsonl(path, chunk_rows=CHUNK_ROWS):
+    """One JSON object per line with restaurant_id, timestamp, order_value"""
+    with open(path) as f:
+        records = (json.loads(line) for line in f if line.strip())
+        rows = ((str(r["restaurant_id"]), r["timestamp"], r["order_value"]) for r in records)
+        yield from _chunked(rows, chunk_rows)
+
+def read_orders(path, chunk_rows=CHUNK_ROWS):
+    if str(path).endswith((".jsonl", ".ndjson")):
+        return read_jsonl(path, chunk_rows)
+    return read_csv(path, chunk_rows)
+
+def load_plans(path):
+    """restaurant_id,plan CSV → {restaurant_id: plan name}"""
+    with open(path, newline="") as f:
+        return {row["restaurant_id"]: row["plan"] for row in csv.DictReader(f)}
+
+# ─────────────────────────────────────────────
+# REPLAY
+# ─────────────────────────────────────────────
+
+class LedgerReplay:
+    """Accumulates restaurant-month counters from order chunks and emits bills.
+
+    State is a set of growable arrays indexed by restaurant-month slot, so
+    memory depends on the number of open restaurant-months, not on rows.
+    With sorted_by_time=True (the default for exports) a month is billed and
+    dropped as soon as a later month appears; otherwise bills are emitted at
+    the end of the stream.
+
+    With a pricing_money.MoneyPolicy, order values must be whole won and every
+    amount is accumulated and billed as int64 under that rounding policy.
+    """
+
+    def __init__(self, plans=None, tiers=None, caps=None, sorted_by_time=True, policy=None):
+        self.plans = plans or {}
+        tiers = pc.TIERS if tiers is None else tiers
+        caps = pc.TIER_CAPS if caps is None else caps
+        self.plan_names = [COMMISSION_PLAN] + list(tiers)
+        self.plan_index = {name: i for i, name in enumerate(self.plan_names)}
+        self.policy = policy
+        self.rates = pm.ExactRates() if policy else None
+        self.money_dtype = np.int64 if policy else np.float64
+        self.plan_price = np.array([0] + [tiers[n] for n in tiers], dtype=self.money_dtype)
+        # Per-order rounding has to be applied before summing, so those sums are kept too
+        self.money_fields = ["gmv", "over_gmv"]
+        if policy and policy.granularity == pm.PER_ORDER:
+            self.money_fields += ["commission", "over_commission", "infra", "competitor"]
+        self.plan_cap = np.array([np.iinfo(np.int64).max] + [caps[n] for n in tiers], dtype=np.int64)
+        self.sorted_by_time = sorted_by_time
+
+        self.rows = 0
+        self.elapsed = 0.0
+        self._closed_before = ""
+        self._reset_state()
+
+    def _reset_state(self, keep=None):
+        if keep is None:
+            self.keys = []
+            self.slot_of = {}
+            for name in ("count", "over_count", "plan"):
+                setattr(self, name, np.zeros(0, dtype=np.int64))
+            for name in self.money_fields:
+                setattr(self, name, np.zeros(0, dtype=self.money_dtype))
+            return
+        self.keys = [self.keys[i] for i in np.flatnonzero(keep)]
+        self.slot_of = {k: i for i, k in enumerate(self.keys)}
+        for name in ("count", "over_count", "plan", *self.money_fields):
+            setattr(self, name, getattr(self, name)[keep])
+
+    def _slots(self, keys):
+        """Map unique restaurant-month keys to slots, allocating new ones"""
+        new = [k for k in keys if k not in self.slot_of]
+        if new:
+            for k in new:
+                if k[1] < self._closed_before:
+                    raise ValueError(f"order for closed month {k[1]} "
+                                     f"(restaurant {k[0]}); ledger is not sorted by time")
+                self.slot_of[k] = len(self.keys)
+                self.keys.append(k)
+            n = len(new)
+            for name in ("count", "over_count", *self.money_fields):
+                arr = getattr(self, name)
+                setattr(self, name, np.concatenate([arr, np.zeros(n, dtype=arr.dtype)]))
+            plans = [self.plan_index[self.plans.get(k[0], COMMISSION_PLAN)] for k in new]
+            self.plan = np.concatenate([self.plan, np.array(plans, dtype=np.int64)])
+        return np.fromiter((self.slot_of[k] for k in keys), dtype=np.int64, count=len(keys))
+
+    def feed(self, rids, months, values):
+        """Process one chunk; yields bills for months that closed"""
+        start = time.perf_counter()
+        keys = list(zip(rids, months))
+        _, first, inv = np.unique(np.array([r + "\x1f" + m for r, m in keys]),
+                                  return_index=True, return_inverse=True)
+        slot = self._slots([keys[i] for i in first])[inv]
+
+        # Position of each order within its restaurant-month, in file order
+        order = np.argsort(slot, kind="stable")
+        sorted_slot = slot[order]
+        group_start = np.flatnonzero(np.r_[True, sorted_slot[1:] != sorted_slot[:-1]])
+        sizes = np.diff(np.r_[group_start, len(slot)])
+        rank = np.empty_like(slot)
+        rank[order] = np.arange(len(slot)) - np.repeat(group_start, sizes)
+
+        over = (self.count[slot] + rank) >= self.plan_cap[self.plan[slot]]
+        n = len(self.keys)
+        self.count += np.bincount(slot, minlength=n)
+        self.over_count += np.bincount(slot, weights=over, minlength=n).astype(np.int64)
+        if self.policy:
+            self._feed_exact(slot, pm.as_won(values), over, n)
+        else:
+            self.gmv += np.bincount(slot, weights=values, minlength=n)
+            self.over_gmv += np.bincount(slot, weights=values * over, minlength=n)
+
+        self.rows += len(values)
+        self.elapsed += time.perf_counter() - start
+        if self.sorted_by_time:
+            yield from self._flush_before(months[-1])
+
+    def _feed_exact(self, slot, values, over, n):
+        self.gmv += pm.group_sum(slot, values, n)
+        self.over_gmv += pm.group_sum(slot[over], values[over], n)
+        if self.policy.granularity == pm.PER_ORDER:
+            rounding = self.policy.rounding
+            commission = pm.apply_rate(values, self.rates.commission, rounding)
+            self.commission += pm.group_sum(slot, commission, n)
+            self.over_commission += pm.group_sum(slot[over], commission[over], n)
+            self.infra += pm.group_sum(slot, pm.apply_rate(values, self.rates.infra, rounding), n)
+            self.competitor += pm.group_sum(
+                slot, pm.apply_rate(values, self.rates.competitor, rounding), n)
+
+    def _flush_before(self, month):
+        months = np.array([k[1] for k in self.keys])
+        closed = months < month if len(months) else np.zeros(0, dtype=bool)
+        if closed.any():
+            yield from self._bills(np.flatnonzero(closed))
+            self._reset_state(keep=~closed)
+        self._closed_before = max(self._closed_before, month)
+
+    def finish(self):
+        """Bill every restaurant-month still open"""
+        yield from self._bills(np.arange(len(self.keys)))
+        self._reset_state()
+
+    def _bills(self, slots):
+        plan = self.plan[slots]
+        gmv = self.gmv[slots]
+        over_gmv = self.over_gmv[slots]
+        fee = self.plan_price[plan]
+        if self.policy is None:
+            commission = np.where(plan == 0, gmv, over_gmv) * pc.COMMISSION_RATE
+            infra = gmv * pc.INFRA_COST_RATE
+            competitor = gmv * pc.COMPETITOR_RATE
+        elif self.policy.granularity == pm.PER_ORDER:
+            commission = np.where(plan == 0, self.commission[slots], self.over_commission[slots])
+            infra = self.infra[slots]
+            competitor = self.competitor[slots]
+        else:
+            rounding = self.policy.rounding
+            commission = pm.apply_rate(np.where(plan == 0, gmv, over_gmv),
+                                       self.rates.commission, rounding)
+            infra = pm.apply_rate(gmv, self.rates.infra, rounding)
+            competitor = pm.apply_rate(gmv, self.rates.competitor, rounding)
+        total = fee + commission
+        money = int if self.policy else float
+        for j, s in enumerate(slots):
+            rid, month = self.keys[s]
+            p = int(plan[j])
+            yield {
+                "restaurant_id": rid,
+                "month": month,
+                "plan": self.plan_names[p],
+                "orders": int(self.count[s]),
+                "gmv": money(gmv[j]),
+                "cap": None if p == 0 else int(self.plan_cap[p]),
+                "overflow_orders": int(self.over_count[s]),
+                "overflow_gmv": money(over_gmv[j]),
+                "subscription_fee": money(fee[j]),
+                "commission": money(commission[j]),
+                "total": money(total[j]),
+                "infra_cost": money(infra[j]),
+                "foody7_net": money(total[j] - infra[j]),
+                "competitor_cost": money(competitor[j]),
+            }
+
+    @property
+    def rows_per_sec(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+def replay(chunks, replay_state=None, **kwargs):
+    """Generator of per-restaurant-month bills from an iterable of order chunks"""
+    state = replay_state or LedgerReplay(**kwargs)
+    for rids, months, values in chunks:
+        yield from state.feed(rids, months, values)
+    yield from state.finish()
+
+# ─────────────────────────────────────────────
+# SYNTHETIC LEDGER — for benchmarks and demos
+# ─────────────────────────────────────────────
+
+def write_synthetic_ledger(path, rows, restaurants=10_000, months=3, seed=7):
+    """Time-sorted CSV ledger with lognormal baskets around ₩25k"""
+    rng = np.random.default_rng(seed)
+    start = np.datetime64("2026-01-01T00:00:00", "s")
+    span = int(((np.datetime64("2026-01", "M") + months).astype("datetime64[s]") - start)
+               .astype(np.int64))
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["restaurant_id", "timestamp", "order_value"])
+        for chunk_start in range(0, rows, CHUNK_ROWS):
+            n = min(CHUNK_ROWS, rows - chunk_start)
+            lo, hi = span * chunk_start // rows, span * (chunk_start + n) // rows
+            offsets = np.sort(rng.integers(lo, max(hi, lo + 1), n))
+            stamps = (start + offsets.astype("timedelta64[s]")).astype(str)
+            ids = rng.integers(0, restaurants, n)
+            values = np.rint(rng.lognormal(np.log(25_000), 0.35, n) / 100) * 100
+            writer.writerows(zip((f"r{i}" for i in ids), stamps, values.astype(np.int64)))
+
+# ─────────────────────────────────────────────
+# MAIN
+# ─────────────────────────────────────────────
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[2])
+    parser.add_argument("ledger", help="orders CSV or JSONL (restaurant_id, timestamp, order_value)")
+    parser.add_argument("--plans", help="restaurant_id,plan CSV (default: everyone on commission)")
+    parser.add_argument("--out", help="bills CSV (default: stdout)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--unsorted", action="store_true",
+                        help="ledger is not time-sorted; hold every month until the end")
+    parser.add_argument("--exact", choices=pm.GRANULARITIES,
+                        help="integer-won billing, rounding per order or per invoice")
+    parser.add_argument("--rounding", choices=pm.ROUNDING_MODES, default=pm.HALF_UP)
+    parser.add_argument("--generate", type=int, metavar="ROWS",
+                        help="write a synthetic ledger of ROWS orders to LEDGER first")
+    prof.add_arguments(parser)
+    args = parser.parse_args()
+
+    if args.generate:
+        write_synthetic_ledger(args.ledger, args.generate)
+
+    state = LedgerReplay(plans=load_plans(args.plans) if args.plans else None,
+                         sorted_by_time=not args.unsorted,
+                         policy=pm.MoneyPolicy(args.rounding, args.exact) if args.exact else None)
+    out = open(args.out, "w", newline="") if args.out else sys.stdout
+    wall = time.perf_counter()
+    bills = 0
+    try:
+        writer = csv.DictWriter(out, fieldnames=BILL_FIELDS)
+        writer.writeheader()
+        with prof.session(args):
+            for bill in replay(read_orders(args.ledger, args.chunk_rows), state):
+                writer.writerow(bill)
+                bills += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    wall = time.perf_counter() - wall
+    print(f"  {state.rows:,} rows → {bills:,} bills in {wall:.2f}s "
+          f"({state.rows / wall:,.0f} rows/s end-to-end, "
+          f"{state.rows_per_sec:,.0f} rows/s billing kernel)", file=sys.stderr)
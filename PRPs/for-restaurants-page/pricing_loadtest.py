@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Script: pricing_loadtest.py
+Created: 2026-10-18
+Purpose: Load test for pricing_service.py — throughput and latency percentiles against a local instance
+Keywords: pricing, load-test, latency, p99, asyncio, benchmark, foody7
+Status: active
+"""
+
+import argparse
+import asyncio
+import os
+import queue
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+import pricing_service as svc
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+
+DEFAULT_RATE = 5_000               # req/s for the default open-loop run; --rate 0 runs closed-loop
+SWITCH_INTERVAL = 0.0001           # GIL hand-off while pacing (the 5 ms default delays the sender thread)
+
+# ─────────────────────────────────────────────
+# CLIENT
+# ─────────────────────────────────────────────
+
+def query_mix(n, off_grid_share=0.1, seed=7):
+    """Landing-page-like queries: popular round numbers plus some off-grid inputs"""
+    rng = np.random.default_rng(seed)
+    orders = rng.choice([40, 50, 65, 100, 150, 194, 200, 300, 400, 500, 799], n)
+    avg = rng.choice(np.arange(10_000, 50_001, 1_000), n)
+    off = rng.random(n) < off_grid_share
+    avg = np.where(off, avg + rng.integers(1, 499, n), avg)
+    return [f"/savings?orders={o}&avg={a}".encode() for o, a in zip(orders, avg)]
+
+async def _worker(host, port, paths, latencies, offset, stride):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for k in range(offset, len(paths), stride):
+            start = time.perf_counter_ns()
+            writer.write(b"GET %s HTTP/1.1\r\nHost: %s\r\n\r\n" % (paths[k], host.encode()))
+            await writer.drain()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":")[1])
+            await reader.readexactly(length)
+            latencies[k] = time.perf_counter_ns() - start
+    finally:
+        writer.close()
+
+async def run(host, port, requests, connections):
+    """Closed loop: each connection sends its next request when the last answer arrives"""
+    paths = query_mix(requests)
+    latencies = np.zeros(requests, dtype=np.int64)
+    start = time.perf_counter()
+    await asyncio.gather(*(_worker(host, port, paths, latencies, c, connections)
+                           for c in range(connections)))
+    elapsed = time.perf_counter() - start
+    return latencies / 1e6, elapsed
+
+def _open_receiver(sock, sent, count, due, latencies):
+    stream = sock.makefile("rb")
+    for _ in range(count):
+        k = sent.get()
+        length = 0
+        while True:
+            line = stream.readline()
+            if line in (b"\r\n", b""):
+                break
+            if line.lower().startswith(b"content-length:"):
+                length = int(line.split(b":")[1])
+        stream.read(length)
+        latencies[k] = time.perf_counter_ns() - due[k]
+
+def run_open(host, port, requests, connections, rate):
+    """Open loop: request k is due at start + k / rate whatever the earlier answers did.
+
+    Requests are pipelined round-robin over the connections and latency runs
+    from the due time, not the actual send, so a stalled server shows up as
+    queueing delay rather than as a slower send rate (the coordinated omission
+    a closed loop hides). Sends are paced by one thread with time.sleep:
+    asyncio timers round up to whole milliseconds, which alone would blow a
+    1 ms p99. Returns (latency ms, send lateness ms, elapsed s).
+
+    With client and service on one host the tail also holds the OS
+    scheduler's hand-offs between the two processes: on a single core every
+    send waits for the service to be descheduled, so keep --connections low.
+    """
+    paths = query_mix(requests)
+    latencies = np.zeros(requests, dtype=np.int64)
+    lateness = np.zeros(requests, dtype=np.int64)
+    switch = sys.getswitchinterval()
+    sys.setswitchinterval(SWITCH_INTERVAL)
+    socks = [socket.create_connection((host, port)) for _ in range(connections)]
+    for sock in socks:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sent = [queue.SimpleQueue() for _ in socks]
+    start = time.perf_counter_ns() + 10_000_000
+    due = start + (np.arange(requests) * (1e9 / rate)).astype(np.int64)
+    receivers = [threading.Thread(target=_open_receiver,
+                                  args=(sock, sent[c], len(range(c, requests, connections)), due, latencies))
+                 for c, sock in enumerate(socks)]
+    for t in receivers:
+        t.start()
+    try:
+        request = b"GET %s HTTP/1.1\r\nHost: " + host.encode() + b"\r\n\r\n"
+        for k, path in enumerate(paths):
+            wait = due[k] - time.perf_counter_ns()
+            if wait > 0:
+                time.sleep(wait / 1e9)
+            c = k % connections
+            lateness[k] = time.perf_counter_ns() - due[k]
+            socks[c].sendall(request % path)
+            sent[c].put(k)
+        for t in receivers:
+            t.join()
+    finally:
+        sys.setswitchinterval(switch)
+        for sock in socks:
+            sock.close()
+    elapsed = (time.perf_counter_ns() - start) / 1e9
+    return latencies / 1e6, lateness / 1e6, elapsed
+
+async def fetch(host, port, path):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(b"GET %s HTTP/1.1\r\nConnection: close\r\n\r\n" % path.encode())
+    data = await reader.read()
+    writer.close()
+    return data.split(b"\r\n\r\n", 1)[1].decode()
+
+# ─────────────────────────────────────────────
+# MAIN
+# ─────────────────────────────────────────────
+
+async def _wait_ready(host, port, timeout=10.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            await fetch(host, port, "/health")
+            return
+        except OSError:
+            await asyncio.sleep(0.05)
+    raise RuntimeError(f"service not reachable on {host}:{port}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[2])
+    parser.add_argument("--host", default=svc.HOST)
+    parser.add_argument("--port", type=int, default=svc.PORT)
+    parser.add_argument("-n", "--requests", type=int, default=20_000)
+    parser.add_argument("-c", "--connections", type=int, default=None,
+                        help="connections (default: 1 open-loop, 32 closed-loop)")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                        help="open-loop send rate in req/s; 0 = closed loop, as fast as answers come back")
+    parser.add_argument("--spawn", action="store_true", help="start a local pricing_service first")
+    parser.add_argument("--target-p99-ms", type=float, default=1.0,
+                        help="fail unless the client-measured p99 is at or under this")
+    args = parser.parse_args()
+
+    proc = None
+    if args.spawn:
+        script = Path(__file__).with_name("pricing_service.py")
+        proc = subprocess.Popen([sys.executable, str(script), "--host", args.host,
+                                 "--port", str(args.port)], stdout=subprocess.DEVNULL)
+    try:
+        asyncio.run(_wait_ready(args.host, args.port))
+        if args.connections is None:
+            args.connections = 1 if args.rate else 32
+        late = None
+        if args.rate:
+            lat, late, elapsed = run_open(args.host, args.port, args.requests, args.connections, args.rate)
+        else:
+            lat, elapsed = asyncio.run(run(args.host, args.port, args.requests, args.connections))
+        server = asyncio.run(fetch(args.host, args.port, "/stats"))
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+
+    p50, p99, p999 = np.percentile(lat, [50, 99, 99.9])
+    print("═" * 80)
+    mode = f"open loop at {args.rate:,.0f} req/s" if args.rate else "closed loop"
+    print(f"  Savings service load test — {args.requests:,} requests, {args.connections} connections, "
+          f"{mode}, {os.cpu_count()} CPU(s)")
+    print("═" * 80)
+    print(f"  Throughput:           {args.requests / elapsed:>10,.0f} req/s")
+    print(f"  Client latency (ms):  p50 {p50:.3f}  p99 {p99:.3f}  p99.9 {p999:.3f}")
+    if late is not None:
+        print(f"  Send lateness (ms):   p50 {np.percentile(late, 50):.3f}  p99 {np.percentile(late, 99):.3f}"
+              "  (client pacing error, included in the latency above)")
+    print(f"  Server stats:         {server}")
+    print("  Server stats time route() only; the target applies to client latency, which includes")
+    print("  the event loop, the socket round trip and queueing behind the other connections.")
+    if args.spawn and (os.cpu_count() or 1) < 2:
+        print("  One CPU: client and service take turns on it, so the tail includes the scheduler's")
+        print("  hand-offs between them; run the service on its own core (no --spawn) for the gate.")
+    if not args.rate:
+        print("  Closed loop: every connection keeps one request in flight, so p99 is mostly the")
+        print("  queue of the other connections; it measures capacity, use --rate for the p99 gate.")
+    ok = p99 <= args.target_p99_ms
+    print(f"  p99 target {args.target_p99_ms:.3f} ms: {'met' if ok else 'MISSED'} ({p99:.3f} ms client-side)")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Script: pricing_markets.py
+Created: 2026-10-18
+Purpose: Multi-market tier analysis — per-market currency, baskets and tiered competitor schedules, FX-normalized
+Keywords: pricing, markets, fx, currency, competitors, expansion, multiprocessing, foody7
+Status: active
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import pricing_calculator as pc
+import pricing_grid as pg
+import pricing_infra as pi
+import pricing_montecarlo as mc
+import pricing_sweep as sw
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+
+REPORT_CURRENCY = "USD"
+POPULATION = 200_000        # synthetic restaurants per market
+TYPICAL_ORDERS = 60         # restaurant used for competitor effective rates (ORDERS_DIST median)
+BASKET_QUANTILES = (0.05, 0.2, 0.4, 0.6, 0.8, 0.95)   # derived section basket columns
+
+# Planning FX table: units of each currency per 1 USD (KRW matches fmt_usd's 1,350)
+FX_RATES = {
+    "USD": 1.0,
+    "KRW": 1_350.0,
+    "JPY": 150.0,
+    "CNY": 7.2,
+    "RUB": 90.0,
+}
+
+CURRENCY_SYMBOLS = {"USD": "$", "KRW": "₩", "JPY": "¥", "CNY": "CN¥", "RUB": "₽"}
+
+# One profile per market the app ships a locale for. KR is the calculator's
+# CONFIG; the other markets' baskets and competitor schedules are planning
+# placeholders until market research replaces them (--markets FILE).
+# Tier prices left out are the KRW tiers converted at FX_RATES and rounded
+# to price_step; caps left out are Section 5 caps at the median basket;
+# avg_order_values left out are basket quantiles (BASKET_QUANTILES).
+# Competitor schedules use pricing_infra's form: marginal `rates` in bands of
+# monthly GMV starting at `breakpoints`, plus optional per_order / monthly fees.
+MARKETS = {
+    "KR": {
+        "locale": "ko", "currency": "KRW", "price_step": 1_000,
+        "tiers": pc.TIERS, "tier_caps": pc.TIER_CAPS,
+        "avg_order_values": pc.AVG_ORDER_VALUES,
+        "basket": mc.BASKET_DIST,
+        "competitors": [
+            {"name": "Baemin", "rates": [pc.COMPETITOR_RATE]},
+            {"name": "Coupang Eats", "rates": [pc.COMPETITOR_RATE]},
+        ],
+    },
+    "JP": {
+        "locale": "ja", "currency": "JPY", "price_step": 100,
+        "avg_order_values": [1_000, 1_500, 2_000, 2_500, 3_000, 4_000],
+        "basket": {"kind": "lognormal", "median": 2_000, "sigma": 0.35, "low": 600, "high": 8_000},
+        "competitors": [
+            {"name": "Uber Eats", "rates": [0.35]},
+            {"name": "Demae-can", "breakpoints": [0, 1_000_000], "rates": [0.35, 0.30]},
+        ],
+    },
+    "CN": {
+        "locale": "zh", "currency": "CNY", "price_step": 10,
+        "avg_order_values": [20, 30, 40, 50, 70, 100],
+        "basket": {"kind": "lognormal", "median": 40, "sigma": 0.4, "low": 12, "high": 200},
+        "competitors": [
+            {"name": "Meituan", "breakpoints": [0, 50_000, 200_000], "rates": [0.20, 0.18, 0.16],
+             "per_order": 1.0},
+            {"name": "Ele.me", "rates": [0.18], "per_order": 1.0},
+        ],
+    },
+    "RU": {
+        "locale": "ru", "currency": "RUB", "price_step": 100,
+        "avg_order_values": [500, 800, 1_100, 1_500, 2_000, 3_000],
+        "basket": {"kind": "lognormal", "median": 1_100, "sigma": 0.35, "low": 300, "high": 5_000},
+        "competitors": [
+            {"name": "Yandex Eda", "breakpoints": [0, 3_000_000], "rates": [0.30, 0.25]},
+        ],
+    },
+    "US": {
+        "locale": "en", "currency": "USD", "price_step": 1,
+        "avg_order_values": [15, 20, 30, 40, 50, 60],
+        "basket": {"kind": "lognormal", "median": 30, "sigma": 0.35, "low": 10, "high": 120},
+        "competitors": [
+            {"name": "DoorDash", "rates": [0.25]},
+            {"name": "Uber Eats", "rates": [0.30]},
+            {"name": "Grubhub", "rates": [0.20], "per_order": 0.30},
+        ],
+    },
+}
+
+# ─────────────────────────────────────────────
+# MARKET PROFILES
+# ─────────────────────────────────────────────
+
+def convert(amount, currency, to=REPORT_CURRENCY, fx=None):
+    """Convert between currencies through the FX table (units per USD)"""
+    fx = FX_RATES if fx is None else fx
+    for code in (currency, to):
+        if code not in fx:
+            raise ValueError(f"no FX rate for {code!r}")
+    return amount / fx[currency] * fx[to]
+
+def fmt_money(n, currency):
+    symbol = CURRENCY_SYMBOLS.get(currency, currency + " ")
+    decimals = 2 if abs(n) < 100 and currency in ("USD", "CNY") else 0
+    return f"{symbol}{n:,.{decimals}f}"
+
+def typical_basket(dist):
+    """Median basket of a pricing_montecarlo distribution spec"""
+    kind = dist["kind"]
+    if kind == "lognormal":
+        return float(dist["median"])
+    if kind == "constant":
+        return float(dist["value"])
+    return float(np.median(mc.sample(dist, np.random.default_rng(0), 100_001)))
+
+def basket_grid(dist, quantiles=BASKET_QUANTILES):
+    """Section basket columns from a basket distribution: quantiles at 2 significant figures"""
+    values = np.quantile(mc.sample(dist, np.random.default_rng(0), 100_001), quantiles)
+    rounded = [float(f"{v:.2g}") for v in values]
+    return sorted({int(v) if v.is_integer() else v for v in rounded})
+
+def competitor_model(spec):
+    """Compile a competitor commission schedule to a pricing_infra.PiecewiseCost"""
+    return pi.PiecewiseCost(fixed=spec.get("monthly", 0.0), per_order=spec.get("per_order", 0.0),
+                            breakpoints=spec.get("breakpoints", [0.0]), rates=spec["rates"])
+
+class Market:
+    """One market: a PricingConfig in local currency plus basket and competitor schedules"""
+
+    def __init__(self, name, currency, cfg, basket, competitors, locale=None, orders=None):
+        self.name = name
+        self.currency = currency
+        self.cfg = cfg
+        self.basket = basket
+        self.orders = mc.ORDERS_DIST if orders is None else orders
+        self.competitors = competitors            # {label: PiecewiseCost}
+        self.locale = locale
+
+    def __repr__(self):
+        return f"Market({self.name!r}, {self.currency}, competitors={list(self.competitors)})"
+
+    @classmethod
+    def from_dict(cls, name, data, fx=None):
+        """Profile dict → Market; missing tiers/caps are derived (see MARKETS)"""
+        fx = FX_RATES if fx is None else fx
+        currency = data["currency"]
+        step = data.get("price_step", 1)
+        tiers = data.get("tiers") or {
+            tier: max(step, round(convert(price, "KRW", currency, fx) / step) * step)
+            for tier, price in pc.TIERS.items()}
+        basket = data["basket"]
+        overrides = data.get("config", {})
+        cfg = pc.PricingConfig(name=name, tiers=tiers,
+                               avg_order_values=data.get("avg_order_values") or basket_grid(basket),
+                               **overrides)
+        median = typical_basket(basket)
+        caps = data.get("tier_caps") or {
+            tier: int(pg.order_cap(price, median, cfg.cap_factor, cfg.infra_rate))
+            for tier, price in tiers.items()}
+        competitors = {c["name"]: competitor_model(c) for c in data["competitors"]}
+        # Sections quote one competitor rate: the cheapest at a typical restaurant
+        competitor_rate = overrides.get("competitor_rate") or min(
+            float(m.effective_rate(TYPICAL_ORDERS, median)) for m in competitors.values())
+        cfg = cfg.replace(tier_caps=caps, competitor_rate=competitor_rate)
+        return cls(name, currency, cfg, basket, competitors, data.get("locale"), data.get("orders"))
+
+def load_markets(path=None, fx=None):
+    """MARKETS, or a JSON file of {name: profile}; profiles may omit any derivable field"""
+    profiles = MARKETS
+    if path:
+        with open(path, encoding="utf-8") as f:
+            profiles = json.load(f)
+    return [Market.from_dict(name, data, fx) for name, data in profiles.items()]
+
+# ─────────────────────────────────────────────
+# ANALYSIS — one market per worker
+# ─────────────────────────────────────────────
+
+def analyse_market(market, seed_seq, n=POPULATION, currency=REPORT_CURRENCY, fx=None):
+    """Full tier analysis for one market, money in both local and report currency.
+
+    Tier figures are at the market's median basket; population figures come
+    from n synthetic restaurants that each pick their cheapest plan (published
+    caps, overflow at the commission rate) and are compared with the cheapest
+    competitor for them. `sections` holds every numeric calculator table cell
+    for the market's config, in local currency.
+    """
+    fx = FX_RATES if fx is None else fx
+    cfg = market.cfg
+    to_report = convert(1.0, market.currency, currency, fx)
+    names = list(cfg.tiers)
+    prices = np.array([cfg.tiers[t] for t in names], dtype=np.float64)
+    caps = np.array([cfg.tier_cap(t) for t in names], dtype=np.float64)
+    median = typical_basket(market.basket)
+
+    rng = np.random.default_rng(seed_seq)
+    orders = np.maximum(np.rint(mc.sample(market.orders, rng, n)), 0)
+    avg = mc.sample(market.basket, rng, n)
+    costs = pg.plan_costs(orders, avg, prices, commission_rate=cfg.commission_rate, caps=caps)
+    plan = np.argmin(costs, axis=0)
+    paid = np.take_along_axis(costs, plan[np.newaxis], axis=0)[0]
+    net = paid - orders * avg * cfg.infra_rate
+    competitor = np.stack([m.cost(orders, avg) for m in market.competitors.values()])
+    savings = competitor.min(axis=0) - paid
+    share = np.bincount(plan, minlength=len(names) + 1) / n
+
+    tiers = []
+    for t, name in enumerate(names):
+        tiers.append({
+            "tier": name,
+            "price": float(prices[t]),
+            "price_report": float(prices[t] * to_report),
+            "cap": int(caps[t]),
+            "break_even": int(pg.break_even(prices[t], median, cfg.commission_rate)),
+            "sweet_spot": int(pg.sweet_spot(prices[t], median, commission_rate=cfg.commission_rate)),
+            "section5_cap": int(pg.order_cap(prices[t], median, cfg.cap_factor, cfg.infra_rate)),
+            "rate_at_cap": float(prices[t] / (caps[t] * median)),
+            "share": float(share[t + 1]),
+        })
+    return {
+        "market": market.name,
+        "locale": market.locale,
+        "currency": market.currency,
+        "report_currency": currency,
+        "fx_to_report": to_report,
+        "median_basket": median,
+        "median_basket_report": median * to_report,
+        "commission_rate": cfg.commission_rate,
+        "commission_share": float(share[0]),
+        "tiers": tiers,
+        "competitors": {
+            label: {"rate_typical": float(m.effective_rate(TYPICAL_ORDERS, median)),
+                    "mean_cost_report": float(competitor[i].mean() * to_report)}
+            for i, (label, m) in enumerate(market.competitors.items())},
+        "foody7_net_mean_report": float(net.mean() * to_report),
+        "loss_making_share": float((net < 0).mean()),
+        "savings_mean_report": float(savings.mean() * to_report),
+        "cheaper_than_competitors_share": float((savings > 0).mean()),
+        "sections": sw.evaluate_config(cfg)[1],
+    }
+
+def _run(args):
+    return analyse_market(*args)
+
+def analyse_markets(markets, n=POPULATION, seed=7, workers=None, currency=REPORT_CURRENCY, fx=None):
+    """Analyse every market across a process pool, in input order.
+
+    Each market gets its own SeedSequence child, so results do not depend on
+    the worker count (workers=1 runs in-process).
+    """
+    seeds = np.random.SeedSequence(seed).spawn(len(markets))
+    jobs = [(m, s, n, currency, fx) for m, s in zip(markets, seeds)]
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1:
+        return list(map(_run, jobs))
+    with ProcessPoolExecutor(workers) as pool:
+        return list(pool.map(_run, jobs))
+
+# ─────────────────────────────────────────────
+# MAIN
+# ─────────────────────────────────────────────
+
+def print_market(r):
+    cur, rep = r["currency"], r["report_currency"]
+    print(f"\n  {r['market']} ({r['locale']}, {cur}) — median basket {fmt_money(r['median_basket'], cur)} "
+          f"≈ {fmt_money(r['median_basket_report'], rep)}")
+    print(f"  {'Tier':<6} {'Price':>12} {f'≈{rep}':>10} {'Cap':>6} {'5-cap':>6} {'B/E':>6} "
+          f"{'25% save':>9} {'Rate@cap':>9} {'Share':>7}")
+    print("  " + "─" * 78)
+    print(f"  {'Comm.':<6} {'—':>12} {'—':>10} {'':>6} {'':>6} {'':>6} {'':>9} "
+          f"{r['commission_rate']:>9.1%} {r['commission_share']:>7.1%}")
+    for t in r["tiers"]:
+        print(f"  {t['tier']:<6} {fmt_money(t['price'], cur):>12} {fmt_money(t['price_report'], rep):>10} "
+              f"{t['cap']:>6} {t['section5_cap']:>6} {t['break_even']:>6} {t['sweet_spot']:>9} "
+              f"{t['rate_at_cap']:>9.1%} {t['share']:>7.1%}")
+    comps = ", ".join(f"{label} {c['rate_typical']:.1%}" for label, c in r["competitors"].items())
+    print(f"  Competitors at {TYPICAL_ORDERS} orders/mo: {comps}")
+
+def print_comparison(results):
+    rep = results[0]["report_currency"]
+    print(f"\n  Cross-market comparison ({rep}, per restaurant-month)")
+    print(f"  {'Market':<8} {'Basket':>9} {'F7 net':>10} {'Saving':>10} {'Cheaper':>8} "
+          f"{'Loss':>7} {'On tiers':>9}")
+    print("  " + "─" * 66)
+    for r in results:
+        print(f"  {r['market']:<8} {fmt_money(r['median_basket_report'], rep):>9} "
+              f"{fmt_money(r['foody7_net_mean_report'], rep):>10} {fmt_money(r['savings_mean_report'], rep):>10} "
+              f"{r['cheaper_than_competitors_share']:>8.1%} {r['loss_making_share']:>7.1%} "
+              f"{1 - r['commission_share']:>9.1%}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[2])
+    parser.add_argument("--markets", help="JSON file of {name: profile} (default: built-in MARKETS)")
+    parser.add_argument("--only", nargs="+", help="market names to analyse")
+    parser.add_argument("--fx", help="JSON file of FX rates (units per USD), merged over FX_RATES")
+    parser.add_argument("--currency", default=REPORT_CURRENCY, help="report currency")
+    parser.add_argument("-n", "--restaurants", type=int, default=POPULATION)
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="also write the full results (incl. sections) to this file")
+    args = parser.parse_args()
+
+    fx = dict(FX_RATES)
+    if args.fx:
+        with open(args.fx, encoding="utf-8") as f:
+            fx.update(json.load(f))
+    markets = load_markets(args.markets, fx)
+    if args.only:
+        unknown = sorted(set(args.only) - {m.name for m in markets})
+        if unknown:
+            parser.error(f"unknown markets: {', '.join(unknown)} "
+                         f"(choose from {', '.join(m.name for m in markets)})")
+        markets = [m for m in markets if m.name in args.only]
+
+    start = time.perf_counter()
+    results = analyse_markets(markets, args.restaurants, args.seed, args.workers, args.currency, fx)
+    elapsed = time.perf_counter() - start
+
+    print("═" * 80)
+    print(f"  Multi-market tier analysis — {len(results)} markets, {args.restaurants:,} restaurants each")
+    print("═" * 80)
+    for r in results:
+        print_market(r)
+    print_comparison(results)
+    print(f"\n  {len(results)} markets in {elapsed:.2f}s")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=1)
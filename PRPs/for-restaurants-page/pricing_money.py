@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Script: pricing_money.py
+Created: 2026-10-18
+Purpose: Fixed-point money — integer won, basis-point rates, explicit rounding, int64 billing kernels
+Keywords: pricing, money, fixed-point, integer, basis-points, rounding, billing, foody7
+Status: active
+"""
+
+import argparse
+import time
+from decimal import ROUND_HALF_UP, Decimal
+
+import numpy as np
+
+import pricing_calculator as pc
+
+# ─────────────────────────────────────────────
+# CONFIG — rounding policy
+# ─────────────────────────────────────────────
+
+BPS = 10_000                     # 1 = 0.01%; 7% = 700 bps
+
+HALF_UP = "half_up"              # ₩0.5 → ₩1 (default; matches the PG settlement files)
+HALF_EVEN = "half_even"          # banker's rounding
+DOWN = "down"                    # floor
+UP = "up"                        # ceiling
+ROUNDING_MODES = (HALF_UP, HALF_EVEN, DOWN, UP)
+
+PER_ORDER = "per_order"          # round each order's commission, then sum
+PER_INVOICE = "per_invoice"      # sum order values, round once on the invoice
+GRANULARITIES = (PER_ORDER, PER_INVOICE)
+
+EXACT_FLOAT_SUM = 2 ** 53        # integer sums below this are exact in float64
+
+# ─────────────────────────────────────────────
+# RATES AND ROUNDING
+# ─────────────────────────────────────────────
+
+def to_bps(rate):
+    """0.07 → 700; rejects rates that are not a whole number of basis points"""
+    bps = round(rate * BPS)
+    if abs(bps - rate * BPS) > 1e-6:
+        raise ValueError(f"rate {rate!r} is not a whole number of basis points")
+    return bps
+
+def div_round(num, den, mode=HALF_UP):
+    """Integer num / den rounded per `mode`; num may be an int or an int64 array.
+
+    den must be positive. Halves round towards +∞ for HALF_UP, which is the
+    usual reading for the non-negative amounts billed here.
+    """
+    q, r = divmod(num, den)
+    if mode == DOWN:
+        return q
+    if mode == UP:
+        return q + (r > 0)
+    twice = 2 * r
+    if mode == HALF_UP:
+        return q + (twice >= den)
+    if mode == HALF_EVEN:
+        return q + ((twice > den) | ((twice == den) & (q % 2 == 1)))
+    raise ValueError(f"unknown rounding mode: {mode!r}")
+
+def ceil_div(num, den):
+    return -(-num // den)
+
+class MoneyPolicy:
+    """How amounts are rounded to whole won, and at which level"""
+
+    __slots__ = ("rounding", "granularity")
+
+    def __init__(self, rounding=HALF_UP, granularity=PER_INVOICE):
+        if rounding not in ROUNDING_MODES:
+            raise ValueError(f"unknown rounding mode: {rounding!r}")
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"unknown rounding granularity: {granularity!r}")
+        self.rounding = rounding
+        self.granularity = granularity
+
+    def __repr__(self):
+        return f"MoneyPolicy({self.rounding!r}, {self.granularity!r})"
+
+DEFAULT_POLICY = MoneyPolicy()
+
+class ExactRates:
+    """A PricingConfig's rates as basis points (cfg=None reads the module CONFIG)"""
+
+    __slots__ = ("commission", "infra", "competitor", "cap_factor")
+
+    def __init__(self, cfg=None):
+        cfg = cfg or pc.PricingConfig()
+        self.commission = to_bps(cfg.commission_rate)
+        self.infra = to_bps(cfg.infra_rate)
+        self.competitor = to_bps(cfg.competitor_rate)
+        self.cap_factor = to_bps(cfg.cap_factor)
+
+def apply_rate(amount, bps, rounding=HALF_UP):
+    """amount × bps / 10,000 rounded to whole won (ints or int64 arrays)"""
+    return div_round(amount * bps, BPS, rounding)
+
+def charge(orders, avg, bps, policy=None):
+    """Rate applied to `orders` orders of `avg` won, rounded per the policy"""
+    policy = policy or DEFAULT_POLICY
+    if policy.granularity == PER_ORDER:
+        return orders * apply_rate(avg, bps, policy.rounding)
+    return apply_rate(orders * avg, bps, policy.rounding)
+
+# ─────────────────────────────────────────────
+# EXACT HELPERS — integer-won equivalents of pricing_calculator's helpers
+# ─────────────────────────────────────────────
+
+def _won(x):
+    if int(x) != x:
+        raise ValueError(f"{x!r} is not a whole number of won")
+    return int(x)
+
+def _smallest(estimate, ok):
+    """Smallest n ≥ 0 with ok(n), given ok is monotone and n is near `estimate`.
+
+    Callers check _unit_charge first, so the billed amount grows with n and
+    the upward walk ends.
+    """
+    n = max(estimate, 0)
+    while not ok(n):
+        n += 1
+    while n > 0 and ok(n - 1):
+        n -= 1
+    return n
+
+def _unit_charge(avg, bps, policy=None):
+    """Billed won per order as (num, den): exact under per-order rounding, the
+    unrounded rate under per-invoice rounding. Raises when it is zero, since
+    no order count then reaches a positive amount."""
+    policy = policy or DEFAULT_POLICY
+    if policy.granularity == PER_ORDER:
+        num, den = apply_rate(avg, bps, policy.rounding), 1
+    else:
+        num, den = avg * bps, BPS
+    if num <= 0:
+        raise ValueError(f"₩{avg:,} at {bps} bps bills ₩0 per order under {policy!r}")
+    return num, den
+
+def commission_per_order(avg, cfg=None, policy=None):
+    policy = policy or DEFAULT_POLICY
+    return apply_rate(_won(avg), ExactRates(cfg).commission, policy.rounding)
+
+def foody7_net_per_order(avg, cfg=None, policy=None):
+    """Foody7 margin after infrastructure costs (commission-only plan)"""
+    policy = policy or DEFAULT_POLICY
+    r = ExactRates(cfg)
+    avg = _won(avg)
+    return apply_rate(avg, r.commission, policy.rounding) - apply_rate(avg, r.infra, policy.rounding)
+
+def foody7_net_subscription(tier_price, orders, avg, cfg=None, policy=None):
+    """Foody7 margin on subscription: flat fee minus infra cost per order"""
+    return _won(tier_price) - charge(int(orders), _won(avg), ExactRates(cfg).infra, policy)
+
+def break_even(tier_price, avg, cfg=None, policy=None):
+    """Minimum orders/month where the billed commission reaches the tier price"""
+    price, avg, bps = _won(tier_price), _won(avg), ExactRates(cfg).commission
+    num, den = _unit_charge(avg, bps, policy)
+    return _smallest(ceil_div(price * den, num),
+                     lambda n: charge(n, avg, bps, policy) >= price)
+
+def sweet_spot(tier_price, avg, savings_pct=0.25, cfg=None, policy=None):
+    """Orders/month where restaurant saves savings_pct% vs the billed commission"""
+    price, avg, bps = _won(tier_price), _won(avg), ExactRates(cfg).commission
+    keep = BPS - to_bps(savings_pct)
+    if keep <= 0:
+        raise ValueError(f"savings_pct must be below 1, got {savings_pct!r}")
+    num, den = _unit_charge(avg, bps, policy)
+    return _smallest(ceil_div(price * BPS * den, num * keep),
+                     lambda n: charge(n, avg, bps, policy) * keep >= price * BPS)
+
+def order_cap(tier_price, avg, cap_factor=1.0, cfg=None, policy=None):
+    """Orders/month where infra cost eats the whole tier price, scaled by cap_factor"""
+    price, avg, bps = _won(tier_price), _won(avg), ExactRates(cfg).infra
+    num, den = _unit_charge(avg, bps, policy)
+    infra_be = _smallest(price * den // num,
+                         lambda n: charge(n + 1, avg, bps, policy) > price)
+    return infra_be * to_bps(cap_factor) // BPS
+
+def competitor_commission(orders, avg, cfg=None, policy=None):
+    return charge(int(orders), _won(avg), ExactRates(cfg).competitor, policy)
+
+def fmt_krw(n):
+    """Format whole won as ₩X,XXX without a float round-trip"""
+    return f"₩{int(n):,}"
+
+def fmt_usd(n, rate=1350):
+    """Rough KRW→USD conversion"""
+    return f"(~${div_round(int(n), rate)})"
+
+# ─────────────────────────────────────────────
+# INT64 ARRAY KERNELS
+# ─────────────────────────────────────────────
+
+def as_won(values):
+    """int64 won array; rejects fractional amounts instead of silently truncating"""
+    values = np.asarray(values)
+    if values.dtype.kind == "f":
+        won = np.rint(values)
+        if not np.array_equal(won, values):
+            raise ValueError("order values must be whole won")
+        return won.astype(np.int64)
+    return values.astype(np.int64, copy=False)
+
+def group_sum(groups, values, n):
+    """Exact int64 per-group sums.
+
+    bincount accumulates in float64, which is exact while every partial sum
+    stays below 2**53 won; larger totals fall back to np.add.at.
+    """
+    if np.abs(values).sum(dtype=np.float64) < EXACT_FLOAT_SUM:
+        return np.bincount(groups, weights=values, minlength=n).astype(np.int64)
+    out = np.zeros(n, dtype=np.int64)
+    np.add.at(out, groups, values)
+    return out
+
+def group_rank(groups):
+    """0-based position of each row within its group, in input order"""
+    order = np.argsort(groups, kind="stable")
+    sorted_groups = groups[order]
+    starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+    sizes = np.diff(np.r_[starts, len(groups)])
+    rank = np.empty(len(groups), dtype=np.int64)
+    rank[order] = np.arange(len(groups)) - np.repeat(starts, sizes)
+    return rank
+
+def rate_kernel(groups, values, n, bps, policy=None):
+    """Per-group rate charge on order values, rounded per order or per invoice"""
+    policy = policy or DEFAULT_POLICY
+    if policy.granularity == PER_ORDER:
+        return group_sum(groups, apply_rate(values, bps, policy.rounding), n)
+    return apply_rate(group_sum(groups, values, n), bps, policy.rounding)
+
+def overflow_mask(groups, caps, start_counts=None):
+    """Orders beyond their group's cap (orders are in time order within a group)"""
+    seen = group_rank(groups)
+    if start_counts is not None:
+        seen += start_counts[groups]
+    return seen >= caps[groups]
+
+def invoices(groups, values, plans, n=None, tiers=None, caps=None, cfg=None, policy=None):
+    """Exact monthly invoices for every group (restaurant-month) from its orders.
+
+    `plans` holds one plan index per group (0 = commission, i = i-th tier).
+    Returns a dict of int64 arrays; every amount is whole won.
+    """
+    cfg = cfg or pc.PricingConfig()
+    tiers = cfg.tiers if tiers is None else tiers
+    caps = cfg.tier_caps if caps is None else caps
+    rates = ExactRates(cfg)
+    groups = np.asarray(groups, dtype=np.int64)
+    values = as_won(values)
+    plans = np.asarray(plans, dtype=np.int64)
+    n = len(plans) if n is None else n
+
+    plan_price = np.array([0] + [_won(tiers[t]) for t in tiers], dtype=np.int64)
+    plan_cap = np.array([np.iinfo(np.int64).max] + [caps[t] for t in tiers], dtype=np.int64)
+    over = overflow_mask(groups, plan_cap[plans])
+    billable = np.where(plans[groups] == 0, True, over)
+
+    fee = plan_price[plans]
+    commission = rate_kernel(groups[billable], values[billable], n, rates.commission, policy)
+    infra = rate_kernel(groups, values, n, rates.infra, policy)
+    return {
+        "orders": np.bincount(groups, minlength=n).astype(np.int64),
+        "gmv": group_sum(groups, values, n),
+        "overflow_orders": np.bincount(groups, weights=over, minlength=n).astype(np.int64),
+        "overflow_gmv": group_sum(groups[over], values[over], n),
+        "subscription_fee": fee,
+        "commission": commission,
+        "total": fee + commission,
+        "infra_cost": infra,
+        "foody7_net": fee + commission - infra,
+        "competitor_cost": rate_kernel(groups, values, n, rates.competitor, policy),
+    }
+
+def plan_costs(orders, avg, tiers=None, caps=None, cfg=None, policy=None):
+    """int64 analogue of pricing_grid.plan_costs with published caps: (plan, …) bills"""
+    cfg = cfg or pc.PricingConfig()
+    tiers = cfg.tiers if tiers is None else tiers
+    caps = cfg.tier_caps if caps is None else caps
+    bps = ExactRates(cfg).commission
+    orders, avg = np.broadcast_arrays(as_won(orders), as_won(avg))
+    bills = [charge(orders, avg, bps, policy)]
+    for name, price in tiers.items():
+        bills.append(_won(price) + charge(np.maximum(orders - caps[name], 0), avg, bps, policy))
+    return np.stack(bills)
+
+# ─────────────────────────────────────────────
+# MAIN — drift and throughput vs float and Decimal
+# ─────────────────────────────────────────────
+
+def _bench(n, seed=7):
+    rng = np.random.default_rng(seed)
+    values = np.rint(rng.lognormal(np.log(25_000), 0.35, n) / 10) * 10
+    won = values.astype(np.int64)
+    bps = to_bps(pc.COMMISSION_RATE)
+
+    start = time.perf_counter()
+    exact_orders = int(apply_rate(won, bps).sum())
+    exact_invoice = int(apply_rate(int(won.sum()), bps))
+    t_int = time.perf_counter() - start
+
+    start = time.perf_counter()
+    total = 0.0
+    for v in values.tolist():
+        total += v * pc.COMMISSION_RATE
+    t_float = time.perf_counter() - start
+
+    sample = won[:min(n, 200_000)].tolist()
+    rate = Decimal(pc.COMMISSION_RATE).quantize(Decimal("0.0001"))
+    start = time.perf_counter()
+    dec = sum((Decimal(v) * rate).quantize(Decimal(1), ROUND_HALF_UP) for v in sample)
+    t_dec = (time.perf_counter() - start) * n / len(sample)
+    assert int(dec) == int(apply_rate(won[:len(sample)], bps).sum())
+    return {"n": n, "exact_per_order": exact_orders, "exact_per_invoice": exact_invoice,
+            "float": total, "t_int": t_int, "t_float": t_float, "t_decimal": t_dec}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[2])
+    parser.add_argument("-n", "--orders", type=int, default=5_000_000)
+    args = parser.parse_args()
+
+    r = _bench(args.orders)
+    print("═" * 80)
+    print(f"  Money kernels — commission on {r['n']:,} orders")
+    print("═" * 80)
+    print(f"  Exact, rounded per order:    {fmt_krw(r['exact_per_order']):>20}")
+    print(f"  Exact, rounded per invoice:  {fmt_krw(r['exact_per_invoice']):>20}")
+    print(f"  Python float sum:            {'₩' + format(r['float'], ',.2f'):>20}"
+          f"   (off by {r['float'] - r['exact_per_invoice']:+.4f} won vs exact invoice)")
+    print(f"\n  int64 kernel:   {r['n'] / r['t_int']:>14,.0f} orders/s")
+    print(f"  Python float:   {r['n'] / r['t_float']:>14,.0f} orders/s")
+    print(f"  Decimal:        {r['n'] / r['t_decimal']:>14,.0f} orders/s (extrapolated)")
+
+    print(f"\n  Exact helpers at ₩25,000 basket (per-invoice {DEFAULT_POLICY.rounding}):")
+    for name, price in pc.TIERS.items():
+        print(f"    {name:<5} break-even {break_even(price, 25_000):>4} (float {pc.break_even(price, 25_000):>4})"
+              f"   sweet spot {sweet_spot(price, 25_000):>4} (float {pc.sweet_spot(price, 25_000):>4})"
+              f"   cap {order_cap(price, 25_000, pc.CAP_FACTOR):>4}"
+              f" (float {pc.order_cap(price, 25_000, pc.CAP_FACTOR):>4})")
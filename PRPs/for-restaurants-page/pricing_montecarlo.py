@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Script: pricing_montecarlo.py
+Created: 2026-10-18
+Purpose: Monte Carlo restaurant-population simulator — plan mix, Foody7 net, infra loss, savings vs competitor
+Keywords: pricing, monte-carlo, simulation, population, multiprocessing, foody7
+Status: active
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import pricing_calculator as pc
+import pricing_grid as pg
+
+# ─────────────────────────────────────────────
+# CONFIG — default population
+# ─────────────────────────────────────────────
+
+# Monthly orders: long tail of small restaurants, a few very busy ones
+ORDERS_DIST = {"kind": "lognormal", "median": 60, "sigma": 1.0}
+
+# Basket size (KRW): centred on the ₩25k casual order, clipped to the Korea range
+BASKET_DIST = {"kind": "lognormal", "median": 25_000, "sigma": 0.35,
+               "low": 8_000, "high": 80_000}
+
+SHARD_SIZE = 250_000   # fixed shard size → same seeds regardless of worker count
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# ─────────────────────────────────────────────
+# SAMPLING
+# ─────────────────────────────────────────────
+
+def sample(dist, rng, size):
+    """Draw `size` values from a distribution spec dict.
+
+    kinds: lognormal(median, sigma) | gamma(mean, shape) | uniform(low, high)
+           choice(values, p) | constant(value)
+    Optional "low"/"high" clip the result.
+    """
+    kind = dist["kind"]
+    if kind == "lognormal":
+        x = rng.lognormal(np.log(dist["median"]), dist["sigma"], size)
+    elif kind == "gamma":
+        x = rng.gamma(dist["shape"], dist["mean"] / dist["shape"], size)
+    elif kind == "uniform":
+        x = rng.uniform(dist["low"], dist["high"], size)
+    elif kind == "choice":
+        x = rng.choice(np.asarray(dist["values"], dtype=np.float64), size, p=dist.get("p"))
+    elif kind == "constant":
+        x = np.full(size, float(dist["value"]))
+    else:
+        raise ValueError(f"unknown distribution kind: {kind!r}")
+    if "low" in dist or "high" in dist:
+        x = np.clip(x, dist.get("low"), dist.get("high"))
+    return x
+
+# ─────────────────────────────────────────────
+# SHARD KERNEL
+# ─────────────────────────────────────────────
+
+def simulate_shard(seed_seq, size, orders_dist, basket_dist, tier_prices, cap_factor):
+    """Simulate one shard; every restaurant picks its cheapest plan.
+
+    Returns (plan index, Foody7 net, infra loss, savings vs competitor) arrays.
+    """
+    rng = np.random.default_rng(seed_seq)
+    orders = np.rint(sample(orders_dist, rng, size))
+    orders = np.maximum(orders, 0)
+    avg = sample(basket_dist, rng, size)
+
+    costs = pg.plan_costs(orders, avg, tier_prices, cap_factor)
+    plan = np.argmin(costs, axis=0)
+    paid = np.take_along_axis(costs, plan[np.newaxis], axis=0)[0]
+
+    infra = orders * avg * pc.INFRA_COST_RATE
+    net = paid - infra
+    infra_loss = np.maximum(-net, 0)
+    savings = pg.competitor_commission(orders, avg) - paid
+    return plan.astype(np.int8), net, infra_loss, savings
+
+def _run_shard(args):
+    return simulate_shard(*args)
+
+# ─────────────────────────────────────────────
+# DRIVER
+# ─────────────────────────────────────────────
+
+def _summarise(values):
+    return {
+        "total": float(values.sum()),
+        "mean": float(values.mean()),
+        **{f"p{q}": float(v) for q, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))},
+    }
+
+def simulate(n_restaurants, seed=7, workers=None, tiers=None, cap_factor=None,
+             orders_dist=None, basket_dist=None, shard_size=SHARD_SIZE):
+    """Simulate a restaurant population sharded across a process pool.
+
+    Shards have a fixed size and are seeded by SeedSequence(seed).spawn(), so
+    the result is identical for any `workers` count (workers=1 runs in-process).
+    """
+    if n_restaurants < 1:
+        raise ValueError(f"n_restaurants must be at least 1, got {n_restaurants}")
+    tiers = pc.TIERS if tiers is None else tiers
+    cap_factor = pc.CAP_FACTOR if cap_factor is None else cap_factor
+    orders_dist = ORDERS_DIST if orders_dist is None else orders_dist
+    basket_dist = BASKET_DIST if basket_dist is None else basket_dist
+    tier_prices = np.array(list(tiers.values()), dtype=np.float64)
+
+    n_shards = -(-n_restaurants // shard_size)
+    seeds = np.random.SeedSequence(seed).spawn(n_shards)
+    sizes = [min(shard_size, n_restaurants - i * shard_size) for i in range(n_shards)]
+    jobs = [(s, n, orders_dist, basket_dist, tier_prices, cap_factor)
+            for s, n in zip(seeds, sizes)]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or n_shards == 1:
+        shards = list(map(_run_shard, jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            shards = list(pool.map(_run_shard, jobs))
+
+    plan, net, infra_loss, savings = (np.concatenate(col) for col in zip(*shards))
+    plan_names = ["Commission"] + list(tiers.keys())
+    counts = np.bincount(plan, minlength=len(plan_names))
+    return {
+        "restaurants": n_restaurants,
+        "plan_share": {name: int(c) / n_restaurants for name, c in zip(plan_names, counts)},
+        "foody7_net": _summarise(net),
+        "infra_loss": _summarise(infra_loss),
+        "loss_making_share": float((net < 0).mean()),
+        "savings_vs_competitor": _summarise(savings),
+    }
+
+# ─────────────────────────────────────────────
+# MAIN
+# ─────────────────────────────────────────────
+
+def print_simulation(result, elapsed):
+    print("═" * 80)
+    print(f"  Monte Carlo — {result['restaurants']:,} synthetic restaurants "
+          f"({result['restaurants'] / elapsed:,.0f}/s)")
+    print("═" * 80)
+    print(f"  {'Plan':<14} {'Share':>8}")
+    print("  " + "─" * 24)
+    for name, share in result["plan_share"].items():
+        print(f"  {name:<14} {share*100:>7.2f}%")
+    print()
+    print(f"  {'Metric':<24} {'Mean':>12} " + " ".join(f"{'p'+str(q):>12}" for q in PERCENTILES))
+    print("  " + "─" * 76)
+    for key in ("foody7_net", "infra_loss", "savings_vs_competitor"):
+        s = result[key]
+        print(f"  {key:<24} {pc.fmt_krw(s['mean']):>12} " +
+              " ".join(f"{pc.fmt_krw(s['p'+str(q)]):>12}" for q in PERCENTILES))
+    print()
+    print(f"  Loss-making restaurants (infra > revenue): {result['loss_making_share']*100:.2f}%")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[2])
+    parser.add_argument("-n", "--restaurants", type=int, default=1_000_000)
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--cap-factor", type=float, default=None)
+    args = parser.parse_args()
+    if args.restaurants < 1:
+        parser.error("--restaurants must be at least 1")
+
+    start = time.perf_counter()
+    result = simulate(args.restaurants, args.seed, args.workers, cap_factor=args.cap_factor)
+    print_simulation(result, time.perf_counter() - start)
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Script: pricing_optimizer.py
+Created: 2026-10-18
+Purpose: Tier price and cap optimizer — maximize expected Foody7 net margin under restaurant-savings constraints
+Keywords: pricing, optimization, tiers, caps, search, multiprocessing, foody7
+Status: active
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import pricing_calculator as pc
+import pricing_grid as pg
+import pricing_montecarlo as mc
+
+# ─────────────────────────────────────────────
+# CONFIG — default search space
+# ─────────────────────────────────────────────
+
+PRICE_STEPS = np.round(np.arange(0.6, 1.61, 0.1), 2)   # × current tier price
+CAP_FACTORS = [0.6, 0.7, 0.8, 0.9, 1.0]                  # × infra break-even (Section 5)
+AVG_REF = 25_000                                         # basket used to turn prices into caps
+MIN_SAVINGS = 0.25                                       # restaurant saves ≥25% vs 7% at the cap
+MIN_SPACING = 1.5                                        # each tier's price and cap ≥1.5× the tier below
+BATCH = 256
+POPULATION = 200_000
+ORDER_BINS = 120    # log-spaced order-count bins for the weighted population summary
+AVG_BINS = 40
+
+# ─────────────────────────────────────────────
+# CANDIDATES
+# ─────────────────────────────────────────────
+
+def candidate_grid(tiers=None, price_steps=PRICE_STEPS, cap_factors=CAP_FACTORS, avg_ref=AVG_REF):
+    """Cartesian product of per-tier price multipliers × shared cap factors.
+
+    Returns (prices (K, T), caps (K, T), cap_factor (K,)); caps follow
+    section5_caps.
+    """
+    tiers = pc.TIERS if tiers is None else tiers
+    base = np.array(list(tiers.values()), dtype=np.float64)
+    axes = np.meshgrid(*(b * np.asarray(price_steps) for b in base), indexing="ij")
+    prices = np.stack([a.ravel() for a in axes], axis=1)
+    caps = np.concatenate([section5_caps(prices, cf, avg_ref) for cf in cap_factors])
+    factors = np.repeat(np.asarray(cap_factors, dtype=np.float64), len(prices))
+    return np.tile(prices, (len(cap_factors), 1)), caps, factors
+
+def section5_caps(prices, cap_factor, avg_ref=AVG_REF):
+    """Section 5 rule, floor(floor(price / (avg_ref × infra)) × cap_factor), via pricing_grid"""
+    return pg.order_cap(prices, avg_ref, cap_factor)
+
+def feasible(prices, caps, avg_ref=AVG_REF, min_savings=MIN_SAVINGS, min_spacing=MIN_SPACING):
+    """Tiers spaced ≥min_spacing apart in price and cap, positive caps, and
+    ≥min_savings vs commission at every cap"""
+    spaced = ((prices[:, 1:] >= min_spacing * prices[:, :-1]).all(axis=1)
+              & (caps[:, 1:] >= min_spacing * caps[:, :-1]).all(axis=1))
+    monotone = spaced & (np.diff(prices, axis=1) > 0).all(axis=1) & (np.diff(caps, axis=1) > 0).all(axis=1)
+    commission_at_cap = caps * avg_ref * pc.COMMISSION_RATE
+    saves = (caps > 0) & (prices <= (1 - min_savings) * commission_at_cap)
+    return monotone & saves.all(axis=1)
+
+# ─────────────────────────────────────────────
+# OBJECTIVE KERNEL
+# ─────────────────────────────────────────────
+
+def evaluate(prices, caps, orders, avg, weights=None):
+    """Expected Foody7 net per restaurant for a batch of K candidate tier sets.
+
+    Every restaurant picks its cheapest option (commission or a tier, overflow
+    above the cap at the commission rate). Returns (net, adoption, savings),
+    each of shape (K,): weighted mean Foody7 net, share of restaurants on a
+    tier, and weighted mean saving vs commission.
+    """
+    rate = pc.COMMISSION_RATE
+    w = np.ones_like(orders) if weights is None else weights
+    w = w / w.sum()
+    per_order = avg * rate
+    commission = orders * per_order
+    best_tier = np.full((len(prices), len(orders)), np.inf)
+    for t in range(prices.shape[1]):   # running min over tiers keeps temporaries at (K, N)
+        tiered = np.maximum(orders - caps[:, t, np.newaxis], 0)
+        tiered *= per_order
+        tiered += prices[:, t, np.newaxis]
+        np.minimum(best_tier, tiered, out=best_tier)
+    paid = np.minimum(best_tier, commission)
+    infra = orders * avg * pc.INFRA_COST_RATE
+    net = (paid - infra) @ w
+    adoption = (best_tier < commission) @ w
+    savings = (commission - paid) @ w
+    return net, adoption, savings
+
+_population = None
+
+def _init_worker(orders, avg, weights):
+    global _population
+    _population = (orders, avg, weights)
+
+def _evaluate_batch(batch):
+    prices, caps = batch
+    return evaluate(prices, caps, *_population)
+
+# ─────────────────────────────────────────────
+# SEARCH
+# ─────────────────────────────────────────────
+
+def sample_population(n=POPULATION, seed=7):
+    """Default restaurant distribution: the Monte Carlo simulator's population"""
+    rng = np.random.default_rng(seed)
+    orders = np.maximum(np.rint(mc.sample(mc.ORDERS_DIST, rng, n)), 0)
+    avg = mc.sample(mc.BASKET_DIST, rng, n)
+    return orders, avg, None
+
+def bin_population(orders, avg, weights=None, order_bins=ORDER_BINS, avg_bins=AVG_BINS):
+    """Collapse a population into weighted (orders, avg) cell centroids.
+
+    The objective is evaluated for every candidate × restaurant, so it runs
+    on a few thousand weighted cells instead of the raw sample; within a
+    cell restaurants share a plan choice except near a cap or break-even.
+    """
+    w = np.ones_like(orders) if weights is None else np.asarray(weights, dtype=np.float64)
+    o_edges = np.unique(np.rint(np.geomspace(1, max(orders.max(), 1) + 1, order_bins)))
+    a_edges = np.linspace(avg.min(), avg.max() + 1, avg_bins + 1)
+    oi = np.searchsorted(o_edges, orders, side="right")
+    ai = np.clip(np.searchsorted(a_edges, avg, side="right") - 1, 0, avg_bins - 1)
+    cell = oi * avg_bins + ai
+    uniq, inv = np.unique(cell, return_inverse=True)
+    cw = np.bincount(inv, weights=w)
+    co = np.bincount(inv, weights=w * orders) / cw
+    ca = np.bincount(inv, weights=w * avg) / cw
+    return co, ca, cw
+
+def optimize(population=None, tiers=None, price_steps=PRICE_STEPS, cap_factors=CAP_FACTORS,
+             min_savings=MIN_SAVINGS, min_spacing=MIN_SPACING, min_adoption=0.0, workers=None,
+             batch=BATCH, top=10):
+    """Grid search over tier prices × cap factors; returns the top feasible candidates.
+
+    The baseline is the current prices with caps from the same Section 5 rule
+    at pc.CAP_FACTOR, so it is scored on the same terms as the candidates.
+    """
+    tiers = pc.TIERS if tiers is None else tiers
+    orders, avg, weights = sample_population() if population is None else population
+    orders, avg, weights = bin_population(orders, avg, weights)
+    prices, caps, factors = candidate_grid(tiers, price_steps, cap_factors)
+    ok = feasible(prices, caps, min_savings=min_savings, min_spacing=min_spacing)
+    prices, caps, factors = prices[ok], caps[ok], factors[ok]
+
+    batches = [(prices[i:i + batch], caps[i:i + batch]) for i in range(0, len(prices), batch)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(batches) <= 1:
+        _init_worker(orders, avg, weights)
+        results = list(map(_evaluate_batch, batches))
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(orders, avg, weights)) as pool:
+            results = list(pool.map(_evaluate_batch, batches))
+
+    if results:
+        net, adoption, savings = (np.concatenate(col) for col in zip(*results))
+    else:
+        net = adoption = savings = np.empty(0)
+    keep = adoption >= min_adoption
+    ranked = np.flatnonzero(keep)[np.argsort(-net[keep], kind="stable")][:top]
+
+    base_prices = np.array([list(tiers.values())], dtype=np.float64)
+    base_caps = section5_caps(base_prices, pc.CAP_FACTOR)
+    base = evaluate(base_prices, base_caps, orders, avg, weights)
+    names = list(tiers)
+    return {
+        "evaluated": int(ok.sum()),
+        "baseline": {"prices": dict(zip(names, base_prices[0])), "caps": dict(zip(names, base_caps[0])),
+                     "cap_factor": pc.CAP_FACTOR, "net": float(base[0][0]), "adoption": float(base[1][0]),
+                     "savings": float(base[2][0])},
+        "best": [{"prices": dict(zip(names, prices[i])), "caps": dict(zip(names, caps[i])),
+                  "cap_factor": float(factors[i]), "net": float(net[i]),
+                  "adoption": float(adoption[i]), "savings": float(savings[i])}
+                 for i in ranked],
+    }
+
+# ─────────────────────────────────────────────
+# MAIN
+# ─────────────────────────────────────────────
+
+def print_optimum(result, elapsed):
+    print("═" * 80)
+    print(f"  Tier optimizer — {result['evaluated']:,} feasible candidates in {elapsed:.2f}s")
+    print("═" * 80)
+    print(f"  {'Rank':<6} " + " ".join(f"{n:>16}" for n in result["baseline"]["prices"]) +
+          f" {'Foody7 net':>12} {'Adoption':>9}")
+    print("  " + "─" * 96)
+    rows = [("now", result["baseline"])] + [(str(i + 1), c) for i, c in enumerate(result["best"])]
+    for label, c in rows:
+        cells = " ".join(f"{pc.fmt_krw(p) + '/' + str(c['caps'][n]):>16}" for n, p in c["prices"].items())
+        print(f"  {label:<6} {cells} {pc.fmt_krw(c['net']):>12} {c['adoption']*100:>8.1f}%")
+    print("\n  Cells are price/cap; every row's caps follow the Section 5 rule at its cap factor.")
+    print("  Net and adoption are per-restaurant means over the population.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[2])
+    parser.add_argument("--population", help=".npz with orders, avg and optional weights")
+    parser.add_argument("--min-savings", type=float, default=MIN_SAVINGS)
+    parser.add_argument("--min-spacing", type=float, default=MIN_SPACING,
+                        help="minimum price and cap ratio between adjacent tiers")
+    parser.add_argument("--min-adoption", type=float, default=0.0)
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    population = None
+    if args.population:
+        data = np.load(args.population)
+        population = (data["orders"].astype(np.float64), data["avg"].astype(np.float64),
+                      data["weights"] if "weights" in data else None)
+    start = time.perf_counter()
+    result = optimize(population, min_savings=args.min_savings, min_spacing=args.min_spacing,
+                      min_adoption=args.min_adoption,
+                      workers=args.workers, top=args.top)
+    print_optimum(result, time.perf_counter() - start)
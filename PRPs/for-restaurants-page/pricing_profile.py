@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Script: pricing_profile.py
+Created: 2026-10-18
+Purpose: Hot-path instrumentation — call counts, timing percentiles, items/s and collapsed stacks, free until enabled
+Keywords: pricing, profiling, instrumentation, timing, percentiles, cprofile, flamegraph, foody7
+Status: active
+"""
+
+import contextlib
+import functools
+import inspect
+import random
+import sys
+import time
+from array import array
+from pathlib import Path
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+
+SAMPLE_LIMIT = 100_000      # per-probe duration samples kept (reservoir) for percentiles
+PERCENTILES = (50, 90, 99)
+
+# Items processed per call, from (args, kwargs, result)
+def _one(args, kwargs, result):
+    return 1
+
+def _size(args, kwargs, result):
+    return getattr(result, "size", 1)
+
+def _count(args, kwargs, result):
+    return len(result)
+
+def _grid_cells(args, kwargs, result):
+    return sum(g.values.size for g in result.values())
+
+def _table_rows(args, kwargs, result):
+    return sum(len(t.rows) for t in result.tables.values())
+
+def _arg_len(position, name):
+    def items(args, kwargs, result):
+        return len(args[position] if len(args) > position else kwargs[name])
+    return items
+
+# module → {function or "Class.method": items extractor (None: a generator's yields)}
+# pricing_calculator's section builders are reached through SECTIONS and probed as section:<key>
+HOT_PATHS = {
+    "pricing_calculator": {
+        "break_even": _one, "sweet_spot": _one, "order_cap": _one,
+        "foody7_net_subscription": _one, "render_report": _one,
+    },
+    "pricing_grid": {
+        "break_even": _size, "sweet_spot": _size, "order_cap": _size, "infra_cost": _size,
+        "foody7_net_subscription": _size, "foody7_net_commission": _size,
+        "plan_costs": _size, "scenario_grid": _grid_cells,
+    },
+    "pricing_money": {
+        "break_even": _one, "sweet_spot": _one, "order_cap": _one,
+        "invoices": _arg_len(1, "values"), "plan_costs": _size,
+    },
+    "pricing_ledger": {
+        "LedgerReplay.feed": _arg_len(3, "values"), "LedgerReplay.finish": None,
+    },
+    "pricing_cache": {
+        "SectionMemo.build": _one, "build_sections": _count,
+    },
+    "pricing_distribution": {
+        "compound": _one, "break_even_probability": _size, "tier_distributions": _one,
+    },
+}
+
+# ─────────────────────────────────────────────
+# PROBES
+# ─────────────────────────────────────────────
+
+class Probe:
+    """Timing record for one instrumented name"""
+
+    __slots__ = ("name", "calls", "total_ns", "self_ns", "items", "samples")
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.total_ns = 0
+        self.self_ns = 0
+        self.items = 0
+        self.samples = array("q")
+
+    def record(self, elapsed_ns, items):
+        self.calls += 1
+        self.total_ns += elapsed_ns
+        self.items += items
+        if len(self.samples) < SAMPLE_LIMIT:
+            self.samples.append(elapsed_ns)
+        else:
+            k = random.randrange(self.calls)
+            if k < SAMPLE_LIMIT:
+                self.samples[k] = elapsed_ns
+
+    def percentile(self, q):
+        """Nearest-rank percentile of the sampled call durations, in ns"""
+        ordered = sorted(self.samples)
+        if not ordered:
+            return 0
+        return ordered[min(len(ordered) - 1, max(0, -(-q * len(ordered) // 100) - 1))]
+
+    @property
+    def items_per_sec(self):
+        return self.items / (self.total_ns / 1e9) if self.total_ns else 0.0
+
+class Profiler:
+    """Probe registry plus the live call stack (for self time and collapsed stacks).
+
+    Stack frames are [name, child_ns, path]; a probe's self time is its
+    elapsed time minus the time spent in nested probes.
+    """
+
+    def __init__(self):
+        self.probes = {}
+        self.stack = []
+        self.collapsed = {}
+        self._patched = []
+
+    def probe(self, name):
+        p = self.probes.get(name)
+        if p is None:
+            p = self.probes[name] = Probe(name)
+        return p
+
+    def _enter(self, name):
+        path = f"{self.stack[-1][2]};{name}" if self.stack else name
+        self.stack.append([name, 0, path])
+        return time.perf_counter_ns()
+
+    def _leave(self, start):
+        elapsed = time.perf_counter_ns() - start
+        name, child, path = self.stack.pop()
+        if self.stack:
+            self.stack[-1][1] += elapsed
+        own = elapsed - child
+        self.probe(name).self_ns += own
+        self.collapsed[path] = self.collapsed.get(path, 0) + own
+        return elapsed
+
+    @contextlib.contextmanager
+    def region(self, name, items=0):
+        start = self._enter(name)
+        try:
+            yield
+        finally:
+            self.probe(name).record(self._leave(start), items)
+
+    def wrap(self, func, name, items=_one):
+        """Timed wrapper; generator functions are timed across their resumes as one call.
+
+        For a generator, items=None counts the values it yields.
+        """
+        if inspect.isgeneratorfunction(func):
+            @functools.wraps(func)
+            def gen_wrapper(*args, **kwargs):
+                gen = func(*args, **kwargs)
+                elapsed = yielded = 0
+                try:
+                    while True:
+                        start = self._enter(name)
+                        try:
+                            value = next(gen)
+                        except StopIteration:
+                            return
+                        finally:
+                            elapsed += self._leave(start)
+                        yielded += 1
+                        yield value
+                finally:
+                    gen.close()
+                    n = yielded if items is None else items(args, kwargs, None)
+                    self.probe(name).record(elapsed, n)
+            return gen_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = self._enter(name)
+            try:
+                result = func(*args, **kwargs)
+            except BaseException:
+                self.probe(name).record(self._leave(start), 0)
+                raise
+            self.probe(name).record(self._leave(start), items(args, kwargs, result))
+            return result
+        return wrapper
+
+    # ── patching ─────────────────────────────
+
+    def _set(self, owner, attr, value):
+        self._patched.append((owner, attr, getattr(owner, attr)))
+        setattr(owner, attr, value)
+
+    def patch(self, hot_paths=None):
+        """Swap the hot-path functions of every loaded module for timed wrappers"""
+        for module_name, targets in (HOT_PATHS if hot_paths is None else hot_paths).items():
+            short = module_name.removeprefix("pricing_")
+            for module in _loaded(module_name):
+                for target, items in targets.items():
+                    owner, _, attr = target.rpartition(".")
+                    obj = getattr(module, owner) if owner else module
+                    if hasattr(obj, attr):
+                        self._set(obj, attr, self.wrap(getattr(obj, attr), f"{short}.{target}", items))
+                sections = getattr(module, "SECTIONS", None)
+                if isinstance(sections, dict):
+                    for key, (builder, fmt) in list(sections.items()):
+                        wrapped = self.wrap(builder, f"section:{key}", _table_rows)
+                        self._patched.append((sections, key, sections[key]))
+                        sections[key] = (wrapped, fmt)
+
+    def unpatch(self):
+        for owner, attr, original in reversed(self._patched):
+            if isinstance(owner, dict):
+                owner[attr] = original
+            else:
+                setattr(owner, attr, original)
+        self._patched.clear()
+
+    # ── reports ──────────────────────────────
+
+    def summary_rows(self):
+        rows = []
+        for p in sorted(self.probes.values(), key=lambda p: p.total_ns, reverse=True):
+            rows.append((p.name, p.calls, p.total_ns / 1e6, p.self_ns / 1e6,
+                         p.total_ns / p.calls / 1e3 if p.calls else 0.0,
+                         *(p.percentile(q) / 1e3 for q in PERCENTILES),
+                         p.items, p.items_per_sec))
+        return rows
+
+    def print_summary(self, stream=None):
+        stream = stream or sys.stderr
+        pct = " ".join(f"{f'p{q} µs':>9}" for q in PERCENTILES)
+        print("═" * 80, file=stream)
+        print("  Profile — instrumented hot paths (total includes nested probes)", file=stream)
+        print("═" * 80, file=stream)
+        print(f"  {'Probe':<34} {'calls':>9} {'total ms':>9} {'self ms':>9} {'mean µs':>9} "
+              f"{pct} {'items':>11} {'items/s':>13}", file=stream)
+        print("  " + "─" * (127 + 10 * (len(PERCENTILES) - 3)), file=stream)
+        for name, calls, total, own, mean, *rest in self.summary_rows():
+            *pcts, items, rate = rest
+            print(f"  {name:<34} {calls:>9,} {total:>9.1f} {own:>9.1f} {mean:>9.1f} "
+                  + " ".join(f"{v:>9.1f}" for v in pcts)
+                  + f" {items:>11,} {rate:>13,.0f}", file=stream)
+
+    def write_collapsed(self, path):
+        """Brendan Gregg collapsed-stack format (frame;frame;frame self_µs), for flamegraph.pl / speedscope"""
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, ns in sorted(self.collapsed.items()):
+                if ns >= 1_000:
+                    f.write(f"{stack} {ns // 1_000}\n")
+
+def _loaded(module_name):
+    """The imported module plus __main__ when that module is running as a script"""
+    modules = []
+    if module_name in sys.modules:
+        modules.append(sys.modules[module_name])
+    main = sys.modules.get("__main__")
+    if main is not None and Path(getattr(main, "__file__", "") or "").stem == module_name:
+        modules.append(main)
+    return modules
+
+# ─────────────────────────────────────────────
+# MODULE API — nothing is wrapped until enable()
+# ─────────────────────────────────────────────
+
+_active = None
+_NULL = contextlib.nullcontext()
+
+def enable(hot_paths=None):
+    """Start profiling: instrument the hot paths of every loaded pricing module"""
+    global _active
+    if _active is None:
+        _active = Profiler()
+        _active.patch(hot_paths)
+    return _active
+
+def disable():
+    """Restore the original functions; returns the profiler with its collected probes"""
+    global _active
+    profiler, _active = _active, None
+    if profiler is not None:
+        profiler.unpatch()
+    return profiler
+
+def active():
+    return _active
+
+def region(name, items=0):
+    """Context manager timing an ad-hoc block; a shared no-op while profiling is off"""
+    if _active is None:
+        return _NULL
+    return _active.region(name, items)
+
+# ─────────────────────────────────────────────
+# CLI HOOKS — shared --profile flags for the scripts' mains
+# ─────────────────────────────────────────────
+
+def add_arguments(parser):
+    group = parser.add_argument_group("profiling")
+    group.add_argument("--profile", action="store_true",
+                       help="print a hot-path timing table to stderr when done")
+    group.add_argument("--profile-pstats", metavar="FILE",
+                       help="also run under cProfile and dump pstats to FILE")
+    group.add_argument("--profile-collapsed", metavar="FILE",
+                       help="write instrumented stacks in flamegraph collapsed format")
+
+@contextlib.contextmanager
+def session(args, stream=None):
+    """Profile the enclosed block when any --profile flag was given"""
+    if not (args.profile or args.profile_pstats or args.profile_collapsed):
+        yield None
+        return
+    profiler = enable()
+    cprof = None
+    if args.profile_pstats:
+        import cProfile
+        cprof = cProfile.Profile()
+        cprof.enable()
+    try:
+        yield profiler
+    finally:
+        if cprof is not None:
+            cprof.disable()
+            cprof.dump_stats(args.profile_pstats)
+        disable()
+        profiler.print_summary(stream)
+        if args.profile_collapsed:
+            profiler.write_collapsed(args.profile_collapsed)
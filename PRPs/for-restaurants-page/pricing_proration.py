@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Script: pricing_proration.py
+Created: 2026-10-18
+Purpose: Exact prorated auto-upgrade vs NOTIFY/manual cost over a month of timestamped orders
+Keywords: pricing, proration, auto-upgrade, overflow, caps, vectorized, foody7
+Status: active
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+import pricing_calculator as pc
+
+DAY = 86_400
+
+# ─────────────────────────────────────────────
+# ENGINE
+# ─────────────────────────────────────────────
+
+def month_bounds(month):
+    """(start, end) as datetime64[s] for 'YYYY-MM'"""
+    m = np.datetime64(month, "M")
+    return m.astype("datetime64[s]"), (m + 1).astype("datetime64[s]")
+
+def prorate_month(restaurants, timestamps, values, plans, month,
+                  tiers=None, caps=None, granularity="day"):
+    """Compare AUTO-UPGRADE with NOTIFY/manual billing for every restaurant.
+
+    restaurants: int ids 0..R-1 per order; timestamps: datetime64 per order;
+    values: order value per order; plans: starting plan per restaurant
+    (0 = commission, i = i-th TIERS entry).
+
+    MANUAL: tier fee + 7% on every order beyond the cap.
+    AUTO:   each time the running order count passes the current tier's cap
+            the restaurant moves to the next tier; every tier is charged for
+            the share of the month it was active. Overflow past the top tier's
+            cap is billed at 7%. granularity="day" charges the crossing day to
+            the new tier; "exact" prorates to the second.
+    Orders are sorted once by (restaurant, timestamp); crossing points come
+    from per-restaurant offsets into the sorted arrays, so the only Python
+    loop is over upgrade steps (at most len(TIERS)).
+    """
+    tiers = pc.TIERS if tiers is None else tiers
+    caps = pc.TIER_CAPS if caps is None else caps
+    price = np.array([0.0] + [float(tiers[n]) for n in tiers])
+    cap_of = np.array([0] + [caps[n] for n in tiers], dtype=np.int64)
+    top = len(tiers)
+    rate = pc.COMMISSION_RATE
+
+    plans = np.asarray(plans, dtype=np.int64)
+    n_rest = len(plans)
+    restaurants = np.asarray(restaurants, dtype=np.int64)
+    start, end = month_bounds(month)
+    span = (end - start).astype(np.int64)
+    offsets = (np.asarray(timestamps).astype("datetime64[s]") - start).astype(np.int64)
+    if offsets.size and (offsets.min() < 0 or offsets.max() >= span):
+        raise ValueError(f"timestamps fall outside {month}")
+    # One int64 sort key (restaurant, second) is much cheaper than a lexsort
+    order = np.argsort(restaurants * span + offsets)
+    r = restaurants[order]
+    t = offsets[order]
+    v = np.asarray(values, dtype=np.float64)[order]
+
+    counts = np.bincount(r, minlength=n_rest)
+    group_start = np.cumsum(counts) - counts
+    cumv = np.r_[0.0, np.cumsum(v)]
+
+    def value_upto(k):
+        """Sum of each restaurant's first k orders"""
+        return cumv[group_start + k] - cumv[group_start]
+
+    def time_of(k, mask):
+        """Seconds into the month of each masked restaurant's k-th order (0-based)"""
+        return t[group_start[mask] + k[mask]]
+
+    if granularity == "day":
+        period = span // DAY
+        to_units = lambda secs: secs // DAY
+    elif granularity == "exact":
+        period = span
+        to_units = lambda secs: secs
+    else:
+        raise ValueError(f"unknown granularity: {granularity!r}")
+
+    total_value = value_upto(counts)
+    capped = plans > 0
+    first_cap = cap_of[plans]
+    manual = price[plans] + rate * np.where(
+        capped, total_value - value_upto(np.minimum(first_cap, counts)), total_value)
+
+    crossed_at = np.full(n_rest, -1, dtype=np.int64)
+    cur = plans.copy()
+    seg_start = np.zeros(n_rest, dtype=np.int64)
+    auto = np.zeros(n_rest)
+    while True:
+        cap = cap_of[cur]
+        crossing = capped & (cur < top) & (counts > cap)
+        if not crossing.any():
+            break
+        units = to_units(time_of(cap, crossing))
+        auto[crossing] += price[cur[crossing]] * (units - seg_start[crossing]) / period
+        first = crossing & (crossed_at < 0)
+        crossed_at[first] = time_of(cap, first)
+        seg_start[crossing] = units
+        cur[crossing] += 1
+    auto += np.where(capped, price[cur] * (period - seg_start) / period, 0.0)
+    top_cap = cap_of[cur]
+    auto += rate * np.where(
+        capped, total_value - value_upto(np.minimum(top_cap, counts)), total_value)
+
+    upgraded = cur != plans
+    next_price = price[np.minimum(plans + 1, top)]
+    simplified = np.where(upgraded, next_price, manual)
+
+    return {
+        "orders": counts,
+        "start_plan": plans,
+        "final_plan": cur,
+        "cap_crossed_at": np.where(crossed_at >= 0, start + crossed_at, np.datetime64("NaT")),
+        "manual_cost": manual,
+        "auto_cost": auto,
+        "simplified_auto_cost": simplified,
+        "auto_saving": manual - auto,
+    }
+
+# ─────────────────────────────────────────────
+# MAIN — synthetic month for a restaurant portfolio
+# ─────────────────────────────────────────────
+
+def synthetic_month(n_restaurants, month="2026-01", seed=7):
+    rng = np.random.default_rng(seed)
+    plans = rng.choice(len(pc.TIERS) + 1, n_restaurants, p=[0.4, 0.3, 0.15, 0.1, 0.05])
+    caps = np.array([60] + list(pc.TIER_CAPS.values()))
+    orders = rng.poisson(caps[plans] * rng.uniform(0.5, 1.5, n_restaurants))
+    restaurants = np.repeat(np.arange(n_restaurants), orders)
+    start, end = month_bounds(month)
+    span = (end - start).astype(np.int64)
+    timestamps = start + rng.integers(0, span, restaurants.size).astype("timedelta64[s]")
+    values = np.rint(rng.lognormal(np.log(25_000), 0.35, restaurants.size))
+    return restaurants, timestamps, values, plans
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[2])
+    parser.add_argument("--restaurants", type=int, default=100_000)
+    parser.add_argument("--granularity", choices=["day", "exact"], default="day")
+    args = parser.parse_args()
+
+    data = synthetic_month(args.restaurants)
+    start = time.perf_counter()
+    res = prorate_month(*data, "2026-01", granularity=args.granularity)
+    elapsed = time.perf_counter() - start
+
+    print("═" * 80)
+    print(f"  Prorated auto-upgrade vs manual — {args.restaurants:,} restaurants, "
+          f"{data[0].size:,} orders ({elapsed:.2f}s)")
+    print("═" * 80)
+    print(f"  {'Start plan':<12} {'Crossed cap':>12} {'Manual':>16} {'Auto (prorated)':>18} "
+          f"{'Auto (full month)':>18} {'Auto wins':>10}")
+    print("  " + "─" * 92)
+    names = ["Commission"] + list(pc.TIERS)
+    for p, name in enumerate(names[1:], start=1):
+        sel = (res["start_plan"] == p) & (res["final_plan"] != p)
+        if not sel.any():
+            continue
+        print(f"  {name:<12} {sel.sum():>12,} {pc.fmt_krw(res['manual_cost'][sel].mean()):>16} "
+              f"{pc.fmt_krw(res['auto_cost'][sel].mean()):>18} "
+              f"{pc.fmt_krw(res['simplified_auto_cost'][sel].mean()):>18} "
+              f"{(res['auto_saving'][sel] > 0).mean()*100:>9.1f}%")
+    print("\n  Averages over restaurants that crossed their cap this month.")
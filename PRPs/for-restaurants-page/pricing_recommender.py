@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Script: pricing_recommender.py
+Created: 2026-10-18
+Purpose: Bulk cost-minimizing plan recommender over per-restaurant order histories
+Keywords: pricing, recommendation, plans, argmin, vectorized, dashboard, foody7
+Status: active
+"""
+
+import argparse
+import csv
+import time
+
+import numpy as np
+
+import pricing_calculator as pc
+import pricing_grid as pg
+
+CHUNK_RESTAURANTS = 50_000   # bounds the (plan, restaurant, month) cost cube in memory
+
+# ─────────────────────────────────────────────
+# RECOMMENDER
+# ─────────────────────────────────────────────
+
+def recommend_plans(orders, avg, current_plan=None, tiers=None, cap_factor=None,
+                    chunk=CHUNK_RESTAURANTS):
+    """Cheapest plan per restaurant over its history.
+
+    orders: (restaurants, months) order counts; avg: basket per restaurant-month,
+    same shape or (restaurants,). current_plan: plan index per restaurant
+    (0 = commission, i = i-th tier), default commission.
+
+    For every plan the monthly bill comes from pricing_grid.plan_costs (caps
+    as in Section 5 scaled by cap_factor, overflow at COMMISSION_RATE); the
+    history is averaged per plan and argmin'd over the plan axis.
+    """
+    tiers = pc.TIERS if tiers is None else tiers
+    cap_factor = pc.CAP_FACTOR if cap_factor is None else cap_factor
+    prices = np.array(list(tiers.values()), dtype=np.float64)
+    orders = np.asarray(orders, dtype=np.float64)
+    avg = np.asarray(avg, dtype=np.float64)
+    if avg.ndim == 1:
+        avg = avg[:, np.newaxis]
+    n_rest = orders.shape[0]
+    current = (np.zeros(n_rest, dtype=np.int64) if current_plan is None
+               else np.asarray(current_plan, dtype=np.int64))
+
+    expected = np.empty((len(prices) + 1, n_rest))
+    for lo in range(0, n_rest, chunk):
+        hi = min(lo + chunk, n_rest)
+        costs = pg.plan_costs(orders[lo:hi], avg[lo:hi], prices, cap_factor)
+        expected[:, lo:hi] = costs.mean(axis=2)
+
+    infra = (orders * avg).mean(axis=1) * pc.INFRA_COST_RATE
+    best = np.argmin(expected, axis=0)
+    rows = np.arange(n_rest)
+    best_cost = expected[best, rows]
+    current_cost = expected[current, rows]
+    return {
+        "plan_names": ["Commission"] + list(tiers),
+        "expected_cost": expected,
+        "current_plan": current,
+        "best_plan": best,
+        "current_cost": current_cost,
+        "best_cost": best_cost,
+        "savings": current_cost - best_cost,
+        "foody7_net_current": current_cost - infra,
+        "foody7_net_best": best_cost - infra,
+        "margin_impact": best_cost - current_cost,
+    }
+
+def write_recommendations(path, rec, restaurant_ids=None):
+    """Dashboard export: one row per restaurant whose best plan differs from its current one"""
+    names = rec["plan_names"]
+    ids = np.arange(len(rec["best_plan"])) if restaurant_ids is None else restaurant_ids
+    move = np.flatnonzero(rec["best_plan"] != rec["current_plan"])
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["restaurant_id", "current_plan", "recommended_plan",
+                         "monthly_savings", "foody7_margin_impact", "foody7_net_after"])
+        for i in move:
+            writer.writerow([ids[i], names[rec["current_plan"][i]], names[rec["best_plan"][i]],
+                             round(rec["savings"][i]), round(rec["margin_impact"][i]),
+                             round(rec["foody7_net_best"][i])])
+    return len(move)
+
+# ─────────────────────────────────────────────
+# MAIN
+# ─────────────────────────────────────────────
+
+def synthetic_history(n_restaurants, months=24, seed=7):
+    rng = np.random.default_rng(seed)
+    level = rng.lognormal(np.log(60), 1.0, n_restaurants)[:, np.newaxis]
+    growth = rng.normal(0.01, 0.03, n_restaurants)[:, np.newaxis]
+    trend = level * np.exp(growth * np.arange(months))
+    orders = rng.poisson(trend).astype(np.float64)
+    avg = np.clip(rng.lognormal(np.log(25_000), 0.35, n_restaurants), 8_000, 80_000)
+    current = rng.choice(len(pc.TIERS) + 1, n_restaurants, p=[0.5, 0.25, 0.15, 0.07, 0.03])
+    return orders, avg, current
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[2])
+    parser.add_argument("--history", help=".npz with orders (R×M), avg (R×M or R), optional current_plan")
+    parser.add_argument("--restaurants", type=int, default=500_000, help="synthetic size if no --history")
+    parser.add_argument("--months", type=int, default=24)
+    parser.add_argument("--out", help="write dashboard recommendations CSV")
+    args = parser.parse_args()
+
+    if args.history:
+        data = np.load(args.history)
+        orders, avg = data["orders"], data["avg"]
+        current = data["current_plan"] if "current_plan" in data else None
+    else:
+        orders, avg, current = synthetic_history(args.restaurants, args.months)
+
+    start = time.perf_counter()
+    rec = recommend_plans(orders, avg, current)
+    elapsed = time.perf_counter() - start
+
+    names = rec["plan_names"]
+    print("═" * 80)
+    print(f"  Plan recommendations — {orders.shape[0]:,} restaurants × {orders.shape[1]} months "
+          f"({elapsed:.2f}s)")
+    print("═" * 80)
+    print(f"  {'Plan':<12} {'Current':>10} {'Recommended':>12}")
+    print("  " + "─" * 36)
+    for p, name in enumerate(names):
+        print(f"  {name:<12} {(rec['current_plan'] == p).sum():>10,} {(rec['best_plan'] == p).sum():>12,}")
+    movers = rec["best_plan"] != rec["current_plan"]
+    print()
+    print(f"  Restaurants that should switch: {movers.sum():,}")
+    print(f"  Total restaurant savings:       {pc.fmt_krw(rec['savings'].sum())}/mo")
+    print(f"  Foody7 margin impact:           {pc.fmt_krw(rec['margin_impact'].sum())}/mo")
+    print(f"  Loss-making after switch:       {(rec['foody7_net_best'] < 0).sum():,}")
+    if args.out:
+        n = write_recommendations(args.out, rec)
+        print(f"  Wrote {n:,} recommendations → {args.out}")
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Script: pricing_render.py
+Created: 2026-10-18
+Purpose: Structured section results and buffered renderers (text, JSON, CSV, Markdown) for the pricing calculator
+Keywords: pricing, report, render, json, csv, markdown, foody7
+Status: active
+"""
+
+import csv
+import io
+import json
+
+# ─────────────────────────────────────────────
+# RESULT MODEL
+# ─────────────────────────────────────────────
+
+class Table:
+    """Named rectangular table of raw (unformatted) values"""
+
+    __slots__ = ("name", "columns", "rows", "keys")
+
+    def __init__(self, name, columns, rows=None, keys=None):
+        self.name = name
+        self.columns = list(columns)
+        self.rows = [] if rows is None else rows
+        self.keys = self.columns[:1] if keys is None else list(keys)   # columns identifying a row
+
+    def add(self, *values):
+        self.rows.append(list(values))
+
+    def records(self):
+        return [dict(zip(self.columns, row)) for row in self.rows]
+
+    def to_dict(self):
+        return {"columns": self.columns, "keys": self.keys, "rows": self.rows}
+
+class SectionResult:
+    """Everything a section computed: parameters, tables and fixed prose notes"""
+
+    __slots__ = ("key", "title", "params", "tables", "notes")
+
+    def __init__(self, key, title, params=None, tables=None, notes=None):
+        self.key = key
+        self.title = title
+        self.params = params or {}
+        self.tables = tables or {}
+        self.notes = notes or {}
+
+    def table(self, name):
+        return self.tables[name]
+
+    def add_table(self, table):
+        self.tables[table.name] = table
+        return table
+
+    def to_dict(self):
+        return {
+            "key": self.key,
+            "title": self.title,
+            "params": self.params,
+            "tables": {name: t.to_dict() for name, t in self.tables.items()},
+            "notes": self.notes,
+        }
+
+# ─────────────────────────────────────────────
+# RENDERERS — each writes a list of SectionResults to one text stream
+# ─────────────────────────────────────────────
+
+class TextRenderer:
+    """Terminal report; per-section layout comes from the `formatters` mapping"""
+
+    def __init__(self, formatters):
+        self.formatters = formatters
+
+    def render(self, results, stream):
+        def w(line=""):
+            stream.write(line)
+            stream.write("\n")
+        for result in results:
+            self.formatters[result.key](result, w)
+
+class JsonRenderer:
+    def __init__(self, indent=2):
+        self.indent = indent
+
+    def render(self, results, stream):
+        json.dump([r.to_dict() for r in results], stream, indent=self.indent, ensure_ascii=False)
+        stream.write("\n")
+
+class CsvRenderer:
+    """One CSV block per table, each preceded by a `# section.table` line"""
+
+    def render(self, results, stream):
+        writer = csv.writer(stream, lineterminator="\n")
+        first = True
+        for result in results:
+            for table in result.tables.values():
+                if not first:
+                    stream.write("\n")
+                first = False
+                stream.write(f"# {result.key}.{table.name}\n")
+                writer.writerow(table.columns)
+                writer.writerows(table.rows)
+
+class MarkdownRenderer:
+    def render(self, results, stream):
+        for result in results:
+            stream.write(f"## {result.title}\n\n")
+            if result.params:
+                for k, v in result.params.items():
+                    stream.write(f"- **{k}**: {v}\n")
+                stream.write("\n")
+            for table in result.tables.values():
+                stream.write(f"### {table.name}\n\n")
+                stream.write("| " + " | ".join(map(str, table.columns)) + " |\n")
+                stream.write("|" + "---|" * len(table.columns) + "\n")
+                for row in table.rows:
+                    stream.write("| " + " | ".join(_md_cell(v) for v in row) + " |\n")
+                stream.write("\n")
+            for name, text in result.notes.items():
+                stream.write(f"### {name}\n\n```\n{text.strip(chr(10))}\n```\n\n")
+
+def _md_cell(value):
+    if isinstance(value, float):
+        return f"{value:,.2f}"
+    return str(value)
+
+RENDERERS = {
+    "json": JsonRenderer,
+    "csv": CsvRenderer,
+    "markdown": MarkdownRenderer,
+}
+
+def render_to_string(renderer, results):
+    """Render into an in-memory buffer so the caller can emit it with one write"""
+    buf = io.StringIO()
+    renderer.render(results, buf)
+    return buf.getvalue()
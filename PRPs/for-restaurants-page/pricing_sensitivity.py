@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Script: pricing_sensitivity.py
+Created: 2026-10-18
+Purpose: Sensitivity analysis — closed-form partials, batched finite differences, elasticities and tornado rankings
+Keywords: pricing, sensitivity, elasticity, tornado, derivatives, finite-differences, foody7
+Status: active
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+import pricing_calculator as pc
+import pricing_grid as pg
+import pricing_optimizer as opt
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+
+PARAMS = ("commission_rate", "infra_rate", "tier_price", "cap_factor", "avg")
+METRICS = ("foody7_net", "savings")
+SWING = 0.10          # tornado: every knob moved ±10% from its base value
+FD_STEP = 0.05        # relative step for finite differences (wide enough to cross cap steps)
+# Knobs that enter order_cap → their cell_metrics argument; differenced so the cap steps count
+CAP_KNOBS = {"tier_price": "price", "infra_rate": "infra_rate", "cap_factor": "cap_factor", "avg": "avg"}
+ELASTICITY_FLOOR = 0.05   # cells with |metric| under this share of the tier's largest |metric| are skipped
+
+# ─────────────────────────────────────────────
+# PER-TIER CELL MODEL — restaurant on tier t at (orders, avg)
+# ─────────────────────────────────────────────
+
+def cell_metrics(price, orders, avg, commission_rate, infra_rate, cap_factor):
+    """Foody7 net and restaurant savings vs commission for a restaurant on a tier.
+
+    The cap follows Section 5 (infra break-even × cap_factor, floored);
+    orders beyond it are billed at the commission rate.
+    """
+    cap = pg.order_cap(price, avg, cap_factor, infra_rate)
+    covered = np.minimum(orders, cap)
+    overflow = orders - covered
+    net = price + commission_rate * avg * overflow - infra_rate * orders * avg
+    savings = commission_rate * avg * covered - price
+    return net, savings
+
+def analytic_partials(price, orders, avg, commission_rate, infra_rate, cap_factor):
+    """Closed-form ∂metric/∂commission_rate, all cells at once.
+
+    commission_rate is the one knob outside order_cap. The others (tier
+    price, infra rate, cap_factor, avg) move the floored cap in steps as
+    well as the metrics, so they are left to finite_differences().
+    """
+    cap = pg.order_cap(price, avg, cap_factor, infra_rate)
+    covered = np.minimum(orders, cap).astype(np.float64)
+    overflow = orders - covered
+    ones = np.ones(np.broadcast(price, orders, avg).shape)
+    return {
+        "foody7_net": {"commission_rate": avg * overflow * ones},
+        "savings": {"commission_rate": avg * covered * ones},
+    }
+
+def finite_differences(fn, base, params, rel_step=FD_STEP):
+    """Central differences for several knobs in one batched call.
+
+    `fn(**knobs)` must broadcast; each knob's ± perturbation is stacked on a
+    new leading axis so the whole grid is evaluated once for all of them.
+    Returns {metric index: {param: array}}.
+    """
+    k = len(params)
+    ndim = max(np.ndim(v) for v in base.values())
+    knobs = {}
+    for name, value in base.items():
+        value = np.asarray(value, dtype=np.float64)
+        stacked = np.broadcast_to(value, (2 * k,) + value.shape).copy()
+        if name in params:
+            i = params.index(name)
+            stacked[2 * i] = value * (1 + rel_step)
+            stacked[2 * i + 1] = value * (1 - rel_step)
+        # pad between the batch axis and the knob's own axes (numpy aligns from the right)
+        knobs[name] = stacked.reshape((2 * k,) + (1,) * (ndim - value.ndim) + value.shape)
+    outputs = fn(**knobs)
+    result = []
+    for out in outputs:
+        result.append({p: (out[2 * i] - out[2 * i + 1])
+                       / (2 * rel_step * np.asarray(base[p], dtype=np.float64))
+                       for i, p in enumerate(params)})
+    return result
+
+def grid_sensitivity(cfg=None, orders=None, avgs=None):
+    """Partials of both metrics wrt every knob over the tier × orders × avg grid.
+
+    Returns {metric: {param: LabelledGrid}}; commission_rate is closed form,
+    every knob that enters the order cap is one batched central difference.
+    """
+    cfg = cfg or pc.PricingConfig()
+    orders = np.asarray(cfg.order_range if orders is None else orders, dtype=np.float64)
+    avgs = np.asarray(cfg.avg_order_values if avgs is None else avgs, dtype=np.float64)
+    prices = np.array(list(cfg.tiers.values()), dtype=np.float64)
+    dims = ("tier", "orders", "avg")
+    coords = {"tier": np.array(list(cfg.tiers)), "orders": orders, "avg": avgs}
+    base = {
+        "price": prices[:, None, None],
+        "orders": orders[None, :, None],
+        "avg": avgs[None, None, :],
+        "commission_rate": cfg.commission_rate,
+        "infra_rate": cfg.infra_rate,
+        "cap_factor": cfg.cap_factor,
+    }
+    values = dict(zip(METRICS, cell_metrics(**base)))
+    partials = analytic_partials(**base)
+    fd = finite_differences(cell_metrics, base, list(CAP_KNOBS.values()))
+    for m, metric in enumerate(METRICS):
+        for param, arg in CAP_KNOBS.items():
+            partials[metric][param] = fd[m][arg]
+    return {
+        metric: {
+            "value": pg.LabelledGrid(dims, coords, values[metric]),
+            **{p: pg.LabelledGrid(dims, coords, np.broadcast_to(partials[metric][p], values[metric].shape))
+               for p in PARAMS},
+        }
+        for metric in METRICS
+    }
+
+def elasticities(grid, cfg=None, floor=ELASTICITY_FLOOR):
+    """Median per-cell elasticity ∂m/∂θ · θ / m per tier over the orders × avg cells.
+
+    Net margin and savings cross zero inside the grid (around break-even and
+    the cap), where a ratio to m is meaningless, so cells with |m| below
+    `floor` × the tier's largest |m| are left out. A tier with no such cell
+    gets NaN.
+    """
+    cfg = cfg or pc.PricingConfig()
+    avgs = grid[METRICS[0]]["value"].coords["avg"]
+    prices = np.array(list(cfg.tiers.values()), dtype=np.float64)
+    scale = {
+        "commission_rate": cfg.commission_rate,
+        "infra_rate": cfg.infra_rate,
+        "tier_price": prices[:, None, None],
+        "cap_factor": cfg.cap_factor,
+        "avg": avgs[None, None, :],
+    }
+    table = {}
+    for metric in METRICS:
+        value = grid[metric]["value"].values
+        size = np.abs(value)
+        valid = size > floor * size.max(axis=(1, 2), keepdims=True)
+        table[metric] = {}
+        for p in PARAMS:
+            cell = grid[metric][p].values * scale[p] / np.where(valid, value, 1.0)
+            table[metric][p] = np.array([np.median(cell[t][valid[t]]) if valid[t].any() else np.nan
+                                         for t in range(len(value))])
+    return table
+
+# ─────────────────────────────────────────────
+# PORTFOLIO MODEL — population picks its cheapest plan
+# ─────────────────────────────────────────────
+
+def portfolio_metrics(prices, commission_rate, infra_rate, cap_factor, avg_scale,
+                      orders, avg, weights):
+    """Weighted mean Foody7 net and restaurant savings for K knob settings at once.
+
+    prices: (K, T); the scalar knobs: (K,). Every restaurant cell picks the
+    cheapest of commission and the tiers (Section 5 caps, overflow at the
+    commission rate), which makes the metrics non-smooth in every knob.
+    """
+    rate = commission_rate[:, None]
+    infra = infra_rate[:, None]
+    a = avg[None, :] * avg_scale[:, None]                          # (K, N)
+    commission = orders * a * rate
+    paid = commission.copy()
+    for t in range(prices.shape[1]):
+        price = prices[:, t, None]
+        cap = np.floor(np.floor(price / (a * infra)) * cap_factor[:, None])
+        np.minimum(paid, price + np.maximum(orders - cap, 0) * a * rate, out=paid)
+    w = weights / weights.sum()
+    net = (paid - orders * a * infra) @ w
+    savings = (commission - paid) @ w
+    return net, savings
+
+def tornado(cfg=None, population=None, swing=SWING):
+    """Low/high portfolio metrics when each knob moves ±swing, largest swing first.
+
+    All 2 × knobs settings are evaluated in one batched portfolio call.
+    Tier prices are separate knobs (one per tier).
+    """
+    cfg = cfg or pc.PricingConfig()
+    orders, avg, weights = opt.bin_population(*(population or opt.sample_population()))
+    names = list(cfg.tiers)
+    knobs = ["commission_rate", "infra_rate", *[f"price[{n}]" for n in names], "cap_factor", "avg"]
+    base_prices = np.array(list(cfg.tiers.values()), dtype=np.float64)
+    base = {"commission_rate": cfg.commission_rate, "infra_rate": cfg.infra_rate,
+            "cap_factor": cfg.cap_factor, "avg": 1.0}
+
+    k = 2 * len(knobs) + 1                       # last row is the baseline
+    prices = np.tile(base_prices, (k, 1))
+    scalars = {name: np.full(k, value) for name, value in base.items()}
+    for i, knob in enumerate(knobs):
+        for j, factor in enumerate((1 - swing, 1 + swing)):
+            row = 2 * i + j
+            if knob.startswith("price["):
+                prices[row, names.index(knob[6:-1])] *= factor
+            else:
+                scalars[knob][row] *= factor
+    net, savings = portfolio_metrics(prices, scalars["commission_rate"], scalars["infra_rate"],
+                                     scalars["cap_factor"], scalars["avg"], orders, avg, weights)
+    result = {}
+    for metric, values in (("foody7_net", net), ("savings", savings)):
+        rows = [(knob, values[2 * i], values[2 * i + 1]) for i, knob in enumerate(knobs)]
+        rows.sort(key=lambda r: abs(r[2] - r[1]), reverse=True)
+        result[metric] = {"base": float(values[-1]), "rows": rows}
+    return result
+
+# ─────────────────────────────────────────────
+# MAIN
+# ─────────────────────────────────────────────
+
+def print_elasticities(table, cfg):
+    for metric, by_param in table.items():
+        print(f"\n  Elasticity of {metric} (per tier, median over cells, % change per 1% knob move):")
+        print(f"  {'Tier':<6} " + " ".join(f"{p:>16}" for p in PARAMS))
+        print("  " + "─" * 92)
+        for t, name in enumerate(cfg.tiers):
+            print(f"  {name:<6} " + " ".join(f"{by_param[p][t]:>16.2f}" for p in PARAMS))
+
+def print_tornado(result, swing):
+    for metric, data in result.items():
+        print(f"\n  Tornado — portfolio {metric} per restaurant (base {pc.fmt_krw(data['base'])}), "
+              f"knobs ±{swing:.0%}:")
+        widest = max(abs(hi - lo) for _, lo, hi in data["rows"]) or 1.0
+        for knob, lo, hi in data["rows"]:
+            bar = "█" * round(abs(hi - lo) / widest * 30)
+            print(f"  {knob:<16} {pc.fmt_krw(lo):>11} → {pc.fmt_krw(hi):<11} "
+                  f"{hi - lo:>+10,.0f}  {bar}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[2])
+    parser.add_argument("--config", help="pricing scenario file (JSON/TOML)")
+    parser.add_argument("--swing", type=float, default=SWING, help="tornado knob move (fraction)")
+    args = parser.parse_args()
+
+    cfg = pc.PricingConfig.from_file(args.config) if args.config else pc.PricingConfig()
+    print("═" * 80)
+    print(f"  Sensitivity analysis — {cfg.name}")
+    print("═" * 80)
+    start = time.perf_counter()
+    grid = grid_sensitivity(cfg)
+    print_elasticities(elasticities(grid, cfg), cfg)
+    grid_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    result = tornado(cfg, swing=args.swing)
+    print_tornado(result, args.swing)
+    print(f"\n  Grid partials in {grid_ms:.0f} ms; tornado ({2 * len(result['savings']['rows']) + 1} "
+          f"batched settings) in {(time.perf_counter() - start) * 1000:.0f} ms")
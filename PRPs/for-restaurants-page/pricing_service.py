@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Script: pricing_service.py
+Created: 2026-10-18
+Purpose: Savings-calculator HTTP/JSON service (Section 8) backed by a precomputed lookup table
+Keywords: pricing, savings, calculator, asyncio, http, json, cache, landing-page, foody7
+Status: active
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import sys
+import time
+import traceback
+from functools import lru_cache
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+import pricing_calculator as pc
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+
+HOST = "127.0.0.1"
+PORT = 8787
+MAX_ORDERS = 2_000                 # table covers 0..MAX_ORDERS orders/month
+AVG_MIN, AVG_MAX, AVG_STEP = 5_000, 100_000, 500
+CACHE_SIZE = 65_536
+QUERY_MAX_ORDERS = 10_000_000      # inputs beyond these are rejected (400) before any arithmetic,
+QUERY_MAX_AVG = 100_000_000        # so every quote stays finite
+LATENCY_WINDOW = 100_000           # server-side latency samples kept for /stats
+
+# ─────────────────────────────────────────────
+# QUOTES — exact computation and precomputed table
+# ─────────────────────────────────────────────
+
+PLAN_NAMES = ["Commission"] + list(pc.TIERS)
+
+def savings_quote(orders, avg):
+    """Section 8 savings calculator: cost on every plan vs 7% flat and vs Baemin.
+
+    Tier plans use the published caps (TIER_CAPS); orders beyond the cap are
+    billed at the commission rate.
+    """
+    per_order = avg * pc.COMMISSION_RATE
+    costs = [orders * per_order]
+    for name, price in pc.TIERS.items():
+        costs.append(price + max(orders - pc.TIER_CAPS[name], 0) * per_order)
+    return _quote(orders, avg, costs, orders * avg * pc.COMPETITOR_RATE)
+
+def _quote(orders, avg, costs, competitor):
+    best = min(range(len(costs)), key=costs.__getitem__)
+    return {
+        "orders": orders,
+        "avg": avg,
+        "plans": {name: round(c) for name, c in zip(PLAN_NAMES, costs)},
+        "best_plan": PLAN_NAMES[best],
+        "best_cost": round(costs[best]),
+        "commission_cost": round(costs[0]),
+        "competitor_cost": round(competitor),
+        "save_vs_commission": round(costs[0] - costs[best]),
+        "save_vs_competitor": round(competitor - costs[best]),
+    }
+
+class QuoteTable:
+    """Memory-resident (orders × avg) table of plan costs for on-grid queries"""
+
+    def __init__(self, max_orders=MAX_ORDERS, avg_min=AVG_MIN, avg_max=AVG_MAX, avg_step=AVG_STEP):
+        self.max_orders = max_orders
+        self.avg_min, self.avg_max, self.avg_step = avg_min, avg_max, avg_step
+        orders = np.arange(max_orders + 1, dtype=np.float64)[:, np.newaxis]
+        avg = np.arange(avg_min, avg_max + 1, avg_step, dtype=np.float64)[np.newaxis, :]
+        # Same operation order as savings_quote so table and fallback agree exactly
+        per_order = avg * pc.COMMISSION_RATE
+        costs = [orders * per_order]
+        for name, price in pc.TIERS.items():
+            costs.append(price + np.maximum(orders - pc.TIER_CAPS[name], 0) * per_order)
+        self.costs = np.stack(costs, axis=-1)          # (orders, avg, plan)
+        self.competitor = orders * avg * pc.COMPETITOR_RATE
+
+    def lookup(self, orders, avg):
+        """Quote from the table, or None when (orders, avg) is off-grid"""
+        if not (0 <= orders <= self.max_orders and self.avg_min <= avg <= self.avg_max):
+            return None
+        j, rem = divmod(avg - self.avg_min, self.avg_step)
+        if rem or orders != int(orders):
+            return None
+        i, j = int(orders), int(j)
+        return _quote(orders, avg, self.costs[i, j].tolist(), float(self.competitor[i, j]))
+
+# ─────────────────────────────────────────────
+# HTTP SERVICE
+# ─────────────────────────────────────────────
+
+class SavingsService:
+    """Minimal keep-alive HTTP/1.1 server: GET /savings?orders=&avg=, /stats, /health"""
+
+    def __init__(self, table=None, cache_size=CACHE_SIZE):
+        self.table = table or QuoteTable()
+        self.answer = lru_cache(maxsize=cache_size)(self._answer)
+        self.latency_ns = np.zeros(LATENCY_WINDOW, dtype=np.int64)
+        self.requests = 0
+        self.table_hits = 0
+
+    def _answer(self, orders, avg):
+        quote = self.table.lookup(orders, avg)
+        if quote is None:
+            quote = savings_quote(orders, avg)
+        else:
+            self.table_hits += 1
+        return json.dumps(quote, separators=(",", ":")).encode()
+
+    def route(self, target):
+        url = urlsplit(target)
+        if url.path == "/savings":
+            q = parse_qs(url.query)
+            try:
+                orders = _number(q["orders"][0])
+                avg = _number(q["avg"][0])
+            except (KeyError, ValueError):
+                return 400, b'{"error":"orders and avg must be finite numbers"}'
+            if not (0 <= orders <= QUERY_MAX_ORDERS and 0 < avg <= QUERY_MAX_AVG):
+                return 400, b'{"error":"orders must be 0..%d and avg in (0, %d]"}' % (QUERY_MAX_ORDERS, QUERY_MAX_AVG)
+            return 200, self.answer(orders, avg)
+        if url.path == "/stats":
+            return 200, json.dumps(self.stats()).encode()
+        if url.path == "/health":
+            return 200, b'{"ok":true}'
+        return 404, b'{"error":"not found"}'
+
+    def stats(self):
+        n = min(self.requests, LATENCY_WINDOW)
+        lat = self.latency_ns[:n] / 1e6
+        info = self.answer.cache_info()
+        return {
+            "requests": self.requests,
+            "table_hits": self.table_hits,
+            "cache_hits": info.hits,
+            "cache_size": info.currsize,
+            **({f"p{q}_ms": float(np.percentile(lat, q)) for q in (50, 99, 99.9)} if n else {}),
+        }
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                keep_alive = True
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    if line.lower().startswith(b"connection:") and b"close" in line.lower():
+                        keep_alive = False
+                start = time.perf_counter_ns()
+                parts = request_line.split()
+                if len(parts) < 2 or parts[0] != b"GET":
+                    status, body = 405, b'{"error":"GET only"}'
+                else:
+                    try:
+                        status, body = self.route(parts[1].decode("latin-1"))
+                    except Exception:
+                        traceback.print_exc(file=sys.stderr)
+                        status, body = 500, b'{"error":"internal error"}'
+                self.latency_ns[self.requests % LATENCY_WINDOW] = time.perf_counter_ns() - start
+                self.requests += 1
+                writer.write(b"HTTP/1.1 %d %s\r\nContent-Type: application/json\r\n"
+                             b"Content-Length: %d\r\n%s\r\n%s"
+                             % (status, _REASONS.get(status, b"OK"), len(body),
+                                b"" if keep_alive else b"Connection: close\r\n", body))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host=HOST, port=PORT):
+        server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+_REASONS = {200: b"OK", 400: b"Bad Request", 404: b"Not Found", 405: b"Method Not Allowed",
+            500: b"Internal Server Error"}
+
+def _number(text):
+    """Integers stay int so on-grid lookups and cache keys are exact; nan/inf are rejected"""
+    value = float(text)
+    if not math.isfinite(value):
+        raise ValueError(f"not a finite number: {text!r}")
+    return int(value) if value.is_integer() else value
+
+# ─────────────────────────────────────────────
+# MAIN
+# ─────────────────────────────────────────────
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[2])
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    service = SavingsService()
+    print(f"  Precomputed {service.table.costs.shape[0] * service.table.costs.shape[1]:,} quotes "
+          f"in {(time.perf_counter() - start)*1000:.0f} ms — listening on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
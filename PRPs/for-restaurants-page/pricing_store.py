@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Script: pricing_store.py
+Created: 2026-10-18
+Purpose: SQLite store for per-restaurant-month bills — bulk loading and indexed "who should upgrade" queries
+Keywords: pricing, billing, sqlite, wal, index, upgrade, caps, dashboard, foody7
+Status: active
+"""
+
+import argparse
+import sqlite3
+import time
+from itertools import islice
+
+import numpy as np
+
+import pricing_calculator as pc
+import pricing_grid as pg
+import pricing_ledger as ledger
+import pricing_recommender as rec
+import pricing_triggers as trg
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+
+ROWS_PER_STATEMENT = 512      # multi-row INSERT … VALUES; 16 columns × 512 rows = 8,192 parameters
+LOAD_CHUNK = 20_480           # bills per flat parameter list (40 statements); a 100k-row list of
+                              # 1.6M ints falls out of cache and loads ~20% slower
+PAGE_SIZE = 65_536            # new databases only: fewer, fuller pages per bulk load
+TOP_SAVINGS = 1_000
+
+# Stored integer columns, in insert order (key first); money is whole won
+BILL_COLUMNS = [
+    "restaurant", "month", "plan", "orders", "gmv", "cap", "overflow_orders", "overflow_gmv",
+    "subscription_fee", "commission", "total", "infra_cost", "competitor_cost",
+    "best_plan", "best_total", "triggers",
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS restaurants (
+    id      INTEGER PRIMARY KEY,
+    name    TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS plans (
+    id      INTEGER PRIMARY KEY,     -- 0 = commission, i = i-th tier
+    name    TEXT NOT NULL UNIQUE,
+    price   INTEGER NOT NULL,
+    cap     INTEGER                  -- NULL for commission
+);
+CREATE TABLE IF NOT EXISTS bills (
+    restaurant       INTEGER NOT NULL REFERENCES restaurants(id),
+    month            INTEGER NOT NULL,          -- YYYYMM
+    plan             INTEGER NOT NULL REFERENCES plans(id),
+    orders           INTEGER NOT NULL,
+    gmv              INTEGER NOT NULL,
+    cap              INTEGER NOT NULL,          -- 0 for commission
+    overflow_orders  INTEGER NOT NULL,
+    overflow_gmv     INTEGER NOT NULL,
+    subscription_fee INTEGER NOT NULL,
+    commission       INTEGER NOT NULL,
+    total            INTEGER NOT NULL,
+    infra_cost       INTEGER NOT NULL,
+    competitor_cost  INTEGER NOT NULL,
+    best_plan        INTEGER NOT NULL,          -- cheapest plan for this month's volume
+    best_total       INTEGER NOT NULL,
+    triggers         INTEGER NOT NULL,          -- pricing_triggers CAP_ALERT | CAP_REACHED | UPGRADE_CHEAPER
+    foody7_net       INTEGER GENERATED ALWAYS AS (total - infra_cost) VIRTUAL,
+    savings          INTEGER GENERATED ALWAYS AS (total - best_total) VIRTUAL,
+    cap_util         REAL GENERATED ALWAYS AS (CASE WHEN cap > 0 THEN CAST(orders AS REAL) / cap END) VIRTUAL
+);
+"""
+
+# Built after bulk loads (index maintenance per row would halve load speed).
+# The query indexes are partial: each covers only the rows its query can return.
+# Loads into a non-empty table upsert on (restaurant, month), so that index is
+# created first there (see insert_columns).
+UNIQUE_INDEX = "CREATE UNIQUE INDEX IF NOT EXISTS bills_restaurant_month ON bills(restaurant, month);"
+INDEXES = UNIQUE_INDEX + """
+CREATE INDEX IF NOT EXISTS bills_month_cap_util ON bills(month, cap_util) WHERE cap > 0;
+CREATE INDEX IF NOT EXISTS bills_month_plan_loss ON bills(month, plan, foody7_net) WHERE foody7_net < 0;
+CREATE INDEX IF NOT EXISTS bills_month_savings ON bills(month, savings) WHERE savings > 0;
+"""
+
+# ─────────────────────────────────────────────
+# DERIVED COLUMNS
+# ─────────────────────────────────────────────
+
+def month_key(month):
+    """'2026-01' → 202601"""
+    return int(month[:4]) * 100 + int(month[5:7])
+
+def month_label(key):
+    return f"{key // 100}-{key % 100:02d}"
+
+def derive(cols, tiers=None, caps=None):
+    """Add best_plan, best_total and triggers from plan, orders, gmv and total.
+
+    The cheapest plan is priced at the month's average basket with the
+    published caps; triggers follow pricing_triggers (alert at 80% of cap,
+    cap reached, a cheaper plan exists above the current one).
+    """
+    tiers = pc.TIERS if tiers is None else tiers
+    caps = pc.TIER_CAPS if caps is None else caps
+    orders, plan = cols["orders"], cols["plan"]
+    avg = cols["gmv"] / np.maximum(orders, 1)
+    costs = pg.plan_costs(orders, avg, list(tiers.values()), caps=[caps[n] for n in tiers])
+    best = np.argmin(costs, axis=0)
+    best_total = np.minimum(np.rint(costs.min(axis=0)).astype(np.int64), cols["total"])
+    best = np.where(best_total == cols["total"], plan, best)
+
+    cap = cols["cap"]
+    alert_at = np.ceil(cap * trg.ALERT_SHARE).astype(np.int64)
+    triggers = (np.where((cap > 0) & (orders >= alert_at), trg.CAP_ALERT, 0)
+                | np.where((cap > 0) & (orders >= cap), trg.CAP_REACHED, 0)
+                | np.where(best > plan, trg.UPGRADE_CHEAPER, 0))
+    cols["best_plan"] = best.astype(np.int64)
+    cols["best_total"] = best_total
+    cols["triggers"] = triggers.astype(np.int64)
+    return cols
+
+def synthetic_bills(n_restaurants, months=12, seed=7, tiers=None, caps=None):
+    """Bill columns for the recommender's synthetic histories (restaurant i = 'r{i}')"""
+    tiers = pc.TIERS if tiers is None else tiers
+    caps = pc.TIER_CAPS if caps is None else caps
+    orders, avg, current = rec.synthetic_history(n_restaurants, months, seed)
+    plan = np.repeat(current, months)
+    orders = orders.ravel()
+    avg = np.repeat(avg, months)
+    price = np.array([0] + list(tiers.values()), dtype=np.float64)[plan]
+    cap = np.array([0] + [caps[n] for n in tiers], dtype=np.int64)[plan]
+    gmv = orders * avg
+    over = np.where(cap > 0, np.maximum(orders - cap, 0), 0)
+    commission = np.where(cap > 0, over * avg, gmv) * pc.COMMISSION_RATE
+    cols = {
+        "restaurant": np.repeat(np.arange(n_restaurants, dtype=np.int64), months),
+        "month": np.tile(np.array([month_key(f"2026-{m % 12 + 1:02d}") + m // 12 * 100
+                                   for m in range(months)], dtype=np.int64), n_restaurants),
+        "plan": plan.astype(np.int64),
+        "orders": orders.astype(np.int64),
+        "gmv": np.rint(gmv).astype(np.int64),
+        "cap": cap,
+        "overflow_orders": over.astype(np.int64),
+        "overflow_gmv": np.rint(over * avg).astype(np.int64),
+        "subscription_fee": price.astype(np.int64),
+        "commission": np.rint(commission).astype(np.int64),
+        "infra_cost": np.rint(gmv * pc.INFRA_COST_RATE).astype(np.int64),
+        "competitor_cost": np.rint(gmv * pc.COMPETITOR_RATE).astype(np.int64),
+    }
+    cols["total"] = cols["subscription_fee"] + cols["commission"]
+    return derive(cols, tiers, caps)
+
+# ─────────────────────────────────────────────
+# STORE
+# ─────────────────────────────────────────────
+
+class BillStore:
+    """SQLite database of restaurant-month bills (WAL mode, bulk-insert friendly)"""
+
+    def __init__(self, path, tiers=None, caps=None):
+        self.tiers = pc.TIERS if tiers is None else tiers
+        self.caps = pc.TIER_CAPS if caps is None else caps
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(f"PRAGMA page_size={PAGE_SIZE}")    # ignored once the file has pages
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.conn.execute("PRAGMA cache_size=-262144")      # 256 MiB page cache
+        self.conn.executescript(SCHEMA)
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO plans (id, name, price, cap) VALUES (?, ?, ?, ?)",
+                [(0, ledger.COMMISSION_PLAN, 0, None)]
+                + [(i + 1, n, p, self.caps[n]) for i, (n, p) in enumerate(self.tiers.items())])
+        self.plan_id = dict(self.conn.execute("SELECT name, id FROM plans"))
+        self._restaurant_id = {}
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ── loading ──────────────────────────────
+
+    def add_restaurants(self, names, ids=None):
+        """Register restaurant names (optionally with fixed ids); returns their ids"""
+        new = [n for n in dict.fromkeys(names) if n not in self._restaurant_id]
+        if new:
+            with self.conn:
+                if ids is None:
+                    self.conn.executemany("INSERT OR IGNORE INTO restaurants (name) VALUES (?)",
+                                          ((n,) for n in new))
+                else:
+                    id_of = dict(zip(names, ids))
+                    self.conn.executemany("INSERT OR IGNORE INTO restaurants (id, name) VALUES (?, ?)",
+                                          ((id_of[n], n) for n in new))
+            for start in range(0, len(new), 10_000):
+                batch = new[start:start + 10_000]
+                self._restaurant_id.update(self.conn.execute(
+                    f"SELECT name, id FROM restaurants WHERE name IN ({','.join('?' * len(batch))})",
+                    batch))
+        return [self._restaurant_id[n] for n in names]
+
+    def is_empty(self):
+        return self.conn.execute("SELECT NOT EXISTS (SELECT 1 FROM bills)").fetchone()[0] == 1
+
+    def insert_columns(self, cols, upsert=None):
+        """Bulk-load bill columns (int64 arrays keyed by BILL_COLUMNS) in one transaction.
+
+        Rows go in as multi-row INSERT … VALUES statements over a flat
+        parameter list, which binds far fewer statements than one per row;
+        the list is built LOAD_CHUNK rows at a time to bound memory.
+
+        With upsert (the default unless the table is empty) a row whose
+        (restaurant, month) is already stored replaces it, so a ledger can be
+        reloaded or extended month by month. An empty table takes plain
+        INSERTs with no index to maintain.
+
+        The load runs with synchronous=OFF (NORMAL again afterwards): WAL
+        keeps the database consistent, but a load cut short by a power loss
+        may be missing and has to be rerun.
+        """
+        if upsert is None:
+            upsert = not self.is_empty()
+        matrix = np.column_stack([np.asarray(cols[c], dtype=np.int64) for c in BILL_COLUMNS])
+        n, width = matrix.shape
+        row = "(" + ",".join("?" * width) + ")"
+        block = ROWS_PER_STATEMENT * width
+        insert = f"INSERT INTO bills ({','.join(BILL_COLUMNS)}) VALUES "
+        conflict = ""
+        if upsert:
+            self.conn.execute(UNIQUE_INDEX)
+            values = BILL_COLUMNS[2:]
+            # Unchanged rows are skipped, so reloading the same ledger writes no pages or index entries
+            conflict = (f" ON CONFLICT (restaurant, month) DO UPDATE SET "
+                        f"{', '.join(f'{c} = excluded.{c}' for c in values)} "
+                        f"WHERE {' OR '.join(f'{c} IS NOT excluded.{c}' for c in values)}")
+        insert_block = insert + ",".join([row] * ROWS_PER_STATEMENT) + conflict
+        insert_row = insert + row + conflict
+        self.conn.execute("PRAGMA synchronous=OFF")
+        try:
+            with self.conn:
+                for lo in range(0, n, LOAD_CHUNK):
+                    flat = matrix[lo:lo + LOAD_CHUNK].ravel().tolist()
+                    full = len(flat) // block * block
+                    self.conn.executemany(insert_block, (flat[i:i + block] for i in range(0, full, block)))
+                    self.conn.executemany(insert_row,
+                                          (flat[i:i + width] for i in range(full, len(flat), width)))
+        finally:
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        return n
+
+    def insert_bills(self, bills, chunk=LOAD_CHUNK):
+        """Load pricing_ledger bill dicts (float or exact amounts); returns rows loaded.
+
+        Restaurant-months already in the store are replaced (see insert_columns).
+        """
+        bills = iter(bills)
+        upsert = not self.is_empty()
+        total = 0
+        while True:
+            batch = list(islice(bills, chunk))
+            if not batch:
+                return total
+            cols = {
+                "restaurant": np.array(self.add_restaurants([b["restaurant_id"] for b in batch])),
+                "month": np.array([month_key(b["month"]) for b in batch]),
+                "plan": np.array([self.plan_id[b["plan"]] for b in batch]),
+                "cap": np.array([b["cap"] or 0 for b in batch]),
+            }
+            for c in ("orders", "gmv", "overflow_orders", "overflow_gmv", "subscription_fee",
+                      "commission", "total", "infra_cost", "competitor_cost"):
+                cols[c] = np.rint(np.array([b[c] for b in batch], dtype=np.float64)).astype(np.int64)
+            total += self.insert_columns(derive(cols, self.tiers, self.caps), upsert)
+
+    def create_indexes(self):
+        self.conn.executescript(INDEXES)
+        self.conn.execute("ANALYZE")
+
+    # ── queries ──────────────────────────────
+
+    def latest_month(self):
+        return self.conn.execute("SELECT max(month) FROM bills").fetchone()[0]
+
+    def _select(self, where, order, params, limit):
+        sql = (f"SELECT r.name, b.month, p.name, b.orders, b.cap, b.total, b.foody7_net, "
+               f"b.savings, b.triggers FROM bills b JOIN restaurants r ON r.id = b.restaurant "
+               f"JOIN plans p ON p.id = b.plan WHERE {where} ORDER BY {order}")
+        if limit is not None:
+            sql += " LIMIT ?"
+            params = (*params, limit)
+        return self.conn.execute(sql, params).fetchall()
+
+    def near_cap(self, share=trg.ALERT_SHARE, month=None, limit=None):
+        """Restaurants at or above `share` of their tier's cap, fullest first"""
+        month = month or self.latest_month()
+        return self._select("b.month = ? AND b.cap > 0 AND b.cap_util >= ?", "b.cap_util DESC",
+                            (month, share), limit)
+
+    def losing_money(self, plan="F70", month=None, limit=None):
+        """Restaurants on `plan` whose infra cost exceeds what they pay (Section 4 warning)"""
+        month = month or self.latest_month()
+        return self._select("b.month = ? AND b.plan = ? AND b.foody7_net < 0", "b.foody7_net",
+                            (month, self.plan_id[plan]), limit)
+
+    def top_savings(self, n=TOP_SAVINGS, month=None):
+        """Restaurants that would save the most by moving to their cheapest plan"""
+        month = month or self.latest_month()
+        return self._select("b.month = ? AND b.savings > 0", "b.savings DESC", (month,), n)
+
+    def count(self):
+        return self.conn.execute("SELECT count(*) FROM bills").fetchone()[0]
+
+# ─────────────────────────────────────────────
+# MAIN
+# ─────────────────────────────────────────────
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, (time.perf_counter() - start) * 1000
+
+def _print_rows(rows, top=5):
+    for name, month, plan, orders, cap, total, net, savings, flags in rows[:top]:
+        fired = ",".join(trg.EVENT_NAMES[k] for k in trg.EVENT_NAMES if flags & k) or "—"
+        print(f"    {name:<10} {month_label(month)} {plan:<11} {orders:>6} / {cap or '—':<5} "
+              f"bill {pc.fmt_krw(total):>11}  net {pc.fmt_krw(net):>10}  "
+              f"saves {pc.fmt_krw(savings):>10}  {fired}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[2])
+    parser.add_argument("db", help="SQLite database path")
+    parser.add_argument("--ledger", help="orders CSV/JSONL to bill (pricing_ledger) and load")
+    parser.add_argument("--plans", help="restaurant_id,plan CSV for --ledger")
+    parser.add_argument("--synthetic", type=int, metavar="RESTAURANTS",
+                        help="load synthetic bills for this many restaurants")
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--month", help="query month YYYY-MM (default: latest)")
+    args = parser.parse_args()
+
+    with BillStore(args.db) as store:
+        if args.synthetic:
+            cols = synthetic_bills(args.synthetic, args.months)
+            store.add_restaurants([f"r{i}" for i in range(args.synthetic)], ids=range(args.synthetic))
+            n, ms = _timed(store.insert_columns, cols)
+            print(f"  Loaded {n:,} bills in {ms / 1000:.2f}s ({n / ms * 1000:,.0f} rows/s)")
+        if args.ledger:
+            state = ledger.LedgerReplay(plans=ledger.load_plans(args.plans) if args.plans else None)
+            bills = ledger.replay(ledger.read_orders(args.ledger), state)
+            n, ms = _timed(store.insert_bills, bills)
+            print(f"  Billed and loaded {n:,} bills in {ms / 1000:.2f}s")
+        if args.synthetic or args.ledger:
+            _, ms = _timed(store.create_indexes)
+            print(f"  Indexed in {ms / 1000:.2f}s")
+
+        month = month_key(args.month) if args.month else store.latest_month()
+        if month is None:
+            parser.error("store is empty; load --ledger or --synthetic first")
+        print("═" * 80)
+        print(f"  Bill store — {store.count():,} restaurant-months, querying {month_label(month)}")
+        print("═" * 80)
+        for title, fn, kwargs in [
+            (f"Above {trg.ALERT_SHARE:.0%} of cap", store.near_cap, {}),
+            ("On F70 and losing Foody7 money", store.losing_money, {"plan": "F70"}),
+            (f"Top {TOP_SAVINGS:,} by potential savings", store.top_savings, {}),
+        ]:
+            rows, ms = _timed(fn, month=month, **kwargs)
+            print(f"\n  {title}: {len(rows):,} rows in {ms:.1f} ms")
+            _print_rows(rows)
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Script: pricing_sweep.py
+Created: 2026-10-18
+Purpose: Parallel multi-config sweep runner — evaluate many pricing scenarios and diff them against a baseline
+Keywords: pricing, sweep, scenarios, config, diff, multiprocessing, foody7
+Status: active
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pricing_cache as pcache
+import pricing_calculator as pc
+
+# Sections with numeric tables; the prose-only sections have nothing to diff
+DIFF_SECTIONS = ["breakeven", "revenue", "restaurant-cost", "recommendation",
+                 "caps", "effective-pct", "overflow"]
+TOP_CHANGES = 8
+
+# ─────────────────────────────────────────────
+# METRICS
+# ─────────────────────────────────────────────
+
+def flatten_section(result):
+    """{'caps.caps[F70].cap': 79, ...} for every numeric, non-key table cell"""
+    metrics = {}
+    for table in result.tables.values():
+        key_idx = [table.columns.index(k) for k in table.keys]
+        for row in table.rows:
+            row_id = ",".join(str(row[i]) for i in key_idx)
+            for i, col in enumerate(table.columns):
+                value = row[i]
+                if i in key_idx or isinstance(value, str):
+                    continue
+                metrics[f"{result.key}.{table.name}[{row_id}].{col}"] = value
+    return metrics
+
+def flatten(results):
+    metrics = {}
+    for result in results:
+        metrics.update(flatten_section(result))
+    return metrics
+
+# Flattened cells of memoized (shared, read-only) SectionResults, by result object;
+# flattening costs more than building the sections, so a memo hit skips both
+_FLAT = {}
+
+def _flatten_memoized(result):
+    metrics = _FLAT.get(result)
+    if metrics is None:
+        if len(_FLAT) >= pcache.MAX_ENTRIES:
+            _FLAT.clear()
+        metrics = _FLAT[result] = flatten_section(result)
+    return metrics
+
+def evaluate_config(cfg, sections=None, cache=False):
+    """Run the calculator sections for one config; returns (name, metrics).
+
+    With cache, section results (and their flattened cells) are memoized
+    per process by pricing_cache, so configs sharing the fields a section
+    reads share its result.
+    """
+    if not cache:
+        return cfg.name, flatten(pc.build_sections(sections or DIFF_SECTIONS, cfg))
+    metrics = {}
+    for result in pcache.build_sections(sections or DIFF_SECTIONS, cfg):
+        metrics.update(_flatten_memoized(result))
+    return cfg.name, metrics
+
+def diff_metrics(base, other, rel_tol=1e-9):
+    """Changed, added and removed metrics as (key, old, new) tuples"""
+    changes = []
+    for key in base.keys() | other.keys():
+        old, new = base.get(key), other.get(key)
+        if old is None or new is None:
+            changes.append((key, old, new))
+        elif old != new and abs(float(new) - float(old)) > rel_tol * max(abs(float(old)), 1.0):
+            changes.append((key, old, new))
+    return sorted(changes, key=_change_size, reverse=True)
+
+def _change_size(change):
+    _, old, new = change
+    if old is None or new is None:
+        return float("inf")
+    return abs(float(new) - float(old)) / max(abs(float(old)), 1.0)
+
+# ─────────────────────────────────────────────
+# CONFIG SOURCES
+# ─────────────────────────────────────────────
+
+def load_configs(paths):
+    """Each path is a single-config JSON/TOML file, or a JSON list of configs"""
+    configs = []
+    for path in map(Path, paths):
+        if path.suffix == ".json":
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if isinstance(data, dict) and "configs" in data:
+                data = data["configs"]
+            if isinstance(data, list):
+                configs += [pc.PricingConfig.from_dict(d, name=d.get("name", f"{path.stem}[{i}]"))
+                            for i, d in enumerate(data)]
+                continue
+        configs.append(pc.PricingConfig.from_file(path))
+    return configs
+
+def grid_configs(base, specs):
+    """Cartesian variants of `base` from specs like 'commission_rate=0.06,0.08' or
+    'tiers.F70=60000,80000' (dotted keys set one entry of a dict field)"""
+    axes = []
+    for spec in specs:
+        key, _, values = spec.partition("=")
+        axes.append([(key, json.loads(v)) for v in values.split(",")])
+    configs = []
+    for combo in itertools.product(*axes):
+        changes = {}
+        for key, value in combo:
+            field, _, item = key.partition(".")
+            if item:
+                changes.setdefault(field, dict(getattr(base, field)))[item] = value
+            else:
+                changes[field] = value
+        name = " ".join(f"{k}={v}" for k, v in combo)
+        configs.append(base.replace(name=name, **changes))
+    return configs
+
+# ─────────────────────────────────────────────
+# SWEEP
+# ─────────────────────────────────────────────
+
+def sweep(configs, baseline=None, workers=None, sections=None, cache=False):
+    """Evaluate every config across a process pool; returns [(name, changes)]"""
+    baseline = baseline or pc.PricingConfig(name="baseline")
+    _, base = evaluate_config(baseline, sections, cache)
+    workers = workers or os.cpu_count() or 1
+    args = [(cfg, sections, cache) for cfg in configs]
+    if workers == 1 or len(configs) <= 1:
+        evaluated = [evaluate_config(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            evaluated = list(pool.map(evaluate_config, *zip(*args),
+                                      chunksize=max(1, len(args) // (workers * 4))))
+    return [(name, diff_metrics(base, metrics)) for name, metrics in evaluated]
+
+def print_sweep(results, top=TOP_CHANGES):
+    print("═" * 80)
+    print(f"  Scenario sweep — {len(results)} configs vs baseline")
+    print("═" * 80)
+    for name, changes in results:
+        per_section = {}
+        for key, _, _ in changes:
+            section = key.split(".", 1)[0]
+            per_section[section] = per_section.get(section, 0) + 1
+        print(f"\n  {name}: {len(changes)} metrics moved"
+              + (f"  ({', '.join(f'{s} {n}' for s, n in per_section.items())})" if changes else ""))
+        for key, old, new in changes[:top]:
+            print(f"    {key:<52} {_fmt(old):>12} → {_fmt(new):<12}")
+        if len(changes) > top:
+            print(f"    … {len(changes) - top} more")
+
+def _fmt(value):
+    if value is None:
+        return "—"
+    if isinstance(value, float):
+        return f"{value:,.1f}"
+    return str(value)
+
+# ─────────────────────────────────────────────
+# MAIN
+# ─────────────────────────────────────────────
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[2])
+    parser.add_argument("configs", nargs="*", help="scenario files (JSON/TOML, or a JSON list)")
+    parser.add_argument("--baseline", help="baseline scenario file (default: module CONFIG)")
+    parser.add_argument("--grid", action="append", default=[], metavar="KEY=V1,V2",
+                        help="generate variants of the baseline; repeatable")
+    parser.add_argument("--sections", help=f"comma-separated subset of: {', '.join(DIFF_SECTIONS)}")
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    parser.add_argument("--top", type=int, default=TOP_CHANGES)
+    parser.add_argument("--json", action="store_true", help="emit the diff as JSON")
+    parser.add_argument("--cache", action="store_true",
+                        help="memoize section results per worker (pricing_cache) so overlapping configs share them")
+    args = parser.parse_args()
+
+    baseline = pc.PricingConfig.from_file(args.baseline) if args.baseline else pc.PricingConfig(name="baseline")
+    configs = load_configs(args.configs)
+    if args.grid:
+        configs += grid_configs(baseline, args.grid)
+    if not configs:
+        parser.error("no configs given (pass files and/or --grid)")
+    sections = args.sections.split(",") if args.sections else None
+    results = sweep(configs, baseline, args.workers, sections, args.cache)
+
+    if args.json:
+        json.dump([{"name": n, "changes": [{"metric": k, "old": o, "new": v} for k, o, v in c]}
+                   for n, c in results], sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        print_sweep(results, args.top)
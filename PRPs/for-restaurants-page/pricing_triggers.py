@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Script: pricing_triggers.py
+Created: 2026-10-18
+Purpose: Month-to-date cap tracker — 80%-cap alerts, cap reached and "upgrade is now cheaper" triggers
+Keywords: pricing, caps, upgrade, triggers, alerts, streaming, benchmark, foody7
+Status: active
+"""
+
+import argparse
+import math
+import time
+
+import numpy as np
+
+import pricing_calculator as pc
+
+# Event kinds double as bit flags in the per-restaurant "already fired" mask
+CAP_ALERT       = 1   # Section 7: smart alert at 80% of cap
+CAP_REACHED     = 2   # cap hit, further orders billed at 7%
+UPGRADE_CHEAPER = 4   # Summary: month-to-date spend > next tier price
+
+EVENT_NAMES = {CAP_ALERT: "cap_alert", CAP_REACHED: "cap_reached", UPGRADE_CHEAPER: "upgrade_cheaper"}
+
+ALERT_SHARE = 0.8
+NO_CAP = np.iinfo(np.int32).max
+
+EVENT_DTYPE = np.dtype([("seq", np.int64), ("restaurant", np.int64), ("kind", np.uint8)])
+
+# ─────────────────────────────────────────────
+# TRACKER
+# ─────────────────────────────────────────────
+
+class CapTracker:
+    """Array-backed month-to-date state for restaurants 0..n-1.
+
+    Per restaurant: plan (int8), orders (int32), spend (float64) and fired
+    flags (uint8) — 14 bytes. Plan 0 is commission; plan i is the i-th TIERS
+    entry. Spend is what the restaurant has been billed this month: the tier
+    fee plus 7% on every order billed at commission (all orders on plan 0,
+    orders beyond the cap otherwise).
+    """
+
+    __slots__ = ("plan_names", "price", "cap", "alert_at", "next_price", "rate",
+                 "plan", "orders", "spend", "fired")
+
+    def __init__(self, n_restaurants, tiers=None, caps=None, plans=None):
+        tiers = pc.TIERS if tiers is None else tiers
+        caps = pc.TIER_CAPS if caps is None else caps
+        self.plan_names = ["Commission"] + list(tiers)
+        self.price = np.array([0.0] + [float(tiers[n]) for n in tiers])
+        self.cap = np.array([NO_CAP] + [caps[n] for n in tiers], dtype=np.int32)
+        self.alert_at = np.array([NO_CAP] + [math.ceil(caps[n] * ALERT_SHARE) for n in tiers],
+                                 dtype=np.int32)
+        self.next_price = np.append(self.price[1:], np.inf)
+        self.rate = pc.COMMISSION_RATE
+
+        self.plan = np.zeros(n_restaurants, dtype=np.int8)
+        if plans is not None:
+            self.plan[:] = plans
+        self.orders = np.zeros(n_restaurants, dtype=np.int32)
+        self.spend = np.zeros(n_restaurants)
+        self.fired = np.zeros(n_restaurants, dtype=np.uint8)
+        self.reset_month()
+
+    @property
+    def nbytes(self):
+        return self.plan.nbytes + self.orders.nbytes + self.spend.nbytes + self.fired.nbytes
+
+    def reset_month(self):
+        """Start a new billing month: counters to zero, spend to the tier fee"""
+        self.orders[:] = 0
+        self.spend[:] = self.price[self.plan]
+        self.fired[:] = 0
+
+    def set_plan(self, restaurant, plan):
+        """Switch plan mid-month (e.g. after an upgrade); the new fee applies from now"""
+        p = self.plan_names.index(plan) if isinstance(plan, str) else int(plan)
+        self.plan[restaurant] = p
+        self.spend[restaurant] = max(self.spend[restaurant], self.price[p])
+        self.fired[restaurant] = 0
+
+    # ── one event at a time ──
+
+    def on_order(self, restaurant, value):
+        """Record one order; returns a list of fired event kinds (usually empty)"""
+        p = self.plan[restaurant]
+        n = int(self.orders[restaurant]) + 1
+        self.orders[restaurant] = n
+        cap = self.cap[p]
+        before = self.spend[restaurant]
+        after = before
+        if p == 0 or n > cap:
+            after = before + value * self.rate
+            self.spend[restaurant] = after
+
+        events = []
+        fired = self.fired[restaurant]
+        if n == self.alert_at[p] and not fired & CAP_ALERT:
+            events.append(CAP_ALERT)
+        if n == cap and not fired & CAP_REACHED:
+            events.append(CAP_REACHED)
+        if before <= self.next_price[p] < after and not fired & UPGRADE_CHEAPER:
+            events.append(UPGRADE_CHEAPER)
+        if events:
+            self.fired[restaurant] = fired | sum(events)
+        return events
+
+    # ── batches ──
+
+    def on_orders(self, restaurants, values):
+        """Record a batch of orders in arrival order.
+
+        Returns a structured array (seq, restaurant, kind) of fired events,
+        where seq is the index of the triggering order within the batch.
+        """
+        restaurants = np.asarray(restaurants, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        order = np.argsort(restaurants, kind="stable")
+        r = restaurants[order]
+        v = values[order]
+
+        group_start = np.flatnonzero(np.r_[True, r[1:] != r[:-1]])
+        sizes = np.diff(np.r_[group_start, len(r)])
+        rank = np.arange(len(r)) - np.repeat(group_start, sizes)
+
+        p = self.plan[r]
+        cap = self.cap[p]
+        n_after = self.orders[r].astype(np.int64) + rank + 1
+        billable = (p == 0) | (n_after > cap)
+        inc = np.where(billable, v * self.rate, 0.0)
+        cum = np.cumsum(inc)
+        offset = np.repeat(cum[group_start] - inc[group_start], sizes)
+        spend_after = self.spend[r] + (cum - offset)
+        spend_before = spend_after - inc
+
+        fired = self.fired[r]
+        next_price = self.next_price[p]
+        hits = [
+            (CAP_ALERT, n_after == self.alert_at[p]),
+            (CAP_REACHED, n_after == cap),
+            (UPGRADE_CHEAPER, (spend_before <= next_price) & (next_price < spend_after)),
+        ]
+        chunks = []
+        for kind, mask in hits:
+            idx = np.flatnonzero(mask & ((fired & kind) == 0))
+            if idx.size:
+                ev = np.empty(idx.size, dtype=EVENT_DTYPE)
+                ev["seq"] = order[idx]
+                ev["restaurant"] = r[idx]
+                ev["kind"] = kind
+                chunks.append(ev)
+                np.bitwise_or.at(self.fired, r[idx], kind)
+
+        last = np.r_[group_start[1:], len(r)] - 1
+        touched = r[group_start]
+        self.orders[touched] += sizes.astype(np.int32)
+        self.spend[touched] = spend_after[last]
+
+        if not chunks:
+            return np.empty(0, dtype=EVENT_DTYPE)
+        events = np.concatenate(chunks)
+        return events[np.argsort(events["seq"], kind="stable")]
+
+# ─────────────────────────────────────────────
+# BENCHMARK
+# ─────────────────────────────────────────────
+
+def bench(n_restaurants=100_000, n_events=10_000_000, batch=100_000, scalar_events=500_000, seed=7):
+    rng = np.random.default_rng(seed)
+    plans = rng.choice(len(pc.TIERS) + 1, n_restaurants, p=[0.4, 0.3, 0.15, 0.1, 0.05])
+    rids = rng.integers(0, n_restaurants, n_events)
+    values = np.rint(rng.lognormal(np.log(25_000), 0.35, n_events))
+
+    tracker = CapTracker(n_restaurants, plans=plans)
+    fired = 0
+    start = time.perf_counter()
+    for i in range(0, n_events, batch):
+        fired += len(tracker.on_orders(rids[i:i + batch], values[i:i + batch]))
+    batch_rate = n_events / (time.perf_counter() - start)
+
+    scalar = CapTracker(n_restaurants, plans=plans)
+    r_list = rids[:scalar_events].tolist()
+    v_list = values[:scalar_events].tolist()
+    on_order = scalar.on_order
+    start = time.perf_counter()
+    for rid, value in zip(r_list, v_list):
+        on_order(rid, value)
+    scalar_rate = scalar_events / (time.perf_counter() - start)
+
+    print("═" * 80)
+    print(f"  Cap tracker benchmark — {n_restaurants:,} restaurants")
+    print("═" * 80)
+    print(f"  State footprint:   {tracker.nbytes / n_restaurants:.0f} bytes/restaurant "
+          f"({tracker.nbytes / 1e6:.1f} MB)")
+    print(f"  Batch path:        {batch_rate:>14,.0f} events/s  (batch={batch:,}, {fired:,} triggers)")
+    print(f"  One-at-a-time:     {scalar_rate:>14,.0f} events/s")
+    return {"batch_events_per_sec": batch_rate, "scalar_events_per_sec": scalar_rate}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[2])
+    parser.add_argument("--restaurants", type=int, default=100_000)
+    parser.add_argument("--events", type=int, default=10_000_000)
+    parser.add_argument("--batch", type=int, default=100_000)
+    args = parser.parse_args()
+    bench(args.restaurants, args.events, args.batch)